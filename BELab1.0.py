@@ -16,28 +16,41 @@ JModelica could be used to produce FMU file for our couple simulation;
 """
 
 from signal import signal
-from PyQt5.QtWidgets import QApplication, QWidget,QSplashScreen
+from PyQt5.QtWidgets import QApplication, QWidget,QSplashScreen, QPushButton, QCheckBox, QMessageBox
+from PyQt5.QtCore import QRect
 from PyQt5.QtGui import QPixmap, QCloseEvent, QImage
 from string_gen import id_generator
-from tkinter import filedialog
-from dymola.dymola_interface import DymolaInterface
-from buildingspy.io.outputfile import Reader
+from change_detect import ChangeDetector
+from cfd_cache import ResponseCache, case_key, file_digest
+from adaptive_step import AdaptiveInterval
+from relaxation import AitkenRelaxation
+from extrapolation import SignalExtrapolator
+from fmu_cache import FMUCache
+from checkpoint import CouplingCheckpoint
+from model_exchange import integrate, leave_event_mode
+from sweep import cleaner_area
+from lazy_import import lazy_import
+from coupling_worker import CouplingParams, start_worker
+from result_store import open_store
+from workdata import WorkdataManager
+from exchange_map import ExchangeMap, ExchangeMapError, REPORTS, parse_report
 from software_back import Ui_Form
-from fluent_corba import CORBA
-from pyfmi import load_fmu
-
-import numpy as np
-import matplotlib.pyplot as plt
-import pymysql
-pymysql.install_as_MySQLdb()
-import pandas as pd
-import tkinter as tk
+
 import time
 import pathlib
 import os, sys
 import subprocess
 import shutil
 import csv
+import threading
+
+#仅在第一次使用时导入, 缩短启动时间 (各模块导入耗时见 python lazy_import.py)
+np = lazy_import('numpy')
+matplotlib_figure = lazy_import('matplotlib.figure')
+tk = lazy_import('tkinter')
+filedialog = lazy_import('tkinter.filedialog')
+dymola_interface = lazy_import('dymola.dymola_interface')
+outputfile = lazy_import('buildingspy.io.outputfile')
 
 
 class LoadWin(QSplashScreen):
@@ -45,6 +58,47 @@ class LoadWin(QSplashScreen):
         pass
 
 
+class FluentConnection(object):
+    #Fluent的CORBA连接, 窗口显示后启动Fluent, 第一次使用时才等待aaS_FluentId.txt并连接
+    def __init__(self, aas_file):
+        self.aas_file = aas_file
+        self.unit = None
+        self.scheme = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        with self._lock:
+            if self.unit is None:
+                # 监控aaS_FluentId.txt文件生成，等待corba连接
+                while True:
+                    try:
+                        if not self.aas_file.exists():
+                            time.sleep(0.2)
+                            continue
+                        else:
+                            if "IOR:" in self.aas_file.open("r").read():
+                                break
+                    except KeyboardInterrupt:
+                        sys.exit()
+                from fluent_corba import CORBA
+                # 初始化orb环境
+                orb = CORBA.ORB_init()
+                # 获得Fluent实例单元
+                self.unit = orb.string_to_object(self.aas_file.open("r").read())
+                self.scheme = self.unit.getSchemeControllerInstance()
+        return self
+
+
+class FluentProxy(object):
+    #代替fluentUnit和scheme, 访问属性时先连接Fluent
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(getattr(self._connection.connect(), self._name), attr)
+
+
 class Win(QWidget,Ui_Form):
     def __init__(self, parent = None):
         super(Win, self).__init__(parent)
@@ -66,21 +120,63 @@ class Win(QWidget,Ui_Form):
         smash_signal = [0]
         signal_simu_time = [1]
 
-        #需要记录的热流字典
-        fluxes_dict = {}
-
-        #将热流字典里的量取出保存
-        fluxesFloor_tocsv = []
-        fluxesFront_tocsv = []
-        T_tocsv = []
-        p_tocsv = []
-
-        #写一个字典型把exd导进去
-        EXD = {'MF':[], 'FM':[]}
+        #交换映射, 由界面文本或.json/.yaml文件编译, 仿真开始时绑定FMU的valueref
+        exchange_map = {1: ExchangeMap()}
+
+        #Modelica传出的值未变化时跳过CFD计算, tolerances可按变量名单独设定阈值
+        cfd_detector = ChangeDetector(abs_tol=1e-6, rel_tol=1e-4, tolerances={})
+        #CFD结果缓存, 以边界条件为键保存在Workdata/CFD_cache中(每个样本一行), 信赖域内插值; 网格按内容哈希区分
+        cfd_cache = ResponseCache(trust_radius=0.002, scales={}, min_points=2)
+        #自适应交换间隔, 上下限为界面输入间隔的min_ratio与max_ratio倍, enabled=True时开启, 默认保持界面输入的固定间隔
+        coupling_interval = AdaptiveInterval(min_ratio=0.25, max_ratio=8.0, atol=1e-3, rtol=1e-3, enabled=False)
+        #隐式耦合, 每次交换时回退FMU并重新积分交换区间, 迭代至界面值收敛(Aitken松弛), enabled=True时开启
+        coupling_relax = AitkenRelaxation(omega0=0.5, atol=1e-4, rtol=1e-3, max_iterations=5, enabled=False)
+        #交换量外推, order=0为原来的保持上一次交换值, orders可按变量名单独设定阶数
+        mf_predictor = SignalExtrapolator(order=1, orders={})
+        fm_predictor = SignalExtrapolator(order=1, orders={})
+        #FMU解压目录与已加载的实例缓存, 重复计算同一FMU时只reset不重新加载
+        fmu_cache = FMUCache(cache_dir=os.path.join(root_path, 'Workdata', 'FMU_cache'))
+        #最后一次被接受的交换的检查点, CFD计算失败或隐式迭代不收敛时回退FMU与交换量并缩短间隔重算
+        #Fluent每次计算都重新初始化并按交换量设置边界条件, 因此不保存case/data
+        coupling_checkpoint = CouplingCheckpoint(max_retries=3)
+
+        #每次耦合计算的所有交换量与记录量保存在一个HDF5文件中, 未安装h5py时保存为csv文件
+        run_store = {1: None}
 
         use_file = '.fmu'
 
         self.cal_progressBar.setRange(0,100)
+
+        #耦合计算在工作线程中运行, 界面通过信号更新
+        self.coupling_run = None
+        self.close_requested = False
+        gui_thread = threading.get_ident()
+        self.pauseButton = QPushButton('Pause', self.widget)
+        self.pauseButton.setGeometry(QRect(1230, 830, 91, 51))
+        self.cancelButton = QPushButton('Cancel', self.widget)
+        self.cancelButton.setGeometry(QRect(1330, 830, 91, 51))
+        #勾选且FMU提供协同仿真接口时使用其内部求解器, 否则使用模型交换循环; 两者都按仿真时间计算交换间隔, 第一次交换在一个间隔之后
+        self.cosimCheckBox = QCheckBox('Co-simulation', self.widget)
+        self.cosimCheckBox.setGeometry(QRect(1230, 800, 191, 21))
+        self.cosimCheckBox.setChecked(False)
+
+        def gui(func, *args):
+            #在工作线程中时转交给界面线程执行
+            if self.coupling_run is not None and threading.get_ident() != gui_thread:
+                self.coupling_run[1].call(func, *args)
+            else:
+                func(*args)
+
+        def show_progress(value):
+            if self.coupling_run is not None and threading.get_ident() != gui_thread:
+                self.coupling_run[1].report_progress(value)
+            else:
+                self.cal_progressBar.setValue(value)
+
+        def coupling_check():
+            #暂停时等待, 取消时抛出CouplingCancelled
+            if self.coupling_run is not None and threading.get_ident() != gui_thread:
+                self.coupling_run[1].check()
         
 
         #怎么做两个房间？同时运行Fluent吗？思考
@@ -159,13 +255,17 @@ class Win(QWidget,Ui_Form):
 
 
         def boundarySetButton_click():#version1.0中实现手动输入边界名称，version2.0中希望能够自动识别
+            set_boundary(self.Boundary_select.currentText(), self.boundary_TlineEdit.text().strip(),
+                         self.NegitiveP.isChecked())
+
+        def set_boundary(BoundaryName, BoundaryT_input, negative_pressure):
+            #不读取控件, 可在工作线程中调用; 界面输入的温度为BoundaryT_input
             try:
-                BoundaryName = self.Boundary_select.currentText()
                 MFKey = list(dict_MFpassValue.keys())
                 #当inlet作为自由入口时,即房间负压设置生效时
-                if self.NegitiveP.isChecked() == True:
+                if negative_pressure == True:
                     if BoundaryName.find('inlet') != -1:
-                        BoundaryT = self.boundary_TlineEdit.text().strip()
+                        BoundaryT = BoundaryT_input
                         scheme.doMenuCommand("/define/boundary/inlet-vent "+BoundaryName+' yes no 0 no 0 no '+BoundaryT+' no yes yes no 0.06 no 0.04')#TUI命令实现,需要注意设置k,epsilon和压力损耗
                     elif BoundaryName.find('outlet') != -1:
                         for i in MFKey:
@@ -174,7 +274,7 @@ class Win(QWidget,Ui_Form):
                                     BoundaryV = dict_MFpassValue[i]
                         scheme.doMenuCommand("/define/boundary/mass-flow-outlet "+BoundaryName+' yes yes no '+str(BoundaryV))
                     elif BoundaryName.find('wall') != -1:
-                        BoundaryT = self.boundary_TlineEdit.text().strip()
+                        BoundaryT = BoundaryT_input
                         scheme.doMenuCommand('/define/boundary/wall '+BoundaryName+' 0 no 0 no yes temperature no '+ BoundaryT)
                 #当outlet作为自由出口时
                 else:
@@ -190,14 +290,14 @@ class Win(QWidget,Ui_Form):
                     elif BoundaryName.find('outlet') != -1:
                         scheme.doMenuCommand("/define/boundary/zone-type "+BoundaryName+" outflow")
                     elif BoundaryName.find('wall') != -1:
-                        BoundaryT = self.boundary_TlineEdit.text().strip()
+                        BoundaryT = BoundaryT_input
                         scheme.doMenuCommand("/define/boundary/wall "+BoundaryName+' 0 no 0 no yes temperature no '+ BoundaryT)
                 
             except:
-                self.set_status_label.setText('Set Error')
+                gui(self.set_status_label.setText, 'Set Error')
                 return
             finally:
-                self.set_status_label.setText('Set Down')
+                gui(self.set_status_label.setText, 'Set Down')
                 
         def startSimulation_click():
             try:
@@ -205,63 +305,24 @@ class Win(QWidget,Ui_Form):
                 
                 fluentUnit.setNrIterations(100)
                 fluentUnit.calculate()
-                self.cd_file_downloadButton.setEnabled(True)
+                gui(self.cd_file_downloadButton.setEnabled, True)
                
                 run_id = id_generator()
                 
-                for exd in range(len(EXD['FM'])):
-                    FMName = EXD['FM'][exd]
-                    FMName = FMName.split()
-                    toModelicaName = FMName[1]
-                    FluentName = FMName[0]
-
-                    if FluentName.find('RoomT') != -1:
-                        scheme.doMenuCommandToString('/report/volume-integrals/mass-avg cell-fuild () temperature yes simuT_'+run_id+'.txt')
-                        Tem = open(os.path.join(workPath,'simuT_'+run_id+'.txt'), 'r', encoding='utf-8')
-                        l_T = Tem.read()
-                        item_T = l_T.split()
-                        T_index = item_T.index('cell-fuild')+1
-
-                        T_tocsv.append(float(item_T[T_index]))
-
-                        dict_FMpassValue[toModelicaName] = float(item_T[T_index])
-
-                    if FluentName.find('outlet_massflow') != -1:
-                        scheme.doMenuCommandToString('/report/fluxes/mass-flow no outlet* () yes simu_'+run_id+'.txt')#保存到文件里
-                        f = open(os.path.join(workPath,'simu_'+run_id+'.txt'), 'r', encoding='utf-8')
-                        line = f.read()
-                        item = line.split()
-                        mf_index = item.index('outlet')+1
-                        mass_flow = item[mf_index]
-                        dict_FMpassValue[toModelicaName] = float(mass_flow)#增加出口处质量流量值
-                    
-                    if FluentName.find('inlet_pressureDifference') != -1:
-                        scheme.doMenuCommandToString('/report/surface-integrals/area-weighted-avg inlet () pressure yes simuP_'+run_id+'.txt')#保存到文件里
-                        pressure = open(os.path.join(workPath,'simuP_'+run_id+'.txt'), 'r', encoding='utf-8')
-                        l_p = pressure.read()
-                        item_p = l_p.split()
-                        p_index = item_p.index('inlet')+1
-
-                        p_tocsv.append(float(item_p[p_index]))
-                        dict_FMpassValue[toModelicaName] = float(item_p[p_index])
-
-                    if FluentName.find('fluxes') != -1:
-                        scheme.doMenuCommandToString('/report/fluxes/heat-transfer yes yes simufluxes_'+run_id+'.txt')
-                        fluxes = open(os.path.join(workPath,'simufluxes_'+run_id+'.txt'), 'r', encoding='utf-8')
-                        l_fluxes = fluxes.read()
-                        item_fluxes = l_fluxes.split()
-                        for fluxes_name in('inlet', 'outlet', 'wall-ceiling', 'wall-floor', 'wall-front'):
-                            fluxes_index = item_fluxes.index(fluxes_name)+1
-                            fluxes_dict[fluxes_index] = float(item_fluxes[fluxes_index])
-
-                            dict_FMpassValue[toModelicaName+fluxes_name] = float(item_fluxes[fluxes_index])
-
-                            fluxesFloor_tocsv.append(fluxes_dict['wall-floor'])
-                            fluxesFront_tocsv.append(fluxes_dict['wall-front'])
+                #每种报告每次计算只执行一次, 结果按交换映射分配给Modelica变量
+                xmap = exchange_map[1]
+                for kind in xmap.reports:
+                    report = REPORTS[kind]
+                    report_file = report.file_prefix+run_id+'.txt'
+                    scheme.doMenuCommandToString(report.command.format(file=report_file))#保存到文件里
+                    with open(os.path.join(workPath, report_file), 'r', encoding='utf-8') as f:
+                        values = xmap.convert_fm(kind, parse_report(kind, f.read()))
+                    dict_FMpassValue.update(values)
  
             except:
-                self.set_status_label.setText('Simulation error, please check input')
-                return
+                gui(self.set_status_label.setText, 'Simulation error, please check input')
+                return False
+            return True
             # scheme.doMenuCommand()
             # scheme.doMenuCommand("/solve/set/time-step 0.01")
             # scheme.doMenuCommand("/solve/set/number-of-time-steps 350")
@@ -386,7 +447,7 @@ class Win(QWidget,Ui_Form):
             a = float(self.curve_a_line.text())
             b = float(self.curve_b_line.text())
             m = b
-            L = 20*(1.2/a)**(1/b)
+            L = cleaner_area(a, b)
             if CleanerNameL in dict_dymola_setName[1]:
                 dict_dymola_setValue[1][dict_dymola_setName[1].index(CleanerNameL)] = L
             else:
@@ -446,19 +507,286 @@ class Win(QWidget,Ui_Form):
         def ExchangeDataDistribute():
             FM = self.FMEXD1.text().strip()
             MF = self.MFEXD1.text().strip()
-            FM = FM.split(';')
-            MF = MF.split(';')
-            EXD['FM'] = FM
-            EXD['MF'] = MF
+            #MF一栏也可以填写交换映射文件(.json/.yaml)的路径
+            try:
+                if os.path.splitext(MF)[1].lower() in ('.json', '.yaml', '.yml'):
+                    exchange_map[1] = ExchangeMap.from_file(MF)
+                else:
+                    exchange_map[1] = ExchangeMap.from_text(MF, FM)
+            except Exception as e:
+                self.set_status_label.setText('Exchange map error: %s' % e)
+
+        def CFD_solve(params):
+            #先查缓存, 未命中时调用Fluent计算并存入缓存
+            response = cfd_cache.lookup(dict_MFpassValue)
+            if response is not None:
+                dict_FMpassValue.update(response)
+                return True
+            set_boundary(params.boundary, params.boundary_T, params.negative_pressure)
+            if startSimulation_click():
+                cfd_cache.add(dict_MFpassValue, dict_FMpassValue)
+                cfd_cache.save()
+                return True
+            return False
+
+        def read_MFpassValue(model):
+            #一次get_real读取所有交换量, 单位换算由交换映射中的scale/offset完成
+            xmap = exchange_map[1]
+            if xmap.mf:
+                dict_MFpassValue.update(xmap.convert_mf(model.get_real(xmap.mf_valuerefs)))
+
+                #dict_MFpassValue['supply_velocity'] = model.get_real([model.get_variable_valueref('SupplyAir.m_flow')])[0]/(1.2*0.1)
+
+        def exchange_MFpassValue(model, time):
+            #读取Modelica输出值, 返回实际输出值; 发送给Fluent的dict_MFpassValue为外推值
+            #下一个交换间隔在此按Modelica输出值的外推误差确定(coupling_interval.interval), 交换被拒绝时不使用
+            read_MFpassValue(model)
+            MF_exchanged = dict(dict_MFpassValue)
+            next_interval = coupling_interval.update(time, MF_exchanged)
+            # Fluent稳态计算的结果要代表下一个交换区间, 因此发送该区间中点的预测值
+            mf_predictor.add(time, MF_exchanged)
+            dict_MFpassValue.update(mf_predictor.predict(time + 0.5*next_interval))
+            return MF_exchanged
+
+        def set_FMpassValue(model, values):
+            #按绑定的valueref一次写入Fluent结果
+            if values:
+                valuerefs = exchange_map[1].valuerefs
+                model.set_real([valuerefs[name] for name in values], list(values.values()))
+
+        def coupling_iterate(model, held_FMpassValue, MF_exchanged, time, params, t_sol, sol, vref):
+            #隐式耦合: 每次迭代把FMU回退到上一次被接受的交换(检查点), 以松弛后的界面值x重新积分到本次交换时刻,
+            #再把Modelica输出值外推后发送给Fluent, 直至界面值收敛; 返回(是否收敛, 最后一次迭代的Modelica输出值)
+            #调用时及返回时FMU均处于本次交换时刻的事件模式, 重新积分的结果替换t_sol与sol中检查点之后的值
+            MF_iterated = [MF_exchanged]
+
+            def solve(x):
+                coupling_check()
+                leave_event_mode(model)
+                data = coupling_checkpoint.rewind(model)
+                if data is not None:
+                    del t_sol[data['n_sol']:]
+                    del sol[data['n_sol']:]
+                    #区间内的input由检查点的Fluent结果线性过渡到x, 参数只能在事件模式中设置, 在交换时刻设置
+                    (t0, x0) = (data['time'], data['FM'])
+                    inputs = {name: value for (name, value) in x.items() if name in exchange_map[1].inputs}
+
+                    def set_inputs(t):
+                        w = (t-t0)/(time-t0)
+                        set_FMpassValue(model, {name: x0.get(name, value) + w*(value-x0.get(name, value))
+                                                for (name, value) in inputs.items()})
+
+                    def on_step(t):
+                        if t < time:
+                            t_sol.append(t)
+                            sol.append(model.get_real(vref))
+                    integrate(model, time, params.dt, data['Tnext'], data['event_ind'], set_inputs, on_step)
+                model.enter_event_mode()
+                set_FMpassValue(model, x)
+                MF_iterated[0] = exchange_MFpassValue(model, time)
+                if not CFD_solve(params):
+                    return None
+                return dict(dict_FMpassValue)
+
+            (converged, x) = coupling_relax.iterate(held_FMpassValue, dict(dict_FMpassValue), solve)
+            if not converged:
+                dict_FMpassValue.update(x)
+            return (converged, MF_iterated[0])
+
+        def open_run_store(fmu_file, end_time, communicate_time, recorded):
+            #变量按交换映射在打开时确定, 第一次CFD计算失败时也保留FM列
+            xmap = exchange_map[1]
+            names = (['MF/'+r.fluent for r in xmap.mf] + ['MF_sent/'+r.fluent for r in xmap.mf] +
+                     ['FM/'+t.modelica for r in xmap.fm for t in r.targets] + ['recorded/'+name for name in recorded])
+            run_store[1] = open_store(os.path.join(dir_result, 'coupled_run_'+id_generator()+'.h5'),
+                                      names=list(dict.fromkeys(names)),
+                                      attrs={'fmu': fmu_file, 'end_time': end_time, 'interval': communicate_time,
+                                             'MF': xmap.mf_text(), 'FM': xmap.fm_text()})
+
+        def store_exchange(time, MF_exchanged, recorded):
+            #MF: Modelica输出值, MF_sent: 发送给Fluent的值(可能为外推值), FM: Fluent结果
+            if run_store[1] is None:
+                return
+            values = {}
+            for (name, value) in MF_exchanged.items():
+                values['MF/'+name] = value
+            for (name, value) in dict_MFpassValue.items():
+                values['MF_sent/'+name] = value
+            for (name, value) in dict_FMpassValue.items():
+                values['FM/'+name] = value
+            for (name, value) in recorded.items():
+                values['recorded/'+name] = value
+            run_store[1].append(len(run_store[1]), time, values)
+
+        def close_run_store():
+            if run_store[1] is not None:
+                run_store[1].close()
+                run_store[1] = None
+
+        def save_FMU_result(t_sol, sol):
+            close_run_store()
+            #使用Figure而非pyplot, 可以在工作线程中绘图
+            fig = matplotlib_figure.Figure()
+            fig.add_subplot(211).plot(t_sol,np.array(sol)[:,0])
+            fig.add_subplot(212).plot(t_sol,np.array(sol)[:,1])
+            fig.savefig(os.path.join(dir_result, 'FMU_result.svg'))
+            gui(show_result_image, os.path.join(dir_result, 'FMU_result.svg'))
+            summary = 'CFD solved: %d, skipped: %d, %s' % (cfd_detector.solved, cfd_detector.skipped, cfd_cache.report())
+            if coupling_relax.enabled:
+                summary += ', coupling iterations: %d, not converged: %d' % (coupling_relax.total_iterations, coupling_relax.not_converged)
+            gui(self.multi_result_path_label.setText, summary)
+
+        def show_result_image(file_name):
+            image = QImage(file_name)
+            self.Reslut_label.setPixmap(QPixmap.fromImage(image))
+            self.Reslut_label.setScaledContents(True)
+
+        def exchange_due(time, last_exchange, exchange_interval):
+            #距上一次交换的仿真时间达到交换间隔时交换, 容差消除时间步累加的舍入误差
+            return time - last_exchange >= exchange_interval*(1-1.e-9)
+
+        def FMU_cosimulate(params):
+            #协同仿真FMU: 求解器在FMU内部, 每个时间步dt调用一次do_step
+            #交换间隔与模型交换循环相同, 按仿真时间计算, 两次交换之间设置Fluent结果的外推值
+            Tstart = 0
+            Tend = params.end_time
+            model = fmu_cache.get(params.fmu_file, kind='CS')
+            model.set(params.set_names, params.set_values)
+            model.setup_experiment(start_time = Tstart)
+            model.enter_initialization_mode()
+            model.exit_initialization_mode()
 
-        def FMU_simulate(fmu_file, end_time, communicate_time, set_variable, set_value):
-            self.multi_result_path_label.setText('Start Simu')
+            try:
+                var1 = exchange_map[1].mf[0].modelica
+                var2 = exchange_map[1].fm[0].targets[0].modelica
+                vref = [exchange_map[1].valuerefs[var1], exchange_map[1].valuerefs[var2]]
+                t_sol = [Tstart]
+                sol = [model.get_real(vref)]
+            except:
+                gui(self.multi_result_path_label.setText, 'Name Error')
+                return
+
+            time = Tstart
+            dt = params.dt
+            exchange_interval = params.interval
+            #上一次交换的时间, 与模型交换循环相同, 第一次交换在一个间隔之后
+            t_exchange = Tstart
+            show_progress(0)
+
+            def checkpoint_data():
+                #回退后继续计算所需的循环变量
+                return {'time': time, 'exchange_interval': exchange_interval, 'n_sol': len(t_sol),
+                        'MF': dict(dict_MFpassValue), 'FM': dict(dict_FMpassValue)}
+            # FMU支持get_fmu_state时才能回退
+            coupling_checkpoint.save(model, checkpoint_data())
+
+            while time < Tend:
+                coupling_check()
+                exchanged = False
+                rejected = False
+                if exchange_due(time, t_exchange, exchange_interval):
+                    show_progress(int(100*time/Tend))
+                    MF_exchanged = exchange_MFpassValue(model, time)
+
+                    if cfd_detector.changed(dict_MFpassValue) or not dict_FMpassValue:
+                        if CFD_solve(params):
+                            cfd_detector.accept(dict_MFpassValue)
+                        elif coupling_checkpoint.can_retry():
+                            rejected = True
+                    else:
+                        cfd_detector.skip()
+
+                    if not rejected:
+                        set_FMpassValue(model, dict_FMpassValue)
+                        fm_predictor.add(time, dict_FMpassValue)
+                        exchange_interval = coupling_interval.interval
+                        exchanged = True
+
+                if rejected:
+                    # 回退FMU与交换量到上一次被接受的交换, 以减半的间隔重新计算
+                    data = coupling_checkpoint.restore(model)
+                    time = data['time']
+                    del t_sol[data['n_sol']:]
+                    del sol[data['n_sol']:]
+                    dict_MFpassValue.clear()
+                    dict_MFpassValue.update(data['MF'])
+                    dict_FMpassValue.clear()
+                    dict_FMpassValue.update(data['FM'])
+                    set_FMpassValue(model, dict_FMpassValue)
+                    mf_predictor.truncate(time)
+                    fm_predictor.truncate(time)
+                    coupling_interval.truncate(time)
+                    exchange_interval = data['exchange_interval']*0.5**coupling_checkpoint.retries
+                    coupling_interval.interval = exchange_interval
+                    t_exchange = time
+                    continue
+                if exchanged:
+                    t_exchange = time
+                    coupling_checkpoint.save(model, checkpoint_data())
+                    store_exchange(time, MF_exchanged, {var1: sol[-1][0], var2: sol[-1][1]})
+
+                step = min(dt, Tend-time)
+                # 两次交换之间用步长中点的外推值代替Fluent结果的保持值, 只设置FMU的input
+                if not exchanged and (fm_predictor.order > 0 or fm_predictor.orders):
+                    inputs = exchange_map[1].inputs
+                    set_FMpassValue(model, {name: value for (name, value) in fm_predictor.predict(time + 0.5*step).items()
+                                            if name in inputs})
+                status = model.do_step(time, step, True)
+                if status != 0:
+                    gui(self.multi_result_path_label.setText, 'Step Error at t=%g' % time)
+                    return
+                time = time + step
+
+                t_sol += [time]
+                sol += [model.get_real(vref)]
+
+            save_FMU_result(t_sol, sol)
+
+        def FMU_simulate(params):
+            #params为CouplingParams, 在界面线程中读取, 工作线程不访问控件
+            fmu_file = params.fmu_file
+            gui(self.multi_result_path_label.setText, 'Start Simu')
+            cfd_detector.reset()
+            coupling_interval.reset(params.interval)
+            coupling_relax.total_iterations = 0
+            coupling_relax.not_converged = 0
+            mf_predictor.reset()
+            fm_predictor.reset()
+            coupling_checkpoint.reset()
+            exchange_interval = params.interval
+            #交换量名称在计算开始前按FMU的变量表检查并绑定valueref
+            try:
+                exchange_map[1] = exchange_map[1].bind(fmu_cache.model_description(fmu_file))
+            except ExchangeMapError as e:
+                gui(self.multi_result_path_label.setText, 'Name Error: %s' % e)
+                return
+            cfd_cache.open(os.path.join(root_path, 'Workdata', 'CFD_cache',
+                                        case_key(file_digest(params.mesh_file),
+                                                 params.boundary,
+                                                 params.boundary_T,
+                                                 params.negative_pressure,
+                                                 exchange_map[1].fm_text())+'.ndjson'))
+            close_run_store()
+            if exchange_map[1].mf and exchange_map[1].fm:
+                open_run_store(fmu_file, params.end_time, params.interval,
+                               [exchange_map[1].mf[0].modelica, exchange_map[1].fm[0].targets[0].modelica])
+            kinds = fmu_cache.model_description(fmu_file)['kinds']
+            if 'CoSimulation' in kinds and (params.use_cosimulation or 'ModelExchange' not in kinds):
+                #隐式耦合需要在同一时刻重复求解FMU, 协同仿真FMU不支持
+                if not coupling_relax.enabled:
+                    return FMU_cosimulate(params)
+                if 'ModelExchange' not in kinds:
+                    gui(self.multi_result_path_label.setText,
+                        'Implicit coupling needs a model exchange FMU, disable it or export the FMU for model exchange')
+                    return
+                gui(self.multi_result_path_label.setText,
+                    'Implicit coupling is not available for co-simulation, using model exchange')
             Tstart = 0 # The start time.
-            Tend = end_time
+            Tend = params.end_time
             
-            model = load_fmu(fmu_file)
+            model = fmu_cache.get(fmu_file, kind='ME')
 
-            model.set(set_variable, set_value)
+            model.set(params.set_names, params.set_values)
 
             model.setup_experiment(start_time = Tstart) # Set the start time to Tstart
             model.enter_initialization_mode()
@@ -483,30 +811,39 @@ class Win(QWidget,Ui_Form):
             # Values for the solution
             # Retrieve the valureferences for the values 'CFD_roo.Room_MeanT'
             try:
-                MFKey = list(EXD['MF'])
-                FMKey = list(EXD['FM'])
-                var1 = MFKey[0].split()[0]
-                var2 = FMKey[0].split()[1]
-                vref = [model.get_variable_valueref(var1)]+ \
-                        [model.get_variable_valueref(var2)]
+                var1 = exchange_map[1].mf[0].modelica
+                var2 = exchange_map[1].fm[0].targets[0].modelica
+                vref = [exchange_map[1].valuerefs[var1], exchange_map[1].valuerefs[var2]]
                 t_sol = [Tstart]
                 sol = [model.get_real(vref)]
             except:
-                self.multi_result_path_label.setText('Name Error')
+                gui(self.multi_result_path_label.setText, 'Name Error')
                 return
 
             time = Tstart
             Tnext = Tend # Used for time events
-            dt = dt_read()
+            dt = params.dt
             #value = 283.15
             
-            number = 0
+            #上一次交换的时间, 第一次交换在一个间隔之后
+            t_exchange = Tstart
             processData = 0
 
-            self.cal_progressBar.setValue(processData)
+            show_progress(processData)
+
+            def checkpoint_data():
+                #回退后继续计算所需的循环变量
+                return {'time': time, 'Tnext': Tnext, 'event_ind': event_ind,
+                        'exchange_interval': exchange_interval, 'n_sol': len(t_sol),
+                        'MF': dict(dict_MFpassValue), 'FM': dict(dict_FMpassValue)}
+            # 初始检查点
+            coupling_checkpoint.save(model, checkpoint_data())
                 
 
             while time < Tend and not model.get_event_info().terminateSimulation:
+                coupling_check()
+                exchanged = False
+                rejected = False
                 #set progress bar
                 #Compute the derivative of the previous step f(x(n), t(n))
                 dx = model.get_derivatives()
@@ -526,11 +863,17 @@ class Win(QWidget,Ui_Form):
                 x = x + h*dx 
                 model.continuous_states = x
 
+                # 两次交换之间用外推值代替Fluent结果的保持值, FMI只允许在连续时间模式中设置input, 参数保持交换值
+                if fm_predictor.order > 0 or fm_predictor.orders:
+                    inputs = exchange_map[1].inputs
+                    set_FMpassValue(model, {name: value for (name, value) in fm_predictor.predict(time).items()
+                                            if name in inputs})
+
                 # Get the event indicators at t = time
                 try:
                     event_ind_new = model.get_event_indicators()
                 except:
-                    self.multi_result_path_label.setText('Step Number Error')
+                    gui(self.multi_result_path_label.setText, 'Step Number Error')
                     return
                 
                 # Inform the model about an accepted step and check for step events
@@ -539,39 +882,47 @@ class Win(QWidget,Ui_Form):
                 # Check for time and state events
                 time_event = abs(time-Tnext) <= 1.e-10
                 state_event = True if True in ((event_ind_new>0.0) != (event_ind>0.0)) else False
+                # 交换按仿真时间计算, 参数只能在事件模式中设置, 因此交换时刻也进入事件模式
+                exchange = exchange_due(time, t_exchange, exchange_interval)
 
                 # Event handling
-                if step_event or time_event or state_event:
+                if step_event or time_event or state_event or exchange:
                     model.enter_event_mode()
                     eInfo = model.get_event_info()
                     eInfo.newDiscreteStatesNeeded = True
 
-                    if number >= communicate_time:
-
-                        processData += int(Tend/communicate_time)
-                        self.cal_progressBar.setValue(processData)
-
-                        for exd in range(len(EXD['MF'])):
-                            MFName = EXD['MF'][exd]
-                            MFName = MFName.split()
-                            toFluentName = MFName[1]
-                            ModelicaName = MFName[0]
-
-                            dict_MFpassValue[toFluentName] = model.get_real([model.get_variable_valueref(ModelicaName)])[0]
-                            """注意需要将Modelica中单位和Fluent中单位做统一，如果没统一的话，需要将从Modelica中算出的参数在Modelcia
-                               内进行相关处理后在输出"""
+                    if exchange:
 
-                            #dict_MFpassValue['supply_velocity'] = model.get_real([model.get_variable_valueref('SupplyAir.m_flow')])[0]/(1.2*0.1)
-                        
-                        boundarySetButton_click()
-                        startSimulation_click()
-                        (fM_variable, fM_data) = (list(dict_FMpassValue.keys()), list(dict_FMpassValue.values()))
+                        processData = int(100*time/Tend)
+                        show_progress(processData)
 
-                        for i in range(len(fM_variable)):
-                            model.set(fM_variable[i], fM_data[i])
+                        MF_exchanged = exchange_MFpassValue(model, time)
                         
-                        number = 0
-                    number = number + 0.001
+                        if cfd_detector.changed(dict_MFpassValue) or not dict_FMpassValue:
+                            held_FMpassValue = dict(dict_FMpassValue)
+                            step_ok = CFD_solve(params)
+                            if step_ok and coupling_relax.enabled:
+                                (step_ok, MF_exchanged) = coupling_iterate(model, held_FMpassValue, MF_exchanged,
+                                                                           time, params, t_sol, sol, vref)
+                                #重新积分后的状态与事件指示量
+                                x = model.continuous_states
+                                event_ind_new = model.get_event_indicators()
+                            if step_ok:
+                                cfd_detector.accept(dict_MFpassValue)
+                            elif coupling_checkpoint.can_retry():
+                                #本步被拒绝, 事件迭代结束后回退到上一个检查点
+                                rejected = True
+                        else:
+                            #边界条件未变化，沿用上一次的dict_FMpassValue
+                            cfd_detector.skip()
+
+                        if not rejected:
+                            set_FMpassValue(model, dict_FMpassValue)
+                            fm_predictor.add(time, dict_FMpassValue)
+
+                            #读取Modelica输出值时按其外推误差确定的下一次交换间隔
+                            exchange_interval = coupling_interval.interval
+                            exchanged = True
                     
                     # Event iteration
                     while eInfo.newDiscreteStatesNeeded:
@@ -604,30 +955,44 @@ class Win(QWidget,Ui_Form):
                 t_sol += [time]
                 sol += [model.get_real(vref)]
 
+                if rejected:
+                    # 回退FMU与交换量到上一次被接受的交换, 以减半的间隔重新计算
+                    data = coupling_checkpoint.restore(model)
+                    (time, Tnext, event_ind) = (data['time'], data['Tnext'], data['event_ind'])
+                    x = model.continuous_states
+                    del t_sol[data['n_sol']:]
+                    del sol[data['n_sol']:]
+                    dict_MFpassValue.clear()
+                    dict_MFpassValue.update(data['MF'])
+                    dict_FMpassValue.clear()
+                    dict_FMpassValue.update(data['FM'])
+                    set_FMpassValue(model, dict_FMpassValue)
+                    mf_predictor.truncate(time)
+                    fm_predictor.truncate(time)
+                    coupling_interval.truncate(time)
+                    exchange_interval = data['exchange_interval']*0.5**coupling_checkpoint.retries
+                    coupling_interval.interval = exchange_interval
+                    t_exchange = time
+                elif exchanged:
+                    t_exchange = time
+                    coupling_checkpoint.save(model, checkpoint_data())
+                    store_exchange(time, MF_exchanged, {var1: sol[-1][0], var2: sol[-1][1]})
+
             # model.get_model_variables()
             # res = model.simulate(final_time=720)
             # t = res['time']
             # x1 = res['SupplyAir.T_in']
-            mydataframe_fluent1 = pd.DataFrame({'FluxesFloorValue':fluxesFloor_tocsv})
-            mydataframe_fluent2 = pd.DataFrame({'FluxesFront': fluxesFront_tocsv})
-            mydataframe_fluent3 = pd.DataFrame({'TValue':T_tocsv})
-            mydataframe_fluent4 = pd.DataFrame({'PValue':p_tocsv})
-            mydataframe_fluent1.to_csv(os.path.join(dir_result, 'FluxesFloorV_general.csv'))
-            mydataframe_fluent2.to_csv(os.path.join(dir_result, 'FluxesFrontV_general.csv'))
-            mydataframe_fluent3.to_csv(os.path.join(dir_result, 'TV_general.csv'))
-            mydataframe_fluent4.to_csv(os.path.join(dir_result, 'P_general.csv'))
-            plt.subplot(211)
-            plt.plot(t_sol,np.array(sol)[:,0])
-            plt.subplot(212)
-            plt.plot(t_sol,np.array(sol)[:,1])
-            plt.savefig(os.path.join(dir_result, 'FMU_result.svg'))
-            image = QImage(os.path.join(dir_result, 'FMU_result.svg'))
-            self.Reslut_label.setPixmap(QPixmap.fromImage(image))
-            self.Reslut_label.setScaledContents(True)
+            save_FMU_result(t_sol, sol)
 
             
+        def get_dymola():
+            if dymola_instance[1] is None:
+                dymola_instance[1] = dymola_interface.DymolaInterface()
+            return dymola_instance[1]
+
         def simulateButton_click():#这部分代码应当由dymola.egg更改为FMU
             if use_file == '.mo':
+                dymola = get_dymola()
                 try:
                     smash_signal[0] = smash_signal[0] + 1
                     ResultValue = []
@@ -700,26 +1065,31 @@ class Win(QWidget,Ui_Form):
                     #成功模拟后输出结果部分,加保存excel功能
                     #以下代码保存excel文件
                     result_path = os.path.join(dir_result,demo_name+'.mat')
-                    r = Reader(result_path,'dymola')
+                    r = outputfile.Reader(result_path,'dymola')
 
-                    result_name = 'reslut'+str(signal_simu_time[0])
+                    result_step = signal_simu_time[0]
                     signal_simu_time[0] = signal_simu_time[0] + 1
                 
                     ResultVarName = r.varNames() #获取所有结果变量名
                     for i in range(len(ResultVarName)):
                         (t,r_ser) = r.values(ResultVarName[i])
                         ResultValue.append(r_ser[-1])
-                    mydataframe = pd.DataFrame({'VarName':ResultVarName,'Value':ResultValue})
-                    mydataframe.to_csv(os.path.join(dir_result, result_name+'.csv'))#将所有结果保存到.csv文件中，以备下次读取
+                    #将所有结果追加到dymola_run_*.h5中(未安装h5py时为.csv)，以备下次读取; 最后一步后关闭文件
+                    try:
+                        if self.dymola_store is None:
+                            self.dymola_store = open_store(os.path.join(dir_result, 'dymola_run_'+id_generator()+'.h5'),
+                                                           attrs={'model': problemName})
+                        self.dymola_store.append(result_step, result_step*step_time,
+                                                 {'result/'+name: value for (name, value) in zip(ResultVarName, ResultValue)})
+                        if result_step >= intervals:
+                            close_dymola_store()
+                    except Exception as e:
+                        self.multi_result_path_label.setText('Result store error: %s' % e)
 
                     
-                    for exd in range(len(EXD['MF'])):
-                        MFName = EXD['MF'][exd]
-                        MFName = MFName.split()
-                        toFluentName = MFName[1]
-                        ModelicaName = MFName[0]
-                        (time_a, value_a) = r.values(ModelicaName)
-                        dict_MFpassValue[toFluentName] = value_a[-1]
+                    for record in exchange_map[1].mf:
+                        (time_a, value_a) = r.values(record.modelica)
+                        dict_MFpassValue[record.fluent] = value_a[-1]*record.scale + record.offset
 
                     # (time_1,SupplyV) = r.values('SupplyAir.m_flow')
                     # (time_2,SupplyT) = r.values('SupplyAir.T_in')
@@ -743,12 +1113,67 @@ class Win(QWidget,Ui_Form):
                         return
                 
             else:
-                dymola_setName = dict_dymola_setName[1]
-                dymola_setValue = dict_dymola_setValue[1]
-                t_all = simulate_time()
-                t_c = interval()
-                file_name = self.mulitzone_line.text()
-                FMU_simulate(file_name, t_all, t_c, dymola_setName, dymola_setValue)
+                if self.coupling_run is not None:
+                    return
+                #工作线程不访问控件, 计算所需的输入在此一次读取
+                try:
+                    params = CouplingParams(fmu_file=self.mulitzone_line.text(),
+                                            end_time=simulate_time(),
+                                            interval=interval(),
+                                            dt=dt_read(),
+                                            set_names=list(dict_dymola_setName[1]),
+                                            set_values=list(dict_dymola_setValue[1]),
+                                            use_cosimulation=self.cosimCheckBox.isChecked(),
+                                            mesh_file=self.mesh_input_line.text(),
+                                            boundary=self.Boundary_select.currentText(),
+                                            boundary_T=self.boundary_TlineEdit.text().strip(),
+                                            negative_pressure=self.NegitiveP.isChecked())
+                except ValueError:
+                    self.multi_result_path_label.setText('Please check the end time, interval and time step')
+                    return
+                self.simstartButton.setEnabled(False)
+                self.toolBox.setEnabled(False)
+                self.Fluent_tool.setEnabled(False)
+                self.pauseButton.setEnabled(True)
+                self.cancelButton.setEnabled(True)
+                self.coupling_run = start_worker(
+                    lambda: FMU_simulate(params),
+                    self.cal_progressBar.setValue, coupling_finished)
+                self.coupling_run[0].start()
+
+        def coupling_finished(status):
+            #等待线程退出后再释放, 否则QThread在运行中被销毁
+            self.coupling_run[0].wait()
+            self.coupling_run = None
+            #取消或出错时也关闭结果文件, 已写入的交换步保留
+            close_run_store()
+            coupling_checkpoint.reset()
+            self.simstartButton.setEnabled(True)
+            self.toolBox.setEnabled(True)
+            self.Fluent_tool.setEnabled(True)
+            self.pauseButton.setEnabled(False)
+            self.pauseButton.setText('Pause')
+            self.cancelButton.setEnabled(False)
+            if status != 'done':
+                self.multi_result_path_label.setText('Simulation '+status)
+            if self.close_requested:
+                self.close()
+
+        def pause_click():
+            if self.coupling_run is None:
+                return
+            worker = self.coupling_run[1]
+            if worker.is_paused():
+                worker.resume()
+                self.pauseButton.setText('Pause')
+            else:
+                worker.pause()
+                self.pauseButton.setText('Resume')
+
+        def cancel_click():
+            if self.coupling_run is not None:
+                self.coupling_run[1].cancel()
+                self.multi_result_path_label.setText('Cancelling after the current CFD solve...')
 
 
         def Room1_select():
@@ -771,7 +1196,7 @@ class Win(QWidget,Ui_Form):
             try:
                 rho = 1.2
                 result_path = os.path.join(dir_result,'demo_results.mat')
-                r = Reader(result_path,'dymola')
+                r = outputfile.Reader(result_path,'dymola')
                 rcy = len(RoomSelect[1])
                 if rcy > 0:
                     for i in range(rcy):
@@ -795,9 +1220,6 @@ class Win(QWidget,Ui_Form):
         #         startSimulation_click()
         #         simulateButton_click() 
         #         boundarySetButton_click()
-            #print(fluxesFloor_tocsv,T_tocsv)
-            # mydataframe_fluent = pd.DataFrame({'FluxesFloorValue':fluxesFloor_tocsv, 'FluxesFront': fluxesFront_tocsv, 'TValue':T_tocsv})
-            # mydataframe_fluent.to_csv(os.path.join(dir_result, 'room_general.csv'))#将所有结果保存到.csv文件中，以备下次读取
 
 
         
@@ -851,6 +1273,10 @@ class Win(QWidget,Ui_Form):
         self.intervalButton.pressed.connect(interval)
 
         self.simstartButton.pressed.connect(simulateButton_click)
+        self.pauseButton.setEnabled(False)
+        self.cancelButton.setEnabled(False)
+        self.pauseButton.pressed.connect(pause_click)
+        self.cancelButton.pressed.connect(cancel_click)
 
         self.r1_checkBox.stateChanged.connect(Room1_select)
         self.r2_checkBox_2.stateChanged.connect(Room2_select)
@@ -863,14 +1289,88 @@ class Win(QWidget,Ui_Form):
         self.MFEXDconfirm.pressed.connect(ExchangeDataDistribute)
         self.FMEXDconfirm.pressed.connect(ExchangeDataDistribute)
 
-        dymola = DymolaInterface()
+        #Dymola在第一次使用.mo路径时启动
+        dymola_instance = {1: None}
+        #Dymola路径一次运行的各步结果保存在同一个HDF5文件中, 运行结束或关闭窗口时关闭
+        self.dymola_store = None
+
+        def close_dymola_store():
+            if self.dymola_store is not None:
+                self.dymola_store.close()
+                self.dymola_store = None
+        self.close_dymola_store = close_dymola_store
+
+        #在后台压缩并登记之前的运行; 超出保留策略的运行经用户确认后在后台删除
+        #sqlite连接只能在创建它的线程中使用, 因此工作线程使用单独的WorkdataManager
+        self.workdata_run = None
+        prune_candidates = {1: []}
+
+        def start_workdata_job(job, on_finished):
+            self.workdata_run = start_worker(job, lambda value: None, on_finished)
+            self.workdata_run[0].start()
+
+        def workdata_scan():
+            manager = WorkdataManager(workdata_manager.workdata, max_age_days=WORKDATA_MAX_AGE_DAYS,
+                                      max_bytes=WORKDATA_MAX_BYTES)
+            try:
+                manager.scan(exclude=[now_time])
+                prune_candidates[1] = manager.prune_candidates(keep=[now_time])
+            finally:
+                manager.close()
+
+        def workdata_delete():
+            manager = WorkdataManager(workdata_manager.workdata)
+            try:
+                for name in prune_candidates[1]:
+                    manager.delete_run(name)
+            finally:
+                manager.close()
+
+        def workdata_job_finished(status):
+            self.workdata_run[0].wait()
+            self.workdata_run = None
+            if status != 'done':
+                self.multi_result_path_label.setText('Workdata %s' % status)
+                return
+            return True
+
+        def workdata_scan_finished(status):
+            if not workdata_job_finished(status) or not prune_candidates[1]:
+                return
+            answer = QMessageBox.question(self, 'Workdata',
+                                          'The following runs exceed the retention policy of Workdata:\n%s\n\nDelete them?'
+                                          % '\n'.join(prune_candidates[1]))
+            if answer == QMessageBox.Yes:
+                start_workdata_job(workdata_delete, workdata_job_finished)
+
+        start_workdata_job(workdata_scan, workdata_scan_finished)
     
     def closeEvent(self, a0: QCloseEvent) -> None:
+        if self.coupling_run is not None:
+            #计算进行中时先取消, 待当前Fluent计算结束后再关闭窗口和Fluent
+            self.close_requested = True
+            self.coupling_run[1].cancel()
+            self.multi_result_path_label.setText('Closing after the current CFD solve...')
+            a0.ignore()
+            return
+        if self.workdata_run is not None:
+            #等待后台的Workdata压缩或删除结束
+            self.workdata_run[0].wait()
         super().closeEvent(a0)
+        self.close_dymola_store()
         fluentProcess.kill()
+        #压缩本次运行的报告文件并登记到Workdata/catalogue.sqlite
+        try:
+            workdata_manager.finish_run(now_time)
+        except Exception as e:
+            QMessageBox.warning(self, 'Workdata', 'Workdata compaction failed: %s' % e)
         return super().closeEvent(a0)
 
 
+#Workdata保留策略, None表示不限制; 超出的运行在启动时列出, 经用户确认后删除, 例如 WORKDATA_MAX_BYTES = 20e9
+WORKDATA_MAX_AGE_DAYS = None
+WORKDATA_MAX_BYTES = None
+
 if __name__=='__main__': 
     app=QApplication(sys.argv)
     #w1=Loding()
@@ -905,11 +1405,27 @@ if __name__=='__main__':
     if not folder:
         os.makedirs(dir_result)
 
+    #本次运行结束时压缩并登记; 之前的运行在窗口显示后于后台处理
+    workdata_manager = WorkdataManager(root_path+"/Workdata")
+
     # 清除之前存在的aaS*.txt文件
     aasFilePath = workPath/"aaS_FluentId.txt"
     for file in workPath.glob("aaS*.txt"):
         file.unlink()
 
+    #Fluent在窗口显示后启动, 连接在第一次使用时建立
+    fluent_connection = FluentConnection(aasFilePath)
+    fluentUnit = FluentProxy(fluent_connection, 'unit')
+    scheme = FluentProxy(fluent_connection, 'scheme')
+    ##############################################################################
+
+    app.processEvents()  # 处理主进程事件
+    #主窗口
+    window = Win()
+    window.show()
+    splash.deleteLater()
+    app.processEvents()
+
     #fluent设置
     root_name = ["AWP_ROOT222","AWP_ROOT221","AWP_ROOT212","AWP_ROOT211","AWP_ROOT202","AWP_ROOT201","AWP_ROOT192","AWP_ROOT191",
                     "AWP_ROOT182","AWP_ROOT181","AWP_ROOT172","AWP_ROOT171","AWP_ROOT162","AWP_ROOT161","AWP_ROOT152","AWP_ROOT151"]
@@ -933,29 +1449,6 @@ if __name__=='__main__':
         starterror.close()
         sys.exit()
 
-    # 监控aaS_FluentId.txt文件生成，等待corba连接
-    while True:
-        try:
-            if not aasFilePath.exists():
-                time.sleep(0.2)
-                continue
-            else:
-                if "IOR:" in aasFilePath.open("r").read():
-                    break
-        except KeyboardInterrupt:
-            sys.exit()
-    # 初始化orb环境
-    orb = CORBA.ORB_init()
-    # 获得Fluent实例单元
-    fluentUnit = orb.string_to_object(aasFilePath.open("r").read())
-    scheme = fluentUnit.getSchemeControllerInstance()
-    ##############################################################################
-
-    app.processEvents()  # 处理主进程事件
-    #主窗口
-    window = Win()
-    window.show()
-    splash.deleteLater()
     sys.exit(app.exec())
     
     
@@ -0,0 +1,100 @@
+"""
+Adaptive exchange interval for the coupling between the FMU and Fluent.
+
+The values exchanged at the last two exchanges are extrapolated linearly
+to the time of the current exchange. The difference between the prediction
+and the values that are actually exchanged estimates the error that is made
+by holding the values between exchanges. The interval is widened when the
+coupled quantities are smooth and narrowed on transients, within the bounds
+given by the user.
+"""
+import math
+
+
+class AdaptiveInterval(object):
+    """Controller for the interval between two exchanges.
+
+    :param min_ratio: Smallest interval, relative to the interval entered by the user.
+    :param max_ratio: Largest interval, relative to the interval entered by the user.
+    :param atol: Absolute tolerance of the extrapolation error.
+    :param rtol: Relative tolerance of the extrapolation error.
+    :param safety: Safety factor applied to the new interval.
+    :param max_growth: Largest factor by which the interval grows at one exchange.
+    :param max_shrink: Smallest factor by which the interval shrinks at one exchange.
+    :param enabled: Set to ``False`` to keep the interval fixed.
+    """
+
+    def __init__(self, min_ratio=0.25, max_ratio=8.0, atol=1e-3, rtol=1e-3,
+                 safety=0.9, max_growth=2.0, max_shrink=0.5, enabled=True):
+        self.min_ratio = min_ratio
+        self.max_ratio = max_ratio
+        self.atol = atol
+        self.rtol = rtol
+        self.safety = safety
+        self.max_growth = max_growth
+        self.max_shrink = max_shrink
+        self.enabled = enabled
+        self.reset(1)
+
+    def reset(self, interval):
+        """Start a new run with the initial ``interval``."""
+        self.base = interval
+        self.interval = interval
+        self.error = 0.0
+        self._history = []
+        self._last_interval = interval
+
+    def truncate(self, t):
+        """Remove the exchanges after time ``t``, for example after a rollback."""
+        self._history = [h for h in self._history if h[0] <= t]
+
+    def _bounded(self, interval):
+        return min(max(interval, self.min_ratio * self.base), self.max_ratio * self.base)
+
+    def estimate_error(self, t, values):
+        """Return the normalized extrapolation error of ``values`` at time ``t``.
+
+        :param t: Time of the exchange.
+        :param values: Dictionary with the exchanged values.
+
+        Returns ``None`` if fewer than two previous exchanges are known.
+        """
+        if len(self._history) < 2:
+            return None
+        (t1, v1), (t2, v2) = self._history[-2:]
+        if t2 <= t1:
+            return None
+        err = 0.0
+        for name, value in values.items():
+            if name not in v1 or name not in v2:
+                continue
+            predicted = v2[name] + (v2[name] - v1[name]) * (t - t2) / (t2 - t1)
+            err = max(err, abs(value - predicted) / (self.atol + self.rtol * abs(value)))
+        return err
+
+    def update(self, t, values):
+        """Register the exchange at time ``t`` and return the next interval.
+
+        :param t: Time of the exchange.
+        :param values: Dictionary with the exchanged values.
+
+        An exchange at the same time as the last one replaces it, as in the
+        iterations of the implicit coupling, and the interval is computed again.
+        """
+        if self._history and self._history[-1][0] == t:
+            self._history.pop()
+            self.interval = self._last_interval
+        self._last_interval = self.interval
+        err = self.estimate_error(t, values)
+        # The third sample is kept for an exchange that is repeated
+        self._history = self._history[-2:] + [(t, dict(values))]
+        if not self.enabled or err is None:
+            return self.interval
+        self.error = err
+        # The error of the linear extrapolation is of second order in the interval
+        if err == 0:
+            factor = self.max_growth
+        else:
+            factor = min(self.max_growth, max(self.max_shrink, self.safety / math.sqrt(err)))
+        self.interval = self._bounded(self.interval * factor)
+        return self.interval
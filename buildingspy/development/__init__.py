@@ -3,6 +3,8 @@ This module contains the classes
 
 - *refactor*, a module that assists in refactoring Modelica classes,
 - *Tester* that runs the unit tests of the `Buildings` library,
+- *DependencyIndex* that finds the classes that are affected by changed `.mo` files,
+- *SimulationCache* that stores the results of regression tests whose inputs did not change,
 - *Validator* that validates the html code of the info section of the `.mo` files, and
 - *IBPSA* that synchronizes Modelica libraries with the `IBPSA` library.
 - *ErrorDictionary* that contains information about possible error strings.
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  This module provides the class :class:`DependencyIndex` that records which
+  `.mo` files of a Modelica library use which classes, and the functions
+  :func:`get_changed_files_git` and :func:`get_changed_files_since` that
+  list the files that changed.
+
+  Together, they are used by
+  :func:`buildingspy.development.regressiontest.Tester.setChangedFiles`
+  to only run the regression tests of the models that are affected by a change.
+
+  Class references are found in the `extends` clauses, the component and short
+  class declarations, modifiers and imports, after removing comments and
+  strings. Names are resolved in the enclosing scopes as in Modelica.
+  The resolution is conservative: an unqualified name that is also the name of a class
+  in an enclosing package is taken as a reference to that class.
+  The index also records the files of the library that are referenced by
+  ``modelica://`` URIs, such as data files read with ``loadResource``.
+"""
+import os
+import re
+import subprocess
+from collections import defaultdict
+
+__all__ = ["DependencyIndex", "get_changed_files_git", "get_changed_files_since"]
+
+_COMMENT_OR_STRING = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\])*"', re.DOTALL)
+_NAME = re.compile(r'\.?[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*')
+_CLASS_DECLARATION = re.compile(
+    r'\b(?:model|block|package|record|function|connector|type|class)\s+([A-Za-z_]\w*)')
+_WITHIN = re.compile(r'\bwithin\s*[\w.]*\s*;')
+_IMPORT = re.compile(r'\bimport\s+(?:([A-Za-z_]\w*)\s*=\s*)?([\w.]+?)(\.\*)?\s*;')
+# URI of a resource, but not of a class such as modelica://MyLibrary.MyModel
+_URI = re.compile(r'modelica://([A-Za-z_][\w.]*)/([^"\\\s]+)')
+
+_KEYWORDS = frozenset([
+    'algorithm', 'and', 'annotation', 'block', 'break', 'class', 'connect', 'connector',
+    'constant', 'constrainedby', 'der', 'discrete', 'each', 'else', 'elseif', 'elsewhen',
+    'encapsulated', 'end', 'enumeration', 'equation', 'expandable', 'extends', 'external',
+    'false', 'final', 'flow', 'for', 'function', 'if', 'import', 'impure', 'in', 'initial',
+    'inner', 'input', 'loop', 'model', 'not', 'operator', 'or', 'outer', 'output', 'package',
+    'parameter', 'partial', 'protected', 'public', 'pure', 'record', 'redeclare',
+    'replaceable', 'return', 'stream', 'then', 'true', 'type', 'when', 'while', 'within'])
+
+
+def _strip_comments_and_strings(text):
+    return _COMMENT_OR_STRING.sub(' ', text)
+
+
+def _parse_mo_file(file_name):
+    """ Return ``(declared, imports, wildcard, names, uris)`` of the `.mo` file ``file_name``.
+
+    ``declared`` is the set of the class names declared in the file,
+    ``imports`` maps import aliases to full names, ``wildcard`` lists the packages
+    imported with ``.*``, ``names`` is the set of all other (possibly qualified) names,
+    and ``uris`` is the set of the ``(class name, path)`` of the ``modelica://`` URIs.
+    """
+    with open(file_name, mode="r", encoding="utf-8-sig") as fil:
+        text = fil.read()
+    uris = set(_URI.findall(text))
+    # The within clause names the enclosing package, which is not a dependency.
+    code = _WITHIN.sub(' ', _strip_comments_and_strings(text))
+    declared = set(_CLASS_DECLARATION.findall(code))
+    imports = {}
+    wildcard = []
+    for (alias, name, star) in _IMPORT.findall(code):
+        if star:
+            wildcard.append(name)
+        else:
+            imports[alias if alias else name.split('.')[-1]] = name
+    names = set()
+    for name in _NAME.findall(_IMPORT.sub(' ', code)):
+        if name.startswith('.'):
+            # Member access such as a.b.c, or a global name .A.B
+            continue
+        if name.split('.')[0] in _KEYWORDS:
+            continue
+        names.add(name)
+    return (declared, imports, wildcard, names, uris)
+
+
+class DependencyIndex(object):
+    """ Index of the dependencies between the `.mo` files of a Modelica library.
+
+    :param lib_home: Home directory of the library, i.e., the directory that contains
+                     the top-level ``package.mo``.
+
+    Usage::
+
+        >>> import os
+        >>> from buildingspy.development.dependency_index import DependencyIndex
+        >>> idx = DependencyIndex(os.path.join("buildingspy", "tests", "MyModelicaLibrary"))
+        >>> idx.class_of_file(os.path.join(idx.lib_home, "Examples", "MyStep.mo"))
+        'MyModelicaLibrary.Examples.MyStep'
+        >>> sorted(idx.affected_classes([os.path.join(idx.lib_home, "MyStep.mo")]))
+        ['MyModelicaLibrary.Examples.MyStep', 'MyModelicaLibrary.MyStep']
+
+    """
+
+    def __init__(self, lib_home):
+        self.lib_home = os.path.abspath(lib_home)
+        self._library_name = os.path.basename(self.lib_home)
+        # Class name of each .mo file, and file of each class name
+        self._file_class = {}
+        self._class_file = {}
+        # Files that each file uses, and files that use each file
+        self._uses = {}
+        self._used_by = defaultdict(set)
+        # Files and directories that each file references with a modelica:// URI
+        self._resources = {}
+        self._build()
+
+    def _class_name(self, file_name):
+        rel = os.path.relpath(file_name, os.path.dirname(self.lib_home))
+        parts = rel[:-len('.mo')].split(os.sep)
+        if parts[-1] == 'package':
+            parts = parts[:-1]
+        return '.'.join(parts)
+
+    def _build(self):
+        parsed = {}
+        for (root, _, files) in os.walk(self.lib_home):
+            for fil in files:
+                if fil.endswith('.mo'):
+                    file_name = os.path.join(root, fil)
+                    cla = self._class_name(file_name)
+                    self._file_class[file_name] = cla
+                    self._class_file[cla] = file_name
+                    parsed[file_name] = _parse_mo_file(file_name)
+        # Classes that are declared inside a file, such as the types in Types.mo
+        known = set(self._class_file)
+        for (file_name, (declared, _, _, _, _)) in parsed.items():
+            cla = self._file_class[file_name]
+            for nam in declared:
+                if nam != cla.split('.')[-1]:
+                    known.add(cla + '.' + nam)
+        self._known = known
+
+        for (file_name, (_, imports, wildcard, names, uris)) in parsed.items():
+            cla = self._file_class[file_name]
+            self._resources[file_name] = set(filter(None, (self._resource_path(*uri) for uri in uris)))
+            scopes = cla.split('.')
+            uses = set()
+            for name in names:
+                target = self._resolve(name, scopes, imports, wildcard)
+                if target is not None:
+                    uses.add(target)
+            uses.discard(file_name)
+            self._uses[file_name] = uses
+            for dep in uses:
+                self._used_by[dep].add(file_name)
+
+    def _file_of(self, name):
+        """ Return the file that defines the class ``name`` or its longest enclosing class."""
+        parts = name.split('.')
+        for i in range(len(parts), 0, -1):
+            file_name = self._class_file.get('.'.join(parts[:i]))
+            if file_name is not None:
+                return file_name
+        return None
+
+    def _resource_path(self, class_name, path):
+        """ Return the file or directory of the library that the URI ``modelica://class_name/path``
+            references, or ``None`` if it is not in the library.
+        """
+        if class_name.split('.')[0] != self._library_name:
+            return None
+        file_name = self._class_file.get(class_name)
+        if file_name is None:
+            return None
+        full = os.path.normpath(os.path.join(os.path.dirname(file_name), *path.split('/')))
+        if full != self.lib_home and not full.startswith(self.lib_home + os.sep):
+            return None
+        return full
+
+    def _resolve(self, name, scopes, imports, wildcard):
+        """ Return the file of the library that defines ``name``, or ``None``."""
+        (first, _, rest) = name.partition('.')
+        if first in imports:
+            full = imports[first] + ('.' + rest if rest else '')
+            return self._file_of(full) if full.split('.')[0] == self._library_name else None
+        # Look up the first identifier in the enclosing scopes, from the innermost one.
+        for i in range(len(scopes), 0, -1):
+            candidate = '.'.join(scopes[:i]) + '.' + first
+            if candidate in self._known:
+                return self._file_of('.'.join(scopes[:i]) + '.' + name)
+        for pac in wildcard:
+            candidate = pac + '.' + first
+            if candidate in self._known:
+                return self._file_of(pac + '.' + name)
+        if first == self._library_name and rest:
+            return self._file_of(name)
+        return None
+
+    def class_of_file(self, file_name):
+        """ Return the class name of the `.mo` file ``file_name``, or ``None``."""
+        return self._file_class.get(os.path.abspath(file_name))
+
+    def file_of_class(self, class_name):
+        """ Return the `.mo` file that defines ``class_name``, or ``None``."""
+        return self._file_of(class_name)
+
+    def uses(self, file_name):
+        """ Return the set of `.mo` files that ``file_name`` uses directly."""
+        return set(self._uses.get(os.path.abspath(file_name), ()))
+
+    def required_files(self, file_names):
+        """ Return the set of `.mo` files that are, or are used directly or transitively by, one of ``file_names``.
+
+        :param file_names: List of files. Files that are not `.mo` files of the library are ignored.
+        """
+        todo = [os.path.abspath(f) for f in file_names]
+        todo = [f for f in todo if f in self._file_class]
+        required = set(todo)
+        while todo:
+            file_name = todo.pop()
+            for dep in self._uses.get(file_name, ()):
+                if dep not in required:
+                    required.add(dep)
+                    todo.append(dep)
+        return required
+
+    def package_files(self, file_name):
+        """ Return the set of `.mo` files of the package that encloses ``file_name``.
+
+        :param file_name: Name of a file of the library, which need not exist,
+                          such as a deleted `.mo` file or a ``package.order`` file.
+
+        The package is the innermost directory of ``file_name`` that contains a ``package.mo``.
+        For files outside of all packages except the library itself, such as the files in
+        ``Resources``, all `.mo` files of the library are returned.
+        """
+        directory = os.path.dirname(os.path.abspath(file_name))
+        while directory.startswith(self.lib_home + os.sep) and \
+                not os.path.isfile(os.path.join(directory, 'package.mo')):
+            directory = os.path.dirname(directory)
+        return set(f for f in self._file_class if f.startswith(directory + os.sep))
+
+    def resources(self, file_names):
+        """ Return the set of the files of the library that are referenced by a ``modelica://`` URI in ``file_names``.
+
+        :param file_names: List of `.mo` files, such as the files returned by :func:`required_files`.
+
+        A URI of a directory, such as a directory with C sources, references all files in the directory.
+        The URI of a file that does not exist is returned as well, so that adding it
+        can be detected.
+        """
+        resources = set()
+        for file_name in file_names:
+            for path in self._resources.get(os.path.abspath(file_name), ()):
+                if os.path.isdir(path):
+                    for (root, _, files) in os.walk(path):
+                        resources.update(os.path.join(root, fil) for fil in files)
+                else:
+                    resources.add(path)
+        return resources
+
+    def affected_files(self, changed_files):
+        """ Return the set of `.mo` files that are, or transitively depend on, one of ``changed_files``.
+
+        :param changed_files: List of changed files. Files that are not `.mo` files of
+                              the library are ignored.
+        """
+        todo = [os.path.abspath(f) for f in changed_files]
+        todo = [f for f in todo if f in self._file_class]
+        affected = set(todo)
+        while todo:
+            file_name = todo.pop()
+            for dep in self._used_by.get(file_name, ()):
+                if dep not in affected:
+                    affected.add(dep)
+                    todo.append(dep)
+        return affected
+
+    def affected_classes(self, changed_files):
+        """ Return the set of class names whose `.mo` files are affected by ``changed_files``."""
+        return set(self._file_class[f] for f in self.affected_files(changed_files))
+
+
+def get_changed_files_git(lib_home, reference="HEAD"):
+    """ Return the absolute names of the files of ``lib_home`` that differ from the git ``reference``.
+
+    :param lib_home: Home directory of the library.
+    :param reference: Git commit, branch or tag, such as ``origin/master``.
+
+    Committed and uncommitted changes, as well as untracked files, are included.
+    """
+    def _git(args):
+        out = subprocess.check_output(['git'] + args, cwd=lib_home, universal_newlines=True)
+        return [lin for lin in out.splitlines() if lin.strip()]
+
+    top = _git(['rev-parse', '--show-toplevel'])[0]
+    files = _git(['diff', '--name-only', reference, '--', '.'])
+    files += _git(['ls-files', '--others', '--exclude-standard', '--full-name', '--', '.'])
+    return sorted(set(os.path.abspath(os.path.join(top, f)) for f in files))
+
+
+def get_changed_files_since(lib_home, timestamp):
+    """ Return the absolute names of the files of ``lib_home`` that were modified after ``timestamp``.
+
+    :param lib_home: Home directory of the library.
+    :param timestamp: Time in seconds since the epoch, such as the time of the last test run.
+    """
+    changed = []
+    for (root, _, files) in os.walk(lib_home):
+        for fil in files:
+            file_name = os.path.join(root, fil)
+            if os.path.getmtime(file_name) > timestamp:
+                changed.append(os.path.abspath(file_name))
+    return sorted(changed)
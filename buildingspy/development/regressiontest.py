@@ -106,6 +106,574 @@ def _print_dictionary(msg, dic, exit=False):
         sys.exit(1)
 
 
+# Minimum number of changed .mos files for which the discovery uses a process pool.
+_MIN_PARALLEL_DISCOVERY = 32
+
+# Minimum number of test cases for which _checkReferencePoints uses a process pool.
+_MIN_PARALLEL_VERIFICATION = 2
+
+# Minimum number of changed .mo files for which printNumberOfClasses uses a process pool.
+_MIN_PARALLEL_CLASS_COUNT = 500
+
+# Kinds of classes that are counted by printNumberOfClasses.
+_CLASS_KINDS = ("model", "block", "function")
+
+# Interval in seconds at which the statistics of the worker processes are read.
+_STATISTICS_POLL_INTERVAL = 2
+
+# Interval in seconds at which the resident memory of the worker processes is sampled.
+_MEMORY_POLL_INTERVAL = 0.5
+
+
+def _set_attribute_value(line, keyword, dat):
+    """ Set the value of an attribute from the `.mos` file.
+
+        This function will remove leading and ending quotes.
+
+        :param line: The line that contains the keyword and the value.
+        :param keyword: The keyword
+        :param dat: The data dictionary to which dat[keyword] = value will be written.
+
+    """
+    line = re.sub(' ', '', line)
+    pos = line.find(keyword)
+    if pos > -1:
+        posEq = line.find('=', pos)
+        posComma = line.find(',', pos)
+        posBracket = line.find(')', pos)
+        posEnd = min(posComma, posBracket)
+        if posEnd < 0:
+            posEnd = max(posComma, posBracket)
+        # Ensure that keyword is directly located before the next = sign
+        if posEq == pos + len(keyword):
+            entry = line[posEq + 1:posEnd]
+            dat[keyword] = re.sub(r'^"|"$', '', entry)
+    return
+
+
+def _parse_mos_file(args):
+    """ Parse one `.mos` file of the regression tests.
+
+    :param args: Tuple ``(lib_home, root, mosFil, tool)`` with the home directory of the library,
+                 the directory and the name of the `.mos` file, and the name of the Modelica tool.
+    :return: Tuple ``(dat, errors, dependencies)``, where ``dat`` is the entry of the
+             data dictionary, or ``None`` if the file does not run a test, ``errors`` is the list
+             of error messages, and ``dependencies`` is the list of files that were read.
+
+    .. note:: This method is outside the class definition to
+              allow parallel computing.
+    """
+    (lib_home, root, mosFil, tool) = args
+    errors = []
+    dependencies = [os.path.join(root, mosFil)]
+    dat = {'ScriptFile': os.path.join(
+        root[len(os.path.join(lib_home, 'Resources', 'Scripts', 'Dymola')) + 1:], mosFil)}
+    # ScriptFile is something like Controls/Continuous/Examples/LimPIDWithReset.mos
+    # JModelica CI testing needs files below 140 characters, which includes Buildings.
+    # Hence, write warning if a file is equal or longer than 140-9=131 characters.
+    if len(dat['ScriptFile']) >= 131:
+        errors.append(
+            """File {} is {}-character long. Reduce it to maximum of 130 characters.""".format(
+                dat['ScriptFile'], len(
+                    dat['ScriptFile'])))
+    # _check_reference_result_file_name(dat['ScriptFile'])
+    # open the mos file and read its content.
+    # Path and name of mos file without 'Resources/Scripts/Dymola'
+    with open(os.path.join(root, mosFil), mode="r", encoding="utf-8-sig") as fMOS:
+        Lines = fMOS.readlines()
+
+    # Remove white spaces
+    for i in range(len(Lines)):
+        Lines[i] = Lines[i].replace(' ', '')
+
+    # Set some attributes in the Data object
+    dat['dymola'] = {
+        'exportFMU': False,
+        'translate': False,
+        'simulate': False
+    }  # May be switched to True below
+
+    for lin in Lines:
+        # Add the model name to the dictionary.
+        # This is needed to export the model as an FMU.
+        # Also, set the flag mustSimulate to True.
+        simCom = re.search(r'simulateModel\(\s*".*"', lin)
+        if simCom is not None:
+            dat['dymola']['translate'] = True
+            dat['dymola']['simulate'] = True
+            modNam = re.sub(r'simulateModel\(\s*"', '', simCom.string)
+            modNam = modNam[0:modNam.index('"')]
+            dat['model_name'] = modNam
+            dat['dymola']['TranslationLogFile'] = modNam + ".translation.log"
+            # Not all .mos files list startTime and stopTime.
+            # Hence, set the default values, which may be overridden just below.
+            dat["startTime"] = 0
+            dat["stopTime"] = 1
+        # parse startTime and stopTime, if any
+        for attr in ["startTime", "stopTime"]:
+            _set_attribute_value(lin, attr, dat)
+        # Check if this model need to be translated as an FMU.
+        if (not dat['dymola']['exportFMU']) and ("translateModelFMU" in lin):
+            dat['dymola']['exportFMU'] = True
+            dat['dymola']['translate'] = False
+            dat['dymola']['simulate'] = False
+        if dat['dymola']['exportFMU']:
+            for attr in ["modelToOpen", "modelName"]:
+                _set_attribute_value(lin, attr, dat['dymola'])
+
+    # We are finished iterating over all lines of the .mos
+
+    # Dymola uses in translateModelFMU the syntax
+    # modelName=... but our dictionary uses model_name
+    if dat['dymola']['exportFMU']:
+        if 'modelToOpen' in dat['dymola'] and len(dat['dymola']['modelToOpen']) > 0:
+            dat['model_name'] = dat['dymola']['modelToOpen']
+        if 'model_name' not in dat and dat['dymola']['modelName'] in dat:
+            dat["model_name"] = dat['dymola']['modelName']
+        if dat['dymola']['modelName'] in dat:
+            # This is not needed anymore
+            del dat['dymola']['modelName']
+
+    # Some files like plotFan.mos has neither a simulateModel
+    # nor a translateModelFMU command.
+    # These must not be added to the data array. Hence we skip further processing.
+    if dat['dymola']['translate'] == False and dat['dymola']['exportFMU'] == False:
+        return (None, errors, dependencies)
+
+    # The .mos script allows modelName="", hence
+    # we set the model name to be the entry of modelToOpen
+#    elif "model_name" not in dat['dymola'] and "modelToOpen" in dat['dymola']:
+#        dat['model_name'] = dat['dymola']['modelToOpen']
+
+#        # Make sure model_name is set
+#        if 'model_name' not in dat or dat['model_name'] == '':
+#            msg = f"Failed to set model_name for {os.path.join(root, mosFil)}"
+#            raise ValueError(msg)
+    dat['dymola']['TranslationLogFile'] = dat['model_name'] + ".translation.log"
+    # Get tolerance from mo file. This is used to set the tolerance
+    # for OpenModelica and OPTIMICA.
+    # Only get the tolerance for the models that need to be simulated,
+    # because those that are only exported as FMU don't need this setting.
+    if not dat['dymola']['exportFMU']:
+        # The tolerance is read from the .mo file, which hence is a dependency of the result.
+        dependencies.append(os.path.join(
+            lib_home, '..', dat['model_name'].replace('.', os.path.sep) + ".mo"))
+        try:
+            dat['tolerance'] = Tester.get_tolerance(
+                lib_home, dat['model_name'])
+        except Exception as e:
+            errors.append(str(e))
+            dat['tolerance'] = None
+    # For FMU export, if model_name="", then Dymola uses the
+    # Modelica class name, with "." replaced by "_".
+    # If the Modelica class name consists of "_", then they
+    # are replaced by "_0".
+    # Hence, we update dat['model_name'] if needed.
+    if dat['dymola']['exportFMU']:
+        # Strip quotes from model_name and modelToOpen
+        dat['dymola']['FMUName'] = dat['model_name'].strip('"')
+        dat['dymola']['modelToOpen'] = dat['dymola']['modelToOpen'].strip('"')
+        # Update the name of the FMU if model_name is "" in .mos file.
+        if len(dat['dymola']['FMUName']) == 0:
+            dat['dymola']['FMUName'] = dat['dymola']['modelToOpen']
+        # Update the FMU name, for example to change
+        # Buildings.Fluid.FMI.Examples.FMUs.IdealSource_m_flow to
+        # Buildings_Fluid_FMI_Examples_FMUs_IdealSource_0m_0flow
+        dat['dymola']['FMUName'] = dat['dymola']['FMUName'].replace(
+            "_", "_0").replace(".", "_")
+        dat['dymola']['FMUName'] = dat['dymola']['FMUName'] + ".fmu"
+    # Plot variables are only used for those models that need to be simulated.
+    if not dat['dymola']['exportFMU']:
+        plotVars = []
+        iLin = 0
+        for lin in Lines:
+            iLin = iLin + 1
+            try:
+                y = Tester.get_plot_variables(lin)
+                if y is not None:
+                    plotVars.append(y)
+            except (AttributeError, ValueError) as e:
+                s = "%s, line %s, could not be parsed.\n" % (mosFil, iLin)
+                s += "The problem occurred at the line below:\n"
+                s += "%s\n" % lin
+                s += "Make sure that each assignment of the plot command is on one line.\n"
+                errors.append(s)
+                # Store the error, but keep going to check other lines and files
+                pass
+        if len(plotVars) == 0:
+            s = "%s does not contain any plot command.\n" % mosFil
+            s += "You need to add a plot command to include its\n"
+            s += "results in the regression tests.\n"
+            errors.append(s)
+        # Store grouped plot variables without duplicates.
+        # (Duplicates happen when the same y variables are plotted against
+        # different x variables.)
+        dat['ResultVariables'] = []
+        for v_i in plotVars:
+            if v_i not in dat['ResultVariables']:
+                dat['ResultVariables'].append(v_i)
+        # Create the result file name.
+        if tool == 'dymola':
+            # For Dymola, this is not the name in the .mos file (as these may not be unique).
+            # Rather, we set the result file name to be the mos file name with
+            # .mat extension
+            matFil = f"{dat['model_name']}.mat"
+        elif tool == 'openmodelica':
+            matFil = f"{dat['model_name']}_res.mat"
+        else:
+            matFil = '{}_result.mat'.format(
+                re.sub(r'\.', '_', dat['model_name']))
+        # Some *.mos file only contain plot commands, but no simulation.
+        # Hence, if 'resultFile=' could not be found, try to get the file that
+        # is used for plotting.
+        # cf. BUG
+        if len(matFil) == 0:
+            for lin in Lines:
+                if 'filename=\"' in lin:
+                    # Note that the filename entry already has the .mat
+                    # extension.
+                    matFil = re.search(
+                        r'(?<=filename=\")[a-zA-Z0-9_\.]+', lin).group()
+                    break
+        if len(matFil) == 0:
+            raise ValueError('Did not find *.mat file in ' + mosFil)
+        dat['ResultFile'] = matFil
+    return (dat, errors, dependencies)
+
+
+def _class_kind(file_name):
+    """ Return the kind of the class of the `.mo` file ``file_name``, or ``''``.
+
+    The kind is ``'model'``, ``'block'`` or ``'function'`` if the first line starts
+    with ``within`` and the second line starts with the kind.
+
+    .. note:: This method is outside the class definition to
+              allow parallel computing.
+    """
+    with open(file_name, mode="rt", encoding="utf-8-sig") as filObj:
+        line0 = filObj.readline().strip()
+        if line0.startswith("within"):
+            line1 = filObj.readline().strip()
+            for key in _CLASS_KINDS:
+                if line1.startswith(key):
+                    return key
+    return ''
+
+
+def _file_signature(file_name):
+    """ Return ``[mtime_ns, size]`` of ``file_name``, or ``None`` if it does not exist."""
+    try:
+        st = os.stat(file_name)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _file_digest(file_name):
+    """ Return the sha1 hash of ``file_name``, or ``None`` if it does not exist."""
+    import hashlib
+    try:
+        with open(file_name, 'rb') as fil:
+            return hashlib.sha1(fil.read()).hexdigest()
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest():
+    """ Return the sha1 hash of this module, which parses the files that the discovery cache stores."""
+    return _file_digest(__file__)
+
+
+class _DiscoveryCache(object):
+    """ Persistent cache of the parsed `.mos` files.
+
+    :param file_name: Name of the JSON file, or ``None`` to not cache anything.
+    :param tool: Name of the Modelica tool, as the result file names depend on it.
+
+    An entry is valid as long as the `.mos` file and the `.mo` file from which the
+    tolerance is read are unchanged. A file whose modification time changed,
+    for example after a checkout, is compared by its hash.
+    The kinds of the classes of the `.mo` files, see :func:`_class_kind`, are
+    cached for all tools and are valid as long as the file is not modified.
+
+    The whole cache is discarded if it cannot be read, or if it has been written
+    by another version of this module. The entries are copied, as the
+    :class:`Tester` modifies the data of the test cases.
+    """
+    _VERSION = 1
+
+    def __init__(self, file_name, tool):
+        self._file_name = file_name
+        self._tool = tool
+        self._entries = {}
+        self._classes = {}
+        self._modified = False
+        self._content = {'version': self._VERSION, 'source': _source_digest()}
+        if file_name is not None and os.path.exists(file_name):
+            try:
+                with open(file_name, mode="r", encoding="utf-8") as fil:
+                    content = json.load(fil)
+                if (isinstance(content, dict) and content.get('version') == self._VERSION
+                        and content.get('source') == _source_digest()):
+                    self._content = content
+                    self._entries = content.get(tool, {})
+                    self._classes = content.get('classes', {})
+            except (OSError, ValueError):
+                # A corrupt cache is rebuilt.
+                pass
+
+    def get(self, mos_file):
+        """ Return the cached result of :func:`_parse_mos_file` for ``mos_file``, or ``None``."""
+        import copy
+        entry = self._entries.get(mos_file)
+        if entry is None:
+            return None
+        try:
+            for dep in entry['files']:
+                (dep_name, signature, digest) = dep
+                current = _file_signature(dep_name)
+                if current == signature:
+                    continue
+                if current is None or signature is None or _file_digest(dep_name) != digest:
+                    return None
+                # The file was touched, but its content is unchanged.
+                dep[1] = current
+                self._modified = True
+            return (copy.deepcopy(entry['dat']), list(entry['errors']), [dep[0] for dep in entry['files']])
+        except (KeyError, TypeError, ValueError):
+            # A corrupt entry is parsed again.
+            return None
+
+    def put(self, mos_file, result):
+        """ Store the ``result`` of :func:`_parse_mos_file` for ``mos_file``."""
+        import copy
+        (dat, errors, dependencies) = result
+        self._entries[mos_file] = {
+            'dat': copy.deepcopy(dat),
+            'errors': list(errors),
+            'files': [[f, _file_signature(f), _file_digest(f)] for f in dependencies]}
+        self._modified = True
+
+    def get_class_kind(self, mo_file):
+        """ Return the cached result of :func:`_class_kind` for ``mo_file``, or ``None``."""
+        entry = self._classes.get(mo_file)
+        if entry is None or entry[0] != _file_signature(mo_file):
+            return None
+        return entry[1]
+
+    def put_class_kind(self, mo_file, kind):
+        """ Store the ``kind`` of the class of ``mo_file``."""
+        self._classes[mo_file] = [_file_signature(mo_file), kind]
+        self._modified = True
+
+    def save(self):
+        """ Write the cache if it has been modified."""
+        if self._file_name is None or not self._modified:
+            return
+        content = self._content
+        content[self._tool] = self._entries
+        content['classes'] = self._classes
+        dir_name = os.path.dirname(self._file_name)
+        tmp_file = "{}.{}.tmp".format(self._file_name, os.getpid())
+        try:
+            if dir_name:
+                os.makedirs(dir_name, exist_ok=True)
+            with open(tmp_file, mode="w", encoding="utf-8") as fil:
+                json.dump(content, fil)
+            os.replace(tmp_file, self._file_name)
+        except OSError:
+            # The cache is optional, for example if another user owns the directory.
+            return
+        self._modified = False
+
+
+class _StatisticsCollector(object):
+    """ Incremental reader of the statistics files of the worker processes.
+
+    :param file_names: Names of the statistics files.
+
+    Each worker appends one line with a JSON object per test case to its file,
+    see :func:`Tester._write_runscript_dymola`. Each call of :func:`read` returns the
+    test cases whose lines have been completed since the previous call.
+    """
+
+    def __init__(self, file_names):
+        self._offsets = dict((f, 0) for f in file_names)
+
+    def missing_files(self):
+        """ Return the list of statistics files that do not exist."""
+        return [f for f in self._offsets if not os.path.exists(f)]
+
+    def read(self):
+        """ Return the list of new test cases.
+
+        A ``ValueError`` is raised if a line is not a valid JSON object.
+        """
+        records = []
+        for (file_name, offset) in self._offsets.items():
+            if not os.path.exists(file_name):
+                continue
+            with open(file_name, mode="rb") as fil:
+                fil.seek(offset)
+                data = fil.read()
+            # A line whose newline has not yet been written is read by the next call.
+            end = data.rfind(b"\n")
+            if end < 0:
+                continue
+            self._offsets[file_name] = offset + end + 1
+            text = data[:end + 1].decode("utf-8")
+            if offset == 0:
+                text = text.lstrip("\ufeff")
+            for lin in text.splitlines():
+                if lin.strip():
+                    try:
+                        records.append(json.loads(lin))
+                    except ValueError as e:
+                        raise ValueError("Decoding '%s' failed: %s" % (file_name, e))
+        return records
+
+
+class _MessageRecorder(object):
+    """ Reporter that records the messages, so that they can be written later
+    in the order in which the test cases are listed.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def writeError(self, message):
+        self.messages.append(('writeError', message))
+
+    def writeWarning(self, message):
+        self.messages.append(('writeWarning', message))
+
+    def writeOutput(self, message):
+        self.messages.append(('writeOutput', message))
+
+
+def _resident_memory(directories):
+    """ Return, for each of ``directories``, the resident memory in bytes of all processes
+    whose working directory is in this directory.
+
+    The memory is read with ``psutil`` if it is installed, and otherwise from ``/proc``.
+    If neither is available, ``None`` is returned.
+    """
+    rss = [0] * len(directories)
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        for proc in psutil.process_iter(['cwd']):
+            cwd = proc.info['cwd']
+            if not cwd:
+                # The process belongs to another user.
+                continue
+            for (i, d) in enumerate(directories):
+                if cwd == d or cwd.startswith(d + os.sep):
+                    try:
+                        rss[i] += proc.memory_info().rss
+                    except psutil.Error:
+                        # The process terminated.
+                        pass
+                    break
+        return rss
+    if not os.path.isdir('/proc'):
+        return None
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            cwd = os.readlink(os.path.join('/proc', pid, 'cwd'))
+            for (i, d) in enumerate(directories):
+                if cwd == d or cwd.startswith(d + os.sep):
+                    with open(os.path.join('/proc', pid, 'statm'), mode="r") as fil:
+                        rss[i] += int(fil.read().split()[1]) * page_size
+                    break
+        except (OSError, ValueError, IndexError):
+            # The process terminated, or belongs to another user.
+            continue
+    return rss
+
+
+class _ResourceMonitor(object):
+    """ Measures the wall time and the peak resident memory of the test cases while they run.
+
+    :param directories: Working directory of each worker process.
+    :param lanes: For each worker process, the list of the script files of its test cases,
+                  in the order in which they run.
+
+    Each worker process runs its test cases one after the other. The memory of all
+    processes whose working directory is in the directory of a worker is attributed to
+    the test case that this worker runs. Test cases that complete between two calls of
+    :func:`sample` share the elapsed time.
+    :func:`sample` is called every ``_MEMORY_POLL_INTERVAL`` seconds, hence the peak
+    of a test case is the largest of these samples, and a shorter peak may be missed.
+    As the completed test cases are only read every ``_STATISTICS_POLL_INTERVAL`` seconds,
+    the memory of the first seconds of a test case may be attributed to the previous one.
+    If the memory cannot be measured, see :func:`_resident_memory`, ``memory_measured``
+    is ``False`` and only the wall time is recorded.
+    """
+
+    def __init__(self, directories, lanes):
+        self._directories = [os.path.realpath(d) for d in directories]
+        self._lanes = lanes
+        self._position = [0] * len(lanes)
+        self._start = [time.time()] * len(lanes)
+        self._peak = [0] * len(lanes)
+        # Measured resources of each completed test case
+        self.resources = {}
+        self.memory_measured = True
+
+    def sample(self, finished):
+        """ Record the test cases in ``finished`` that completed, and sample the memory.
+
+        :param finished: Set of the script files of the test cases that have completed.
+        """
+        now = time.time()
+        for (i, lane) in enumerate(self._lanes):
+            done = []
+            while self._position[i] < len(lane) and lane[self._position[i]] in finished:
+                done.append(lane[self._position[i]])
+                self._position[i] += 1
+            for (k, scr) in enumerate(done):
+                self.resources[scr] = {'wall_time': (now - self._start[i]) / len(done)}
+                # The memory was sampled while the first of these test cases ran.
+                if k == 0 and self._peak[i] > 0:
+                    self.resources[scr]['peak_rss'] = self._peak[i]
+            if len(done) > 0:
+                self._start[i] = now
+                self._peak[i] = 0
+        rss = _resident_memory(self._directories)
+        if rss is None:
+            self.memory_measured = False
+            return
+        for i in range(len(self._lanes)):
+            self._peak[i] = max(self._peak[i], rss[i])
+
+
+# Tester of a worker process of the verification pool, see Tester._submit_verification.
+_verification_tester = None
+
+# Attributes of the Tester that Tester._verify_test_case reads, see Tester._verification_context.
+_VERIFICATION_ATTRIBUTES = ('_libHome', '_modelica_tool', '_comp_tool', '_tol', '_nPoi', '_comp_dir',
+                            '_data', '_translation_statistics')
+
+
+def _init_verification_worker(context):
+    global _verification_tester
+    _verification_tester = Tester.__new__(Tester)
+    _verification_tester.__dict__.update(context)
+    _verification_tester._reporter = _MessageRecorder()
+    _verification_tester._comp_info = []
+
+
+def _verify_test_case(data_idx):
+    return _verification_tester._verify_test_case(data_idx)
+
+
 @contextmanager
 def _stdout_redirector(stream):
     """ Redirects sys.stdout to stream."""
@@ -279,10 +847,36 @@ class Tester(object):
         self._simulator_log_file = "simulator-{}.log".format(tool)
         #  File to which the console output of the simulator of failed simulations is written
         self._failed_simulator_log_file = "failed-simulator-{}.log".format(tool)
-        # File to which statistics is written to
-        self._statistics_log = "statistics.json"
+        # File to which the worker processes write the statistics, with one JSON object per line and test case
+        self._statistics_log = "statistics.ndjson"
+        # Statistics of the test cases that have been checked, and translation logs
+        # that have been appended to self._simulator_log_file
+        self._statistics_records = []
+        self._translation_logs_read = set()
+        self._simulation_errors = None
         self._nPro = multiprocessing.cpu_count()
         self._batch = False
+        # Files whose changes select the tests to be run, see setChangedFiles.
+        self._changed_files = None
+        # Cache of the parsed .mos files, see setDiscoveryCache.
+        self._use_discovery_cache = True
+        self._discovery_cache_file = None
+        # Cache of the simulation results, see setSimulationCache.
+        self._simulation_cache = None
+        self._tool_version = None
+        # Cache key of each test case, by script file, and the test cases
+        # and statistics that were restored from the cache.
+        self._cache_keys = {}
+        self._restored_tests = set()
+        self._restored_records = []
+        # Number of test cases that are simulated by the run scripts.
+        self._number_of_simulations = 0
+        # Scheduling by the memory and run time of the test cases, see setResourceBudget.
+        self._memory_budget = None
+        self._use_resource_profile = True
+        self._resource_profile_file = None
+        # Script files of the test cases of each worker process
+        self._lanes = []
         self._pedanticModelica = False
 
         # Number of data points that are used
@@ -321,6 +915,10 @@ class Tester(object):
 
         # Data structures for storing comparison data.
         self._comp_info = []
+        # Verifications of test cases that run in a worker pool, see _submit_verification.
+        self._verifications = {}
+        self._verification_pool = None
+        self._data_indices = {}
         self._comp_log_file = "comparison-{}.log".format(tool)
         self._comp_dir = "funnel_comp"
 
@@ -358,6 +956,9 @@ class Tester(object):
 
         # Dictionary with error messages, error counter and messages written to the user
         self._error_dict = e.ErrorDictionary()
+        # Scanner of the translation logs, and the model statistics found by it
+        self._log_scanner = None
+        self._translation_statistics = {}
 
         # By default, do not show the GUI of the simulator
         self._showGUI = False
@@ -428,6 +1029,9 @@ class Tester(object):
             import buildingspy.development.error_dictionary_dymola as e
 
         self._error_dict = e.ErrorDictionary()
+        # Scanner of the translation logs, and the model statistics found by it
+        self._log_scanner = None
+        self._translation_statistics = {}
 
     def setLibraryRoot(self, rootDir):
         """ Set the root directory of the library.
@@ -485,6 +1089,208 @@ class Tester(object):
         """
         self._nPro = number
 
+    def setDiscoveryCache(self, use=True, cache_file=None):
+        """ Configure the cache of the parsed ``.mos`` files.
+
+        :param use: Set to ``False`` to parse all ``.mos`` files in :func:`setDataDictionary`.
+        :param cache_file: Name of the JSON cache file. If ``None``, a file in the temporary
+                           directory of the system is used, with one file per library.
+
+        The cache is enabled by default. An entry is parsed again if its ``.mos`` file or
+        a ``.mo`` file it reads has changed, and the whole cache is discarded if it
+        cannot be read or if it has been written by another version of BuildingsPy.
+        If the cache cannot be written, the files are parsed again in the next run.
+        """
+        self._use_discovery_cache = use
+        self._discovery_cache_file = cache_file
+
+    def _get_discovery_cache_file(self):
+        """ Return the name of the discovery cache file, or ``None`` if it is disabled."""
+        import hashlib
+        if not self._use_discovery_cache:
+            return None
+        if self._discovery_cache_file is not None:
+            return self._discovery_cache_file
+        lib_key = hashlib.sha1(os.path.abspath(self._libHome).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), 'buildingspy-discovery-cache',
+                            "{}-{}.json".format(self.getLibraryName(), lib_key))
+
+    def setResourceBudget(self, memory=None, use_profile=True, profile_file=None):
+        """ Configure the scheduling of the regression tests by their memory use and run time.
+
+        :param memory: Memory in bytes that the simulations may use together. If ``None``,
+                       the physical memory of the computer is used, if it can be determined.
+        :param use_profile: Set to ``False`` to distribute the tests to the processors
+                            in the order in which they are found.
+        :param profile_file: Name of the JSON file with the peak resident memory and the run time
+                             of each test from the previous runs. If ``None``, a file in the
+                             temporary directory of the system is used, with one file per library and tool.
+
+        When :func:`run` uses more than one processor, the peak resident memory and the run time
+        of each test are measured and stored in the profile. The memory is measured with
+        ``psutil`` if it is installed, and otherwise only on systems with ``/proc``, such as Linux.
+        The next run distributes the tests to the processors such that the tests with the largest
+        memory use run in the same process, one after the other, if the memory of the tests that
+        may run at the same time would otherwise exceed ``memory``.
+        This may use fewer processors than set by :func:`setNumberOfThreads`.
+        The other tests are distributed such that all processes have about the same run time.
+        """
+        self._memory_budget = memory
+        self._use_resource_profile = use_profile
+        self._resource_profile_file = profile_file
+
+    def _get_resource_profile_file(self):
+        """ Return the name of the resource profile file, or ``None`` if it is disabled."""
+        import hashlib
+        if not self._use_resource_profile:
+            return None
+        if self._resource_profile_file is not None:
+            return self._resource_profile_file
+        lib_key = hashlib.sha1(os.path.abspath(self._libHome).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), 'buildingspy-resources',
+                            "{}-{}-{}.json".format(self.getLibraryName(), lib_key, self._modelica_tool))
+
+    def _load_resource_profile(self):
+        """ Return the dictionary with the resources of each test from the resource profile file."""
+        file_name = self._get_resource_profile_file()
+        if file_name is None or not os.path.exists(file_name):
+            return {}
+        try:
+            with open(file_name, mode="r", encoding="utf-8") as fil:
+                return json.load(fil)
+        except (OSError, ValueError):
+            # A corrupt profile is rebuilt.
+            return {}
+
+    def _save_resource_profile(self, resources):
+        """ Add the measured ``resources`` of the tests to the resource profile file."""
+        file_name = self._get_resource_profile_file()
+        if file_name is None or len(resources) == 0:
+            return
+        profile = self._load_resource_profile()
+        for (scr, res) in resources.items():
+            profile.setdefault(scr, {}).update(res)
+        dir_name = os.path.dirname(file_name)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        tmp_file = "{}.{}.tmp".format(file_name, os.getpid())
+        with open(tmp_file, mode="w", encoding="utf-8") as fil:
+            json.dump(profile, fil, indent=2, sort_keys=True)
+        os.replace(tmp_file, file_name)
+
+    def _get_memory_budget(self):
+        """ Return the memory budget in bytes, or ``None`` if it is not known."""
+        if self._memory_budget is not None:
+            return self._memory_budget
+        try:
+            return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    def _schedule_tests(self, tra_data):
+        """ Return the list of the tests of each worker process.
+
+            :param tra_data: The entries of the data dictionary of the tests that are run.
+
+            The tests are distributed to ``self._nPro`` processes in the order in which they
+            are found, unless their resources are known from previous runs,
+            see :func:`setResourceBudget`. In this case, the tests that use more
+            than their share of the memory budget are placed first, in the order of their memory,
+            followed by the other tests in the order of their run time. Each test is placed in
+            the process with the shortest run time among those that do not exceed the memory budget
+            if all processes run their largest test at the same time. Processes without tests are removed.
+        """
+        nPro = self._nPro
+        profile = self._load_resource_profile() if not self._useExistingResults else {}
+        known = [profile.get(dat['ScriptFile'], {}) for dat in tra_data]
+        if not any(known):
+            return [tra_data[iPro::nPro] for iPro in range(nPro)]
+
+        times = sorted(k['wall_time'] for k in known if 'wall_time' in k)
+        default_time = times[len(times) // 2] if len(times) > 0 else 0
+        wall_time = [k.get('wall_time', default_time) for k in known]
+        peak = [k.get('peak_rss', 0) for k in known]
+
+        budget = self._get_memory_budget()
+        heavy = [i for i in range(len(tra_data)) if budget is not None and peak[i] > budget / nPro]
+        light = sorted(set(range(len(tra_data))) - set(heavy))
+        order = sorted(heavy, key=lambda i: -peak[i]) + sorted(light, key=lambda i: -wall_time[i])
+
+        lanes = [[] for _ in range(nPro)]
+        load = [0] * nPro
+        lane_peak = [0] * nPro
+        for i in order:
+            # Memory if all processes run their largest test at the same time
+            candidates = [iPro for iPro in range(nPro) if budget is None or
+                          sum(lane_peak) - lane_peak[iPro] + max(lane_peak[iPro], peak[i]) <= budget]
+            if len(candidates) == 0:
+                # Run it after the test with the largest memory use
+                candidates = [max(range(nPro), key=lambda iPro: lane_peak[iPro])]
+            iPro = min(candidates, key=lambda iPro: load[iPro])
+            lanes[iPro].append(tra_data[i])
+            load[iPro] += wall_time[i]
+            lane_peak[iPro] = max(lane_peak[iPro], peak[i])
+        return [lane for lane in lanes if len(lane) > 0]
+
+    def _finished_tests(self):
+        """ Return the set of the script files of the tests that have completed."""
+        if self._modelica_tool == 'dymola':
+            prefix = os.path.join(self.getLibraryName(), "Resources", "Scripts", "Dymola", "")
+            return set(ele['file'].replace("/", os.sep)[len(prefix):] for ele in self._statistics_records)
+        finished = set()
+        for dat in self._data:
+            if 'ResultDirectory' in dat:
+                json_name = os.path.join(dat['ResultDirectory'],
+                                         dat['model_name'].replace(".", "_") + "_buildingspy.json")
+                if os.path.exists(json_name):
+                    finished.add(dat['ScriptFile'])
+        return finished
+
+    def setSimulationCache(self, cache_dir, tool_version=None, max_bytes=None):
+        """ Restore the results of the regression tests whose inputs did not change from a cache.
+
+        :param cache_dir: Directory of the cache, or ``None`` to disable the cache.
+        :param tool_version: String that identifies the version of the Modelica tool.
+                             If ``None``, the executable of the tool is identified by its
+                             path, size and modification time.
+        :param max_bytes: Size limit of the cache in bytes. If ``None``, the cache grows
+                          until it is deleted by the user.
+
+        When :func:`run` is called, the result file, the translation log and the statistics
+        of each test case that is in the cache are restored, and only the other test cases are
+        simulated. The key of a test case is the hash of its ``.mos`` script, of the ``.mo``
+        files of its model and of all classes of the library that these use,
+        of its experiment specification from the ``.mos`` script and ``conf.yml``,
+        and of the tool and its version.
+        The files of the library that these ``.mo`` files reference with a ``modelica://`` URI,
+        such as weather data files that are read with ``loadResource`` or C sources,
+        are also part of the key. Files that are referenced otherwise, such as by an
+        absolute path, are not.
+
+        The results of the test cases that were simulated successfully are added to the cache,
+        also if they are read from the directories set by :func:`useExistingResults`.
+        FMU export tests are not cached.
+        Entries are never changed, hence each change of the library adds new entries.
+        If ``max_bytes`` is set, the least recently used entries are then deleted until
+        the cache is smaller than ``max_bytes``.
+        See :mod:`buildingspy.development.simulation_cache`.
+
+        For example, to use a cache in the home directory, use
+
+        >>> import os
+        >>> import buildingspy.development.regressiontest as r
+        >>> rt = r.Tester(tool="dymola")
+        >>> rt.setSimulationCache(os.path.join(os.path.expanduser("~"), ".buildingspy-cache")) # doctest: +SKIP
+
+        """
+        import buildingspy.development.simulation_cache as c
+
+        if cache_dir is None:
+            self._simulation_cache = None
+        else:
+            self._simulation_cache = c.SimulationCache(cache_dir, max_bytes=max_bytes)
+        self._tool_version = tool_version
+
     def showGUI(self, show=True):
         """ Call this function to show the GUI of the simulator.
 
@@ -642,22 +1448,6 @@ class Tester(object):
             msg += "You need to install these python modules to use this script.\n"
             raise ImportError(msg)
 
-    def _checkKey(self, key, fileName, counter):
-        """ Checks whether ``key`` is contained in the header of the file ``fileName``
-            If the first line starts with ``within``
-            and the second line starts with ``key``
-            the counter is increased by one.
-        """
-
-        with open(fileName, mode="rt", encoding="utf-8-sig") as filObj:
-            # filObj is an iterable object, so we can use next(filObj)
-            line0 = next(filObj).strip()
-            if line0.startswith("within"):
-                line1 = next(filObj).strip()
-                if line1.startswith(key):
-                    counter += 1
-        return counter
-
     @staticmethod
     def expand_packages(packages):
         """
@@ -764,6 +1554,95 @@ class Tester(object):
                 raise ValueError(msg)
             self.setDataDictionary(rooPat)
 
+    def setChangedFiles(self, changed_files=None, git_reference=None, modified_since=None):
+        """
+        Only run the regression tests that are affected by changed files.
+
+        :param changed_files: List of the names of the changed files.
+        :param git_reference: Git commit, branch or tag. The files that differ from it,
+                              including uncommitted and untracked files, are changed.
+        :param modified_since: Time in seconds since the epoch. The files that were
+                               modified later are changed.
+
+        Exactly one argument must be specified.
+
+        When :func:`run` is called, a test is run if its model is defined in, or
+        transitively uses a class that is defined in, a changed ``.mo`` file,
+        or if its ``.mos`` script or its reference results changed.
+        Other changed files of the library, such as a deleted or renamed ``.mo`` file,
+        a ``package.order`` file or a data file in ``Resources``, change the whole package
+        that encloses them. For the files in ``Resources``, this is the library, hence all tests are run.
+        All tests are run if the test configuration ``conf.yml`` or ``conf.json`` changed.
+        See :mod:`buildingspy.development.dependency_index`.
+
+        For example, to validate the changes of a branch, use
+
+        >>> import os
+        >>> import buildingspy.development.regressiontest as r
+        >>> rt = r.Tester(tool="dymola")
+        >>> rt.setLibraryRoot(os.path.join("buildingspy", "tests", "MyModelicaLibrary"))
+        >>> rt.setChangedFiles(git_reference="origin/master") # doctest: +SKIP
+
+        """
+        import buildingspy.development.dependency_index as d
+
+        if [changed_files, git_reference, modified_since].count(None) != 2:
+            raise ValueError(
+                "Exactly one of 'changed_files', 'git_reference' and 'modified_since' must be specified.")
+        if git_reference is not None:
+            changed_files = d.get_changed_files_git(self._libHome, git_reference)
+        elif modified_since is not None:
+            changed_files = d.get_changed_files_since(self._libHome, modified_since)
+        self._changed_files = set(os.path.abspath(f) for f in changed_files)
+
+    def _select_affected_tests(self):
+        """ Remove the tests from the data dictionary that are not affected by the changed files."""
+        import buildingspy.development.dependency_index as d
+
+        changed = self._changed_files
+        conf_dir = os.path.join(self._libHome, 'Resources', 'Scripts', 'BuildingsPy')
+        if os.path.join(conf_dir, 'conf.yml') in changed or os.path.join(conf_dir, 'conf.json') in changed:
+            self._reporter.writeOutput("The test configuration changed, all regression tests are run.")
+            return
+        index = d.DependencyIndex(self._libHome)
+        scr_dir = os.path.join(self._libHome, 'Resources', 'Scripts', 'Dymola')
+        ref_dir = os.path.join(self._libHome, 'Resources', 'ReferenceResults')
+        changed_mo = set()
+        n_package = 0
+        for f in changed:
+            if not f.startswith(self._libHome + os.sep):
+                continue
+            if index.class_of_file(f) is not None:
+                changed_mo.add(f)
+            elif not (f.startswith(scr_dir + os.sep) or f.startswith(ref_dir + os.sep)):
+                # A deleted or renamed .mo file, package.order or a resource. Its users
+                # are not known, hence the enclosing package is treated as changed.
+                changed_mo.update(index.package_files(f))
+                n_package += 1
+        if n_package > 0:
+            self._reporter.writeOutput(
+                "All tests of the enclosing packages are run for {} changed file{} that define{} no class.".format(
+                    n_package, '' if n_package == 1 else 's', 's' if n_package == 1 else ''))
+        affected = index.affected_classes(changed_mo)
+        changed_names = set(os.path.basename(f) for f in changed)
+
+        def _is_affected(dat):
+            if dat['model_name'] in affected:
+                return True
+            if os.path.join(scr_dir, dat['ScriptFile']) in changed:
+                return True
+            # Reference results, such as MyModelicaLibrary_Examples_MyStep.txt
+            ref_fil = os.path.join(self.getLibraryName(), dat['ScriptFile']).replace(os.sep, '_')
+            return os.path.splitext(ref_fil)[0] + ".txt" in changed_names
+
+        nTes = self.get_number_of_tests()
+        self._data = [dat for dat in self._data if _is_affected(dat)]
+        # Inform the user that not all tests are run, but don't add to warnings
+        # as this would flag the test to have failed
+        self._reporter.writeOutput(
+            "Regression tests are only run for the {} of {} models that are affected by {} changed file{}.".format(
+                self.get_number_of_tests(), nTes, len(changed), '' if len(changed) == 1 else 's'))
+
     def writeOpenModelicaResultDictionary(self):
         """ Write in ``Resources/Scripts/OpenModelica/compareVars`` files whose
         name are the name of the example model, and whose content is::
@@ -901,38 +1780,17 @@ class Tester(object):
            :param: root_package The name of the top-level package for which the files need to be parsed.
                                 Separate package names with a period.
 
+           The parsed ``.mos`` files are stored in the discovery cache,
+           see :func:`setDiscoveryCache`, and only new or changed files are parsed again.
+           If many files need to be parsed, they are parsed in parallel.
         """
-        def _set_attribute_value(line, keyword, dat):
-            """ Set the value of an attribute from the `.mos` file.
-
-                This function will remove leading and ending quotes.
-
-                :param line: The line that contains the keyword and the value.
-                :param keyword: The keyword
-                :param dat: The data dictionary to which dat[keyword] = value will be written.
-
-            """
-            line = re.sub(' ', '', line)
-            pos = line.find(keyword)
-            if pos > -1:
-                posEq = line.find('=', pos)
-                posComma = line.find(',', pos)
-                posBracket = line.find(')', pos)
-                posEnd = min(posComma, posBracket)
-                if posEnd < 0:
-                    posEnd = max(posComma, posBracket)
-                # Ensure that keyword is directly located before the next = sign
-                if posEq == pos + len(keyword):
-                    entry = line[posEq + 1:posEnd]
-                    dat[keyword] = re.sub(r'^"|"$', '', entry)
-            return
-
         # Check if the data dictionary has already been set, in
         # which case we return doing nothing.
         # This is needed because methods append to the dictionary, which
         # can lead to double entries.
         roo_pac = root_package if root_package is not None else os.path.join(
             self._libHome, 'Resources', 'Scripts', 'Dymola')
+        tasks = []
         for root, _, files in os.walk(roo_pac):
             for mosFil in files:
                 # Exclude the conversion scripts and also backup copies
@@ -940,176 +1798,26 @@ class Tester(object):
                 if mosFil.endswith('.mos') and (
                     not mosFil.startswith(
                         "Convert" + self.getLibraryName())):
-                    dat = {'ScriptFile': os.path.join(
-                        root[len(os.path.join(self._libHome, 'Resources', 'Scripts', 'Dymola')) + 1:], mosFil)}
-                    # ScriptFile is something like Controls/Continuous/Examples/LimPIDWithReset.mos
-                    # JModelica CI testing needs files below 140 characters, which includes Buildings.
-                    # Hence, write warning if a file is equal or longer than 140-9=131 characters.
-                    if len(dat['ScriptFile']) >= 131:
-                        self._reporter.writeError(
-                            """File {} is {}-character long. Reduce it to maximum of 130 characters.""".format(
-                                dat['ScriptFile'], len(
-                                    dat['ScriptFile'])))
-                    # _check_reference_result_file_name(dat['ScriptFile'])
-                    # open the mos file and read its content.
-                    # Path and name of mos file without 'Resources/Scripts/Dymola'
-                    with open(os.path.join(root, mosFil), mode="r", encoding="utf-8-sig") as fMOS:
-                        Lines = fMOS.readlines()
-
-                    # Remove white spaces
-                    for i in range(len(Lines)):
-                        Lines[i] = Lines[i].replace(' ', '')
-
-                    # Set some attributes in the Data object
-                    dat['dymola'] = {
-                        'exportFMU': False,
-                        'translate': False,
-                        'simulate': False
-                    }  # May be switched to True below
-
-                    for lin in Lines:
-                        # Add the model name to the dictionary.
-                        # This is needed to export the model as an FMU.
-                        # Also, set the flag mustSimulate to True.
-                        simCom = re.search(r'simulateModel\(\s*".*"', lin)
-                        if simCom is not None:
-                            dat['dymola']['translate'] = True
-                            dat['dymola']['simulate'] = True
-                            modNam = re.sub(r'simulateModel\(\s*"', '', simCom.string)
-                            modNam = modNam[0:modNam.index('"')]
-                            dat['model_name'] = modNam
-                            dat['dymola']['TranslationLogFile'] = modNam + ".translation.log"
-                            # Not all .mos files list startTime and stopTime.
-                            # Hence, set the default values, which may be overridden just below.
-                            dat["startTime"] = 0
-                            dat["stopTime"] = 1
-                        # parse startTime and stopTime, if any
-                        for attr in ["startTime", "stopTime"]:
-                            _set_attribute_value(lin, attr, dat)
-                        # Check if this model need to be translated as an FMU.
-                        if (not dat['dymola']['exportFMU']) and ("translateModelFMU" in lin):
-                            dat['dymola']['exportFMU'] = True
-                            dat['dymola']['translate'] = False
-                            dat['dymola']['simulate'] = False
-                        if dat['dymola']['exportFMU']:
-                            for attr in ["modelToOpen", "modelName"]:
-                                _set_attribute_value(lin, attr, dat['dymola'])
-
-                    # We are finished iterating over all lines of the .mos
-
-                    # Dymola uses in translateModelFMU the syntax
-                    # modelName=... but our dictionary uses model_name
-                    if dat['dymola']['exportFMU']:
-                        if 'modelToOpen' in dat['dymola'] and len(dat['dymola']['modelToOpen']) > 0:
-                            dat['model_name'] = dat['dymola']['modelToOpen']
-                        if 'model_name' not in dat and dat['dymola']['modelName'] in dat:
-                            dat["model_name"] = dat['dymola']['modelName']
-                        if dat['dymola']['modelName'] in dat:
-                            # This is not needed anymore
-                            del dat['dymola']['modelName']
-
-                    # Some files like plotFan.mos has neither a simulateModel
-                    # nor a translateModelFMU command.
-                    # These must not be added to the data array. Hence we skip further processing.
-                    if dat['dymola']['translate'] == False and dat['dymola']['exportFMU'] == False:
-                        continue
-
-                    # The .mos script allows modelName="", hence
-                    # we set the model name to be the entry of modelToOpen
-#                    elif "model_name" not in dat['dymola'] and "modelToOpen" in dat['dymola']:
-#                        dat['model_name'] = dat['dymola']['modelToOpen']
-
-#                        # Make sure model_name is set
-#                        if 'model_name' not in dat or dat['model_name'] == '':
-#                            msg = f"Failed to set model_name for {os.path.join(root, mosFil)}"
-#                            raise ValueError(msg)
-                    dat['dymola']['TranslationLogFile'] = dat['model_name'] + ".translation.log"
-                    # Get tolerance from mo file. This is used to set the tolerance
-                    # for OpenModelica and OPTIMICA.
-                    # Only get the tolerance for the models that need to be simulated,
-                    # because those that are only exported as FMU don't need this setting.
-                    if not dat['dymola']['exportFMU']:
-                        try:
-                            dat['tolerance'] = self.get_tolerance(
-                                self._libHome, dat['model_name'])
-                        except Exception as e:
-                            self._reporter.writeError(str(e))
-                            dat['tolerance'] = None
-                    # For FMU export, if model_name="", then Dymola uses the
-                    # Modelica class name, with "." replaced by "_".
-                    # If the Modelica class name consists of "_", then they
-                    # are replaced by "_0".
-                    # Hence, we update dat['model_name'] if needed.
-                    if dat['dymola']['exportFMU']:
-                        # Strip quotes from model_name and modelToOpen
-                        dat['dymola']['FMUName'] = dat['model_name'].strip('"')
-                        dat['dymola']['modelToOpen'] = dat['dymola']['modelToOpen'].strip('"')
-                        # Update the name of the FMU if model_name is "" in .mos file.
-                        if len(dat['dymola']['FMUName']) == 0:
-                            dat['dymola']['FMUName'] = dat['dymola']['modelToOpen']
-                        # Update the FMU name, for example to change
-                        # Buildings.Fluid.FMI.Examples.FMUs.IdealSource_m_flow to
-                        # Buildings_Fluid_FMI_Examples_FMUs_IdealSource_0m_0flow
-                        dat['dymola']['FMUName'] = dat['dymola']['FMUName'].replace(
-                            "_", "_0").replace(".", "_")
-                        dat['dymola']['FMUName'] = dat['dymola']['FMUName'] + ".fmu"
-                    # Plot variables are only used for those models that need to be simulated.
-                    if not dat['dymola']['exportFMU']:
-                        plotVars = []
-                        iLin = 0
-                        for lin in Lines:
-                            iLin = iLin + 1
-                            try:
-                                y = self.get_plot_variables(lin)
-                                if y is not None:
-                                    plotVars.append(y)
-                            except (AttributeError, ValueError) as e:
-                                s = "%s, line %s, could not be parsed.\n" % (mosFil, iLin)
-                                s += "The problem occurred at the line below:\n"
-                                s += "%s\n" % lin
-                                s += "Make sure that each assignment of the plot command is on one line.\n"
-                                self._reporter.writeError(s)
-                                # Store the error, but keep going to check other lines and files
-                                pass
-                        if len(plotVars) == 0:
-                            s = "%s does not contain any plot command.\n" % mosFil
-                            s += "You need to add a plot command to include its\n"
-                            s += "results in the regression tests.\n"
-                            self._reporter.writeError(s)
-                        # Store grouped plot variables without duplicates.
-                        # (Duplicates happen when the same y variables are plotted against
-                        # different x variables.)
-                        dat['ResultVariables'] = []
-                        for v_i in plotVars:
-                            if v_i not in dat['ResultVariables']:
-                                dat['ResultVariables'].append(v_i)
-                        # Create the result file name.
-                        if self._modelica_tool == 'dymola':
-                            # For Dymola, this is not the name in the .mos file (as these may not be unique).
-                            # Rather, we set the result file name to be the mos file name with
-                            # .mat extension
-                            matFil = f"{dat['model_name']}.mat"
-                        elif self._modelica_tool == 'openmodelica':
-                            matFil = f"{dat['model_name']}_res.mat"
-                        else:
-                            matFil = '{}_result.mat'.format(
-                                re.sub(r'\.', '_', dat['model_name']))
-                        # Some *.mos file only contain plot commands, but no simulation.
-                        # Hence, if 'resultFile=' could not be found, try to get the file that
-                        # is used for plotting.
-                        # cf. BUG
-                        if len(matFil) == 0:
-                            for lin in Lines:
-                                if 'filename=\"' in lin:
-                                    # Note that the filename entry already has the .mat
-                                    # extension.
-                                    matFil = re.search(
-                                        r'(?<=filename=\")[a-zA-Z0-9_\.]+', lin).group()
-                                    break
-                        if len(matFil) == 0:
-                            raise ValueError('Did not find *.mat file in ' + mosFil)
-                        dat['ResultFile'] = matFil
-                    self._data.append(dat)
+                    tasks.append((self._libHome, root, mosFil, self._modelica_tool))
+
+        cache = _DiscoveryCache(self._get_discovery_cache_file(), self._modelica_tool)
+        results = [cache.get(os.path.join(t[1], t[2])) for t in tasks]
+        changed = [i for i in range(len(tasks)) if results[i] is None]
+        if len(changed) >= _MIN_PARALLEL_DISCOVERY and self._nPro > 1:
+            with multiprocessing.Pool(min(self._nPro, len(changed))) as po:
+                parsed = po.map(_parse_mos_file, [tasks[i] for i in changed])
+        else:
+            parsed = [_parse_mos_file(tasks[i]) for i in changed]
+        for (i, res) in zip(changed, parsed):
+            results[i] = res
+            cache.put(os.path.join(tasks[i][1], tasks[i][2]), res)
+        cache.save()
+
+        for (dat, errors, _) in results:
+            for err in errors:
+                self._reporter.writeError(err)
+            if dat is not None:
+                self._data.append(dat)
 
         # Make sure we found at least one unit test.
         if self.get_number_of_tests() == 0:
@@ -1445,9 +2153,16 @@ class Tester(object):
         # Get the working directory that contains the ".log" file
         fulFilNam = os.path.join(data['ResultDirectory'],
                                  self.getLibraryName(), data['dymola']['TranslationLogFile'])
+        # Use the statistics if the log has already been scanned for the error checks.
+        ret = self._translation_statistics.pop(os.path.abspath(fulFilNam), None)
+        if ret is not None:
+            return ret
         return of.get_model_statistics(fulFilNam, self._modelica_tool)
 
-    def _legacy_comp(self, tOld, yOld, tNew, yNew, tGriOld, tGriNew, varNam, filNam, tol):
+    def _legacy_align(self, tOld, yOld, tNew, yNew, tGriOld, tGriNew, varNam, filNam):
+        """ Return ``(yOld, yInt)`` as arrays of equal length, where ``yInt`` are the new
+            results ``yNew`` interpolated to the time stamps of the old results.
+        """
         # Interpolate the new variables to the old time stamps
         #
         if len(yNew) > 2:
@@ -1501,43 +2216,76 @@ class Tester(object):
                     "len(yInt)=%d\n"
                     "Stop processing.\n") % (filNam, varNam, len(yOld), len(yInt))
                 )
+        return (np.asarray(yOld, dtype=float), np.asarray(yInt, dtype=float))
 
-        errAbs = np.zeros(len(yInt))
-        errRel = np.zeros(len(yInt))
-        errFun = np.zeros(len(yInt))
-
-        for i in range(len(yInt)):
-            errAbs[i] = abs(yOld[i] - yInt[i])
-            if np.isnan(errAbs[i]):
-                raise ValueError('NaN in errAbs ' + varNam + " " + str(yOld[i])
-                                 + "  " + str(yInt[i]) + " i, N " + str(i) +
-                                 " --:" + str(yInt[i - 1])
-                                 + " ++:", str(yInt[i + 1]))
-            if (abs(yOld[i]) > 10 * tol):
-                errRel[i] = errAbs[i] / abs(yOld[i])
-            else:
-                errRel[i] = 0
-            errFun[i] = errAbs[i] + errRel[i]
+    @staticmethod
+    def _legacy_errors(yOld, yInt, tol):
+        """ Return the absolute, relative and total error ``(errAbs, errRel, errFun)``.
 
-        t_err_max, warning = 0, None
+            :param yOld: Old results, a 1-D array, or a 2-D array with one variable per row.
+            :param yInt: New results, with the same shape as ``yOld``.
+            :param tol: Tolerance. The relative error is zero where ``abs(yOld) <= 10*tol``.
+        """
+        errAbs = np.abs(yOld - yInt)
+        absOld = np.abs(yOld)
+        errRel = np.zeros(errAbs.shape)
+        np.divide(errAbs, absOld, out=errRel, where=absOld > 10 * tol)
+        return (errAbs, errRel, errAbs + errRel)
 
-        if max(errFun) > tol:
-            iMax = 0
-            eMax = 0
-            for i in range(len(errFun)):
-                if errFun[i] > eMax:
-                    eMax = errFun[i]
-                    iMax = i
-            tGri = self._getTimeGrid(tOld[0], tOld[-1], self._nPoi)
-            t_err_max = tGri[iMax]
-            warning = filNam + ": " + varNam + " has absolute and relative error = " + \
-                ("%0.3e" % max(errAbs)) + ", " + ("%0.3e" % max(errRel)) + ".\n"
-            if self._isParameter(yInt):
-                warning += "             %s is a parameter.\n" % varNam
-            else:
-                warning += "             Maximum error is at t = %s\n" % str(t_err_max)
+    def _legacy_comp(self, tOld, yOld, tNew, yNew, tGriOld, tGriNew, varNam, filNam, tol):
+        return self._legacy_comp_batch(
+            {varNam: (tOld, yOld, tNew, yNew, tGriOld, tGriNew)}, filNam, tol)[varNam]
 
-        return (t_err_max, warning)
+    def _legacy_comp_batch(self, series, filNam, tol):
+        """ Compare all variables of one result file with the legacy comparison.
+
+            :param series: Dictionary with the tuple ``(tOld, yOld, tNew, yNew, tGriOld, tGriNew)``
+                           of each variable, see :func:`_prepare_comparison`.
+            :param filNam: File name, used for reporting.
+            :param tol: Tolerance.
+            :return: Dictionary with the tuple ``(t_err_max, warning)`` of each variable,
+                     where ``warning`` is ``None`` if the results are equal.
+
+            The errors of all variables with the same number of points are computed
+            with one array operation.
+        """
+        aligned = {}
+        groups = defaultdict(list)
+        for (varNam, (tOld, yOld, tNew, yNew, tGriOld, tGriNew)) in series.items():
+            (yO, yI) = self._legacy_align(tOld, yOld, tNew, yNew, tGriOld, tGriNew, varNam, filNam)
+            iNaN = np.flatnonzero(np.isnan(yO - yI))
+            if len(iNaN) > 0:
+                i = iNaN[0]
+                raise ValueError('NaN in errAbs ' + varNam + " " + str(yO[i])
+                                 + "  " + str(yI[i]) + " i, N " + str(i) +
+                                 " --:" + str(yI[i - 1])
+                                 + " ++:", str(yI[i + 1]))
+            aligned[varNam] = (yO, yI)
+            groups[len(yO)].append(varNam)
+
+        ret = {}
+        for names in groups.values():
+            yI = np.vstack([aligned[varNam][1] for varNam in names])
+            (errAbs, errRel, errFun) = self._legacy_errors(
+                np.vstack([aligned[varNam][0] for varNam in names]), yI, tol)
+            funMax = errFun.max(axis=1)
+            iMax = errFun.argmax(axis=1)
+            absMax = errAbs.max(axis=1)
+            relMax = errRel.max(axis=1)
+            for (k, varNam) in enumerate(names):
+                t_err_max, warning = 0, None
+                if funMax[k] > tol:
+                    tOld = series[varNam][0]
+                    tGri = self._getTimeGrid(tOld[0], tOld[-1], self._nPoi)
+                    t_err_max = tGri[iMax[k]]
+                    warning = filNam + ": " + varNam + " has absolute and relative error = " + \
+                        ("%0.3e" % absMax[k]) + ", " + ("%0.3e" % relMax[k]) + ".\n"
+                    if self._isParameter(yI[k]):
+                        warning += "             %s is a parameter.\n" % varNam
+                    else:
+                        warning += "             Maximum error is at t = %s\n" % str(t_err_max)
+                ret[varNam] = (t_err_max, warning)
+        return {varNam: ret[varNam] for varNam in series}
 
     def _funnel_comp(
             self,
@@ -1677,8 +2425,8 @@ class Tester(object):
 
         return None
 
-    def areResultsEqual(self, tOld, yOld, tNew, yNew, varNam, data_idx):
-        """ Return `True` if the data series are equal within a tolerance.
+    def _prepare_comparison(self, tOld, yOld, tNew, yNew, varNam, filNam):
+        """ Check the time stamps of the old and new results of one variable, and return their time grids.
 
         :param tOld: List of old time values.
         :param yOld: Old simulation results.
@@ -1686,17 +2434,14 @@ class Tester(object):
         :param yNew: New simulation results.
         :param varNam: Variable name, used for reporting.
         :param filNam: File name, used for reporting.
-        :param model_name: Model name, used for reporting.
-        :return: A list with ``False`` if the results are not equal, and the time
-                 of the maximum error, and an error message or `None`.
-                 In case of errors, the time of the maximum error may by `None`.
+        :return: The tuple ``(error, t_err_max, tOld, tNew, tGriOld, tGriNew)``, where ``error`` is
+                 ``None`` if the results can be compared. The time grids ``tGriOld`` and ``tGriNew``
+                 are ``None`` for the funnel comparison.
         """
-        try:
-            filNam = self._data[data_idx]['ResultFile']
-            model_name = self._data[data_idx]['model_name']
-        except BaseException:
-            filNam = 'Undefined file name'
-            model_name = 'Undefined model name'
+        error = None
+        t_err_max = None
+        tGriOld = None
+        tGriNew = None
 
         def getTimeGrid(t, nPoi=self._nPoi):
             if len(t) == 2:
@@ -1736,7 +2481,6 @@ class Tester(object):
                 "Old reference points are for {} <= t <= {}\n"
                 "New reference points are for {} <= t <= {}\n").format(
                     filNam, varNam, tOld[0], tOld[len(tOld) - 1], tNew[0], tNew[len(tNew) - 1])
-            test_passed = False
             t_err_max = min(tOld[0], tNew[0])
         else:  # Overwrite tOld with tNew to prevent any exception raised by the comparison tool.
             tOld[0] = tNew[0]
@@ -1747,7 +2491,6 @@ class Tester(object):
                 "reference and test data.\n"
                 "           tNew = [{}, {}]\n"
                 "           tOld = [{}, {}]").format(filNam, varNam, tNew[0], tNew[-1], tOld[0], tOld[-1])
-            test_passed = False
             t_err_max = min(tOld[-1], tNew[-1])
         else:  # Overwrite tOld with tNew to prevent any exception raised by the comparison tool.
             tOld[-1] = tNew[-1]
@@ -1761,7 +2504,6 @@ class Tester(object):
                 "len(yNew) = {}\n"
                 "Skipping error checking for this variable.\n").format(
                 filNam, varNam, len(yOld), len(yNew))
-            test_passed = False
             t_err_max = None
 
         if self._comp_tool == 'legacy':
@@ -1782,10 +2524,35 @@ class Tester(object):
             if len(yOld) > 2:
                 tOld = getTimeGrid(tOld, len(yOld))
 
+        return (error, t_err_max, tOld, tNew, tGriOld, tGriNew)
+
+    def areResultsEqual(self, tOld, yOld, tNew, yNew, varNam, data_idx):
+        """ Return `True` if the data series are equal within a tolerance.
+
+        :param tOld: List of old time values.
+        :param yOld: Old simulation results.
+        :param tNew: Time stamps of new results.
+        :param yNew: New simulation results.
+        :param varNam: Variable name, used for reporting.
+        :param filNam: File name, used for reporting.
+        :param model_name: Model name, used for reporting.
+        :return: A list with ``False`` if the results are not equal, and the time
+                 of the maximum error, and an error message or `None`.
+                 In case of errors, the time of the maximum error may by `None`.
+        """
+        try:
+            filNam = self._data[data_idx]['ResultFile']
+            model_name = self._data[data_idx]['model_name']
+        except BaseException:
+            filNam = 'Undefined file name'
+            model_name = 'Undefined model name'
+
+        (error, t_err_max, tOld, tNew, tGriOld, tGriNew) = self._prepare_comparison(
+            tOld, yOld, tNew, yNew, varNam, filNam)
+
         if self._comp_tool == 'legacy':
-            try:  # In case an error has been raised before: no comparison performed.
-                error
-            except NameError:
+            # In case an error has been raised before: no comparison performed.
+            if error is None:
                 t_err_max, error = self._legacy_comp(
                     tOld, yOld, tNew, yNew, tGriOld, tGriNew, varNam, filNam, self._tol['ay'])
         else:
@@ -1817,10 +2584,11 @@ class Tester(object):
                     data_idx,
                     var_group)
             except (ValueError, StopIteration):
-                try:  # In case an error has been raised before: no comparison performed.
+                # In case an error has been raised before: no comparison performed.
+                if error is not None:
                     self._update_comp_info(
-                        idx, varNam, None, test_passed, t_err_max, error, data_idx)
-                except NameError:
+                        idx, varNam, None, False, t_err_max, error, data_idx)
+                else:
                     t_err_max, error = self._funnel_comp(
                         tOld, yOld, tNew, yNew, varNam, filNam, model_name, self._tol, data_idx)
 
@@ -1830,6 +2598,32 @@ class Tester(object):
 
         return (test_passed, t_err_max, error)
 
+    def _legacy_results_equal(self, comparisons, data_idx):
+        """ Return the result of :func:`areResultsEqual` for all variables of one result file.
+
+        :param comparisons: List of the tuples ``(tOld, yOld, tNew, yNew, varNam)`` of the variables.
+        :param data_idx: Index of the test case in ``self._data``.
+        :return: Dictionary with the tuple ``(test_passed, t_err_max, error)`` of each variable.
+
+        The variables are compared with one call of :func:`_legacy_comp_batch`.
+        A variable that is listed more than once is compared once.
+        """
+        filNam = self._data[data_idx]['ResultFile']
+        ret = {}
+        series = {}
+        for (tOld, yOld, tNew, yNew, varNam) in comparisons:
+            if varNam in ret or varNam in series:
+                continue
+            (error, t_err_max, tOld, tNew, tGriOld, tGriNew) = self._prepare_comparison(
+                tOld, yOld, tNew, yNew, varNam, filNam)
+            if error is None:
+                series[varNam] = (tOld, yOld, tNew, yNew, tGriOld, tGriNew)
+            else:
+                ret[varNam] = (False, t_err_max, error)
+        for (varNam, (t_err_max, error)) in self._legacy_comp_batch(series, filNam, self._tol['ay']).items():
+            ret[varNam] = (error is None, t_err_max, error)
+        return ret
+
     def _isParameter(self, dataSeries):
         """ Return `True` if `dataSeries` is from a parameter.
         """
@@ -2038,7 +2832,8 @@ class Tester(object):
                 r = True
         return r
 
-    def _compareResults(self, data_idx, oldRefFulFilNam, y_sim, y_tra, refFilNam, ans):
+    def _compareResults(self, data_idx, oldRefFulFilNam, y_sim, y_tra, refFilNam, ans,
+                        comparison=None):
         """ Compares the new and the old results.
 
             :param matFilNam: Matlab file name.
@@ -2048,7 +2843,8 @@ class Tester(object):
             :param y_tra: A dictionary with the translation statistics.
             :param refFilNam: Name of the file with reference results (used for reporting only).
             :param ans: A previously entered answer, either ``y``, ``Y``, ``n`` or ``N``.
-            :param model_name: Model name, used for reporting.
+            :param comparison: The comparison returned by :func:`_compare_with_reference`,
+                               or ``None`` to compare the results now.
             :return: A triple ``(updateReferenceData, foundError, ans)`` where ``updateReferenceData``
                      and ``foundError`` are booleans, and ``ans`` is ``y``, ``Y``, ``n`` or ``N``.
 
@@ -2064,7 +2860,74 @@ class Tester(object):
         # we set updateReferenceData = True
         if ans == "Y":
             updateReferenceData = True
+
+        if comparison is None:
+            comparison = self._compare_with_reference(data_idx, oldRefFulFilNam, y_sim, y_tra)
+
+        if comparison['y_ref'] is None:
+            return self._askNoReferenceResultsFound(y_sim, refFilNam, ans)
+
+        y_ref = comparison['y_ref']
+        t_ref = comparison['t_ref']
+        newTrajectories = comparison['newTrajectories']
+        newStatistics = comparison['newStatistics']
+        noOldResults = comparison['noOldResults']
+        timOfMaxErr = comparison['timOfMaxErr']
+
+        # If the users selected "Y" or "N" (to not accept or reject any new results) in previous tests,
+        # or if the script is run in batch mode, then don't plot the results.
+        # If we found an error, plot the results, and ask the user to accept or
+        # reject the new values.
+        if (newTrajectories or newStatistics) and (not self._batch) and (
+                not ans == "N") and (not ans == "Y"):
+            if newTrajectories and newStatistics:
+                print(f"{self._color_ERROR}             For {refFilNam},")
+                print(
+                    f"             update reference files with new {self._color_BOLD}statistics and trajectories{self._color_ERROR}?{self._color_ENDC}")
+            elif newStatistics:
+                print(f"{self._color_WARNING}             For {refFilNam},")
+                print(
+                    f"             update reference files with new {self._color_BOLD}statistics{self._color_WARNING}?{self._color_ENDC}")
+            else:
+                print(f"{self._color_ERROR}             For {refFilNam},")
+                print(
+                    f"             update reference files with new {self._color_BOLD}trajectories{self._color_ERROR}?{self._color_ENDC}")
+
+            if newTrajectories:
+                if self._comp_tool == 'legacy':
+                    print("(Close plot window to continue.)")
+                    self._legacy_plot(y_sim, t_ref, y_ref, noOldResults, timOfMaxErr, matFilNam)
+                else:
+                    self._funnel_plot(model_name)
+
+            while not (ans == "n" or ans == "y" or ans == "Y" or ans == "N"):
+                ans = input("             Enter: y(yes), n(no), Y(yes for all), N(no for all): ")
+
+            if ans == "y" or ans == "Y":
+                # update the flag
+                updateReferenceData = True
+
+        return (updateReferenceData, (newTrajectories or newStatistics), ans)
+
+    def _compare_with_reference(self, data_idx, oldRefFulFilNam, y_sim, y_tra):
+        """ Compare the new results with the reference results, without interacting with the user.
+
+            :param data_idx: Index of the test case in ``self._data``.
+            :param oldRefFilFilNam: File name including path of old reference files.
+            :param y_sim: A list where each element is a dictionary of variable names and simulation
+                           results that are to be plotted together.
+            :param y_tra: A dictionary with the translation statistics.
+            :return: A dictionary with the reference results ``y_ref`` and their time ``t_ref``,
+                     the flags ``newTrajectories`` and ``newStatistics``, the list ``noOldResults``
+                     of variables without reference results, and the dictionary ``timOfMaxErr``
+                     with the time of the maximum error of each variable.
+                     ``y_ref`` is ``None`` if the reference file contains no results.
+        """
+        model_name = self._data[data_idx]['model_name']
+        matFilNam = self._data[data_idx]['ResultFile']
         newTrajectories = False
+        timOfMaxErr = dict()
+        noOldResults = []  # List of variables for which no old results have been found
 
         # Load the old data (in dictionary format)
         old_results = self._readReferenceResults(oldRefFulFilNam)
@@ -2072,7 +2935,7 @@ class Tester(object):
         y_ref = old_results['results']
 
         if len(y_ref) == 0:
-            return self._askNoReferenceResultsFound(y_sim, refFilNam, ans)
+            return {'y_ref': None}
 
         # The old data contains results
         t_ref = y_ref.get('time')
@@ -2080,9 +2943,6 @@ class Tester(object):
         # If a simulation was requested, compare the results.
         if self._data[data_idx][self._modelica_tool]['simulate']:
             # Iterate over the pairs of data that are to be plotted together
-            timOfMaxErr = dict()
-            noOldResults = []  # List of variables for which no old results have been found
-
             list_var_ref = [el for el in y_ref.keys() if not re.search('time', el, re.I)]
             list_var_sim = [
                 el for gr in y_sim for el in gr.keys() if not re.search(
@@ -2097,6 +2957,8 @@ class Tester(object):
             # List that collects errors for this case. This allows to report only one error if multiple trajectories
             # are not matching from a single simulation.
             errors = []
+            # Times series to compare, or None for a variable without old results
+            comparisons = []
             for pai in y_sim:
                 t_sim = pai['time']
 
@@ -2111,26 +2973,38 @@ class Tester(object):
                                 t = [min(t_sim), max(t_sim)]
                             else:
                                 t = t_sim
-
-                            # Compare times series.
-                            (res, timMaxErr, error) = self.areResultsEqual(
-                                t_ref, y_ref[varNam], t, pai[varNam], varNam, data_idx
-                            )
-
-                            if error:
-                                errors.append(error)
-                            if not res:
-                                newTrajectories = True
-                                timOfMaxErr[varNam] = timMaxErr
+                            comparisons.append((t_ref, y_ref[varNam], t, pai[varNam], varNam))
                         else:
-                            # There is no old data series for this variable name
-                            errors.append(f"Did not find variable {varNam} in old results.")
-                            newTrajectories = True
-                            noOldResults.append(varNam)
+                            comparisons.append((None, None, None, None, varNam))
+
+            # The legacy comparison compares all variables of the result file at once.
+            if self._comp_tool == 'legacy':
+                legacy_results = self._legacy_results_equal(
+                    [c for c in comparisons if c[0] is not None], data_idx)
+            for (tOld, yOld, tNew, yNew, varNam) in comparisons:
+                if tOld is not None:
+                    # Compare times series.
+                    if self._comp_tool == 'legacy':
+                        (res, timMaxErr, error) = legacy_results[varNam]
+                    else:
+                        (res, timMaxErr, error) = self.areResultsEqual(
+                            tOld, yOld, tNew, yNew, varNam, data_idx
+                        )
+
+                    if error:
+                        errors.append(error)
+                    if not res:
+                        newTrajectories = True
+                        timOfMaxErr[varNam] = timMaxErr
+                else:
+                    # There is no old data series for this variable name
+                    errors.append(f"Did not find variable {varNam} in old results.")
+                    newTrajectories = True
+                    noOldResults.append(varNam)
             if len(errors) > 0:
                 self._reporter.writeError(
                     "{}: Errors during result verification.\n           {}".format(
-                        refFilNam, '\n           '.join(errors)))
+                        os.path.basename(oldRefFulFilNam), '\n           '.join(errors)))
         # Compare the simulation statistics
         # There are these cases:
         # 1. The old reference results have no statistics, in which case new results may be written.
@@ -2144,40 +3018,12 @@ class Tester(object):
                 newStatistics = self._check_statistics(
                     old_results, y_tra, stage, newTrajectories, newStatistics, model_name)
 
-        # If the users selected "Y" or "N" (to not accept or reject any new results) in previous tests,
-        # or if the script is run in batch mode, then don't plot the results.
-        # If we found an error, plot the results, and ask the user to accept or
-        # reject the new values.
-        if (newTrajectories or newStatistics) and (not self._batch) and (
-                not ans == "N") and (not ans == "Y"):
-            if newTrajectories and newStatistics:
-                print(f"{self._color_ERROR}             For {refFilNam},")
-                print(
-                    f"             update reference files with new {self._color_BOLD}statistics and trajectories{self._color_ERROR}?{self._color_ENDC}")
-            elif newStatistics:
-                print(f"{self._color_WARNING}             For {refFilNam},")
-                print(
-                    f"             update reference files with new {self._color_BOLD}statistics{self._color_WARNING}?{self._color_ENDC}")
-            else:
-                print(f"{self._color_ERROR}             For {refFilNam},")
-                print(
-                    f"             update reference files with new {self._color_BOLD}trajectories{self._color_ERROR}?{self._color_ENDC}")
-
-            if newTrajectories:
-                if self._comp_tool == 'legacy':
-                    print("(Close plot window to continue.)")
-                    self._legacy_plot(y_sim, t_ref, y_ref, noOldResults, timOfMaxErr, matFilNam)
-                else:
-                    self._funnel_plot(model_name)
-
-            while not (ans == "n" or ans == "y" or ans == "Y" or ans == "N"):
-                ans = input("             Enter: y(yes), n(no), Y(yes for all), N(no for all): ")
-
-            if ans == "y" or ans == "Y":
-                # update the flag
-                updateReferenceData = True
-
-        return (updateReferenceData, (newTrajectories or newStatistics), ans)
+        return {'y_ref': y_ref,
+                't_ref': t_ref,
+                'newTrajectories': newTrajectories,
+                'newStatistics': newStatistics,
+                'noOldResults': noOldResults,
+                'timOfMaxErr': timOfMaxErr}
 
     def _funnel_plot(self, model_name, browser=None):
         """Plot comparison results generated by pyfunnel."""
@@ -2648,6 +3494,131 @@ class Tester(object):
                 total_size += os.path.getsize(fp)
         return total_size
 
+    def _needs_verification(self, data):
+        """ Return ``True`` if the results of the test case ``data`` need to be read and verified.
+        """
+        # Only check data that need to be translated, simulated or exported as an FMU
+        check_condition = \
+            (self._isPresentAndTrue('translate', data[self._modelica_tool]) or
+                self._isPresentAndTrue('simulate', data[self._modelica_tool]) or
+                self._isPresentAndTrue('exportFMU', data[self._modelica_tool]))
+        # Only if the simulation was successful are we reading the results.
+        # (Simulation errors are reported earlier already.)
+
+        if 'simulation' in data[self._modelica_tool]:
+            check_condition = check_condition and data[self._modelica_tool]['simulation']['success']
+        return check_condition
+
+    def _verify_test_case(self, data_idx):
+        """ Read the results of the test case ``self._data[data_idx]`` and compare them
+            with the reference results.
+
+            This method does not interact with the user, hence it can run in a worker process.
+            The messages for the reporter and the comparison info are recorded rather than written,
+            and returned together with the results as a dictionary that is applied
+            by :func:`_checkReferencePoints`.
+        """
+        data = self._data[data_idx]
+        refDir = os.path.join(self._libHome, 'Resources', 'ReferenceResults', 'Dymola')
+        reporter = self._reporter
+        comp_info = self._comp_info
+        self._reporter = _MessageRecorder()
+        self._comp_info = []
+        ret = {'read_failed': False,
+               'unicode_error': False,
+               'y_sim': None,
+               'y_tra': None,
+               'comparison': None}
+        try:
+            if 'ResultFile' in data:
+                idx = self._init_comp_info(data['model_name'], data['ResultFile'])
+            else:
+                idx = self._init_comp_info(data['model_name'], None)
+            # Convert 'aa/bb.mos' to 'aa_bb.txt'
+            mosFulFilNam = os.path.join(self.getLibraryName(), data['ScriptFile'])
+            mosFulFilNam = mosFulFilNam.replace(os.sep, '_')
+            refFilNam = os.path.splitext(mosFulFilNam)[0] + ".txt"
+            try:
+                # extract simulation results from the ".mat" file corresponding to "filNam"
+                warnings = []
+                errors = []
+                # Get the simulation results if a simulation was requested
+                y_sim = self._getSimulationResults(
+                    data, warnings, errors) if data[self._modelica_tool]['simulate'] else None
+                # Get the translation statistics
+                if self._modelica_tool == 'dymola':
+                    y_tra = self._getDymolaTranslationStatistics(data, warnings, errors)
+                else:
+                    y_tra = None
+                for entry in warnings:
+                    self._reporter.writeWarning(entry)
+                for entry in errors:
+                    self._reporter.writeError(entry)
+                if len(errors) > 0:
+                    # If there were errors when getting the results or translation statistics
+                    # update self._comp_info to log errors and turn flags to return
+                    list_var_ref = [el for gr in data['ResultVariables'] for el in gr]
+                    for iv, var_ref in enumerate(list_var_ref):
+                        if iv == 0:
+                            self._update_comp_info(
+                                idx,
+                                var_ref,
+                                None,
+                                False,
+                                0,
+                                'Translation, simulation or extracting simulation results failed. {}'.format(
+                                    '\n'.join(errors)),
+                                data_idx)
+                        else:
+                            self._update_comp_info(idx, var_ref, None, False, 0, '', data_idx)
+                    ret['read_failed'] = True
+
+            except UnicodeDecodeError as e:
+                em = "UnicodeDecodeError: {0}".format(e)
+                em += "Output file of " + data['ScriptFile'] + " is excluded from unit tests.\n"
+                em += "The model appears to contain a non-asci character\n"
+                em += "in the comment of a variable, parameter or constant.\n"
+                em += "Check " + data['ScriptFile'] + " and the classes it instantiates.\n"
+                self._reporter.writeError(em)
+                ret['unicode_error'] = True
+            else:
+                ret['y_sim'] = y_sim
+                ret['y_tra'] = y_tra
+                # If the reference file exists, compare the results.
+                oldRefFulFilNam = os.path.join(refDir, refFilNam)
+                if not ret['read_failed'] and data[self._modelica_tool]['simulate'] and \
+                        os.path.exists(oldRefFulFilNam):
+                    ret['comparison'] = self._compare_with_reference(
+                        data_idx, oldRefFulFilNam, y_sim, y_tra)
+        finally:
+            ret['messages'] = self._reporter.messages
+            ret['comp_info'] = self._comp_info
+            self._reporter = reporter
+            self._comp_info = comp_info
+        return ret
+
+    def _verification_context(self):
+        """ Return the attributes that a worker process needs to run :func:`_verify_test_case`.
+
+            The worker gets this dictionary rather than the Tester, which also holds
+            the process pools, the reporter and the results of all other steps.
+        """
+        return {nam: getattr(self, nam) for nam in _VERIFICATION_ATTRIBUTES}
+
+    def _apply_verification(self, verification):
+        """ Write the messages, and add the comparison info, that :func:`_verify_test_case` recorded.
+        """
+        for (method, message) in verification['messages']:
+            getattr(self._reporter, method)(message)
+        for entry in verification['comp_info']:
+            com = entry['comparison']
+            idx = self._init_comp_info(entry['model'], com['file_name'])
+            tar = self._comp_info[idx]['comparison']
+            for key in ['variables', 'funnel_dirs', 'test_passed', 't_err_max', 'warnings', 'var_groups']:
+                tar[key].extend(com[key])
+            if len(tar['variables']) > 0:
+                tar['success_rate'] = sum(tar['test_passed']) / len(tar['variables'])
+
     def _checkReferencePoints(self, ans):
         """ Check reference points from each regression test and compare it with the previously
             saved reference points of the same test stored in the library home folder.
@@ -2661,6 +3632,12 @@ class Tester(object):
             further processing. The function returns ``0`` if there were no problems. In
             case of wrong simulation results, this function also returns ``0``, as this is
             not considered an error in executing this function.
+
+            Test cases that have already been verified while the simulations were running,
+            see :func:`_submit_verification`, are not verified again.
+            If more than one processor is used, the other test cases are verified
+            in a process pool. Their results are applied, and the user is asked
+            for feedback, in the order of the test cases, as in the serial verification.
         """
         # Check if the directory
         # "self._libHome\\Resources\\ReferenceResults\\Dymola" exists, if not
@@ -2669,79 +3646,48 @@ class Tester(object):
         if not os.path.exists(refDir):
             os.makedirs(refDir)
 
+        remaining = [data_idx for data_idx, data in enumerate(self._data)
+                     if data_idx not in self._verifications and self._needs_verification(data)]
+        if len(remaining) >= _MIN_PARALLEL_VERIFICATION and self._nPro > 1:
+            po = multiprocessing.Pool(min(self._nPro, len(remaining)),
+                                      initializer=_init_verification_worker,
+                                      initargs=(self._verification_context(),))
+            for data_idx in remaining:
+                self._verifications[data_idx] = po.apply_async(_verify_test_case, (data_idx,))
+            po.close()
+        else:
+            po = None
+
         updateReferenceData = False
         ret_val = 0
         for data_idx, data in enumerate(self._data):
             # Index to self._comp_info
             # Models that only export an FMU have no field data['ResultFile']
             if 'ResultFile' in data:
-                idx = self._init_comp_info(data['model_name'], data['ResultFile'])
+                self._init_comp_info(data['model_name'], data['ResultFile'])
             else:
-                idx = self._init_comp_info(data['model_name'], None)
-            # Only check data that need to be translated, simulated or exported as an FMU
-            check_condition = \
-                (self._isPresentAndTrue('translate', data[self._modelica_tool]) or
-                    self._isPresentAndTrue('simulate', data[self._modelica_tool]) or
-                    self._isPresentAndTrue('exportFMU', data[self._modelica_tool]))
-            # Only if the simulation was successful are we reading the results.
-            # (Simulation errors are reported earlier already.)
-
-            if 'simulation' in data[self._modelica_tool]:
-                check_condition = check_condition and data[self._modelica_tool]['simulation']['success']
-
-            if check_condition:
-                get_user_prompt = True
+                self._init_comp_info(data['model_name'], None)
+
+            if self._needs_verification(data):
                 # Convert 'aa/bb.mos' to 'aa_bb.txt'
                 mosFulFilNam = os.path.join(self.getLibraryName(), data['ScriptFile'])
                 mosFulFilNam = mosFulFilNam.replace(os.sep, '_')
                 refFilNam = os.path.splitext(mosFulFilNam)[0] + ".txt"
-                try:
-                    # extract simulation results from the ".mat" file corresponding to "filNam"
-                    warnings = []
-                    errors = []
-                    # Get the simulation results if a simulation was requested
-                    y_sim = self._getSimulationResults(
-                        data, warnings, errors) if data[self._modelica_tool]['simulate'] else None
-                    # Get the translation statistics
-                    if self._modelica_tool == 'dymola':
-                        y_tra = self._getDymolaTranslationStatistics(data, warnings, errors)
-                    else:
-                        y_tra = None
-                    for entry in warnings:
-                        self._reporter.writeWarning(entry)
-                    for entry in errors:
-                        self._reporter.writeError(entry)
-                    if len(errors) > 0:
-                        # If there were errors when getting the results or translation statistics
-                        # update self._comp_info to log errors and turn flags to return
-                        list_var_ref = [el for gr in data['ResultVariables'] for el in gr]
-                        for iv, var_ref in enumerate(list_var_ref):
-                            if iv == 0:
-                                self._update_comp_info(
-                                    idx,
-                                    var_ref,
-                                    None,
-                                    False,
-                                    0,
-                                    'Translation, simulation or extracting simulation results failed. {}'.format(
-                                        '\n'.join(errors)),
-                                    data_idx)
-                            else:
-                                self._update_comp_info(idx, var_ref, None, False, 0, '', data_idx)
-                        # flags to return
-                        ret_val = 1
-                        get_user_prompt = False
 
-                except UnicodeDecodeError as e:
-                    em = "UnicodeDecodeError: {0}".format(e)
-                    em += "Output file of " + data['ScriptFile'] + " is excluded from unit tests.\n"
-                    em += "The model appears to contain a non-asci character\n"
-                    em += "in the comment of a variable, parameter or constant.\n"
-                    em += "Check " + data['ScriptFile'] + " and the classes it instantiates.\n"
-                    self._reporter.writeError(em)
+                pending = self._verifications.pop(data_idx, None)
+                if pending is None:
+                    verification = self._verify_test_case(data_idx)
                 else:
+                    verification = pending.get()
+                self._apply_verification(verification)
+                y_sim = verification['y_sim']
+                y_tra = verification['y_tra']
+                if verification['read_failed']:
+                    # flags to return
+                    ret_val = 1
+                elif not verification['unicode_error']:
                     # if there was no error for this test case, check user feedback for result
-                    if get_user_prompt and data[self._modelica_tool]['simulate']:
+                    if data[self._modelica_tool]['simulate']:
                         # Reset answer, unless it is set to Y or N, or
                         # unless the tests run in batch mode
                         if not (self._batch or ans == "Y" or ans == "N"):
@@ -2751,11 +3697,12 @@ class Tester(object):
                         oldRefFulFilNam = os.path.join(refDir, refFilNam)
                         # If the reference file exists, and if the reference file contains
                         # results, compare the results.
-                        if os.path.exists(oldRefFulFilNam):
+                        if verification['comparison'] is not None:
                             # print('Found results for ' + oldRefFulFilNam)
                             # Note that y_sim is None if a model was requested to be not simulated.
                             [updateReferenceData, _, ans] = self._compareResults(
                                 data_idx, oldRefFulFilNam, y_sim, y_tra, refFilNam, ans,
+                                comparison=verification['comparison'],
                             )
                         else:
                             # Reference file does not exist
@@ -2806,6 +3753,9 @@ class Tester(object):
                                 data['ScriptFile'] +
                                 " is excluded from result test.")
 
+        if po is not None:
+            po.join()
+
         # Write all results to comparison log file and inform user.
         with open(self._comp_log_file, 'w', encoding="utf-8-sig") as comp_log:
             comp_log.write("{}\n".format(json.dumps(self._comp_info, indent=2, sort_keys=True)))
@@ -2820,105 +3770,147 @@ to access a summary of the comparison results.\n""".format(
         return ret_val
 
     def _performTranslationErrorChecks(self, logFil, stat):
-        with open(logFil, mode="rt", encoding="utf-8-sig") as fil:
-            lines = fil.readlines()
+        """ Add the counter of each entry of the error dictionary to ``stat``.
 
-        for k, v in list(self._error_dict.get_dictionary().items()):
-            stat[k] = 0
-            for line in lines:
-                # use regex to extract first group and sum them in stat
-                if 'is_regex' in v and v['is_regex']:
-                    import re
-                    m = re.search(v["tool_message"], line)
-                    if m is not None:
-                        stat[k] = stat[k] + int(m.group(1))
-                # otherwise, default: count the number of line occurrences
-                else:
-                    if v["tool_message"] in line:
-                        stat[k] = stat[k] + 1
+            The translation log ``logFil`` is read and scanned once. For Dymola, the
+            model statistics are stored for :func:`_getDymolaTranslationStatistics`.
+        """
+        if self._log_scanner is None:
+            self._log_scanner = of.LogScanner.from_error_dictionary(
+                self._error_dict, statistics=self._modelica_tool == 'dymola')
+
+        lines = io.StringIO(self._read_translation_log(logFil)).readlines()
 
+        (counters, statistics) = self._log_scanner.scan(lines)
+        stat.update(counters)
+        if statistics is not None:
+            self._translation_statistics[os.path.abspath(logFil)] = statistics
         return stat
 
-    def _checkSimulationError(self, errorFile):
-        """ Check whether the simulation had any errors, and
-            write the error messages to ``self._reporter``.
+    def _read_translation_log(self, logFil):
+        """ Return the content of the translation log ``logFil``,
+            and append it to the simulator log file unless it has already been appended.
         """
-        import json
+        with open(logFil, mode="r", encoding="utf-8-sig") as fil:
+            text = fil.read()
+        if os.path.abspath(logFil) not in self._translation_logs_read:
+            with open(self._simulator_log_file, mode="a", encoding="utf-8") as logFil2:
+                logFil2.write(text)
+            self._translation_logs_read.add(os.path.abspath(logFil))
+        return text
+
+    def _start_simulation_checks(self):
+        """ Prepare the log files and the error counters for :func:`_check_test_cases`.
+        """
+        self._statistics_records = []
+        self._translation_logs_read = set()
+        # Error counters
+        self._simulation_errors = {'check': 0, 'simulate': 0, 'FMUExport': 0, 'translation': False}
 
-        # Read the json file with the statistics
-        if not os.path.isfile(self._statistics_log):
-            raise IOError(
-                "Statistics file {} does not exist.".format(
-                    os.path.abspath(
-                        self._statistics_log)))
+        with open(self._simulator_log_file, mode="w", encoding="utf-8"):
+            pass
+        if self._modelica_tool == 'dymola':
+            # Header for dump file
+            with open(self._failed_simulator_log_file, "w") as f:
+                f.write("Automatically generated BuildingsPy dump file for failed translations.\n\n")
 
-        with open(self._statistics_log, mode="rt", encoding="utf-8-sig") as fil:
-            try:
-                stat = json.load(fil)['testCase']
-            except ValueError as e:
-                raise ValueError("Failed to parse {}.\n{}".format(self._statistics_log, str(e)))
+    def _check_test_cases(self, collector):
+        """ Check the test cases that the worker processes completed since the last call.
 
-        # Error counters
-        iChe = 0
-        iCom = 0
-        iSim = 0
-        iFMU = 0
-
-        # Header for dump file
-        with open(self._failed_simulator_log_file, "w") as f:
-            f.write("Automatically generated BuildingsPy dump file for failed translations.\n\n")
-
-        # Check for errors
-        hasTranslationErrors = False
-        for ele in stat:
-            hasTranslationError = False
-            if 'check' in ele and ele['check']['result'] is False:
-                hasTranslationError = True
-                iChe = iChe + 1
-                self._reporter.writeError("Model check failed for '%s'." % ele["model"])
-            if 'simulate' in ele and ele['simulate']['result'] is False:
-                hasTranslationError = True
-                iSim = iSim + 1
-                self._reporter.writeError("Simulation failed for '%s'." %
-                                          ele["simulate"]["command"])
-            elif 'FMUExport' in ele and ele['FMUExport']['result'] is False:
-                iFMU = iFMU + 1
-                self._reporter.writeError("FMU export failed for '%s'." %
-                                          ele["FMUExport"]["command"])
-
-            # Check for problems.
-            # First, determine whether we had a simulation or an FMU export
-            if 'simulate' in ele:
-                key = 'simulate'
-            else:
-                key = 'FMUExport'
-
-            if key in ele:
-                logFil = ele[key]["translationLog"]
-                ele[key] = self._performTranslationErrorChecks(logFil, ele[key])
-                for k, v in list(self._error_dict.get_dictionary().items()):
-                    # For OPTIMICA, we neither have simulate nor FMUExport
-                    if ele[key][k] > 0:
-                        self._reporter.writeWarning(v["model_message"].format(ele[key]["command"]))
-                        self._error_dict.increment_counter(k)
-
-            if hasTranslationError:
-                hasTranslationErrors = True
-                with open(self._failed_simulator_log_file, "a") as f:
-                    f.write("===============================\n")
-                    f.write("=====START OF NEW LOG FILE=====\n")
-                    f.write("===============================\n")
-                    with open(logFil, "r") as f2:
-                        f.write(f2.read())
-                    f.write("\n\n\n")
-
-        if iChe > 0:
-            print("Number of models that failed check                           : {}".format(iChe))
-        if iSim > 0:
-            print("Number of models that failed to simulate                     : {}".format(iSim))
-        if iFMU > 0:
-            print("Number of models that failed to export as an FMU             : {}".format(iFMU))
-        if hasTranslationErrors:
+            :param collector: The :class:`_StatisticsCollector` of the worker processes.
+
+            The statistics of each test case are kept in ``self._statistics_records``,
+            and the errors are written to ``self._reporter``.
+        """
+        try:
+            records = collector.read()
+        except ValueError as e:
+            self._reporter.writeError(str(e))
+            raise
+        self._check_records(records)
+
+    def _check_records(self, records):
+        """ Check the test cases with the statistics ``records``, see :func:`_check_test_cases`.
+        """
+        for ele in records:
+            self._check_test_case(ele)
+            self._statistics_records.append(ele)
+            self._submit_verification(ele['model'])
+
+    def _submit_verification(self, model_name):
+        """ Submit the verification of the results of ``model_name`` to the verification pool.
+
+            The results are read and compared with the reference results by a worker process
+            while the other simulations are still running, and applied
+            by :func:`_checkReferencePoints`. This method does nothing if there is no pool.
+        """
+        if self._verification_pool is None:
+            return
+        for data_idx in self._data_indices.get(model_name, []):
+            if data_idx not in self._verifications and self._needs_verification(self._data[data_idx]):
+                self._verifications[data_idx] = self._verification_pool.apply_async(
+                    _verify_test_case, (data_idx,))
+
+    def _check_test_case(self, ele):
+        """ Check whether the test case with the statistics ``ele`` had any errors, and
+            write the error messages to ``self._reporter``.
+        """
+        errors = self._simulation_errors
+        hasTranslationError = False
+        if 'check' in ele and ele['check']['result'] is False:
+            hasTranslationError = True
+            errors['check'] += 1
+            self._reporter.writeError("Model check failed for '%s'." % ele["model"])
+        if 'simulate' in ele and ele['simulate']['result'] is False:
+            hasTranslationError = True
+            errors['simulate'] += 1
+            self._reporter.writeError("Simulation failed for '%s'." %
+                                      ele["simulate"]["command"])
+        elif 'FMUExport' in ele and ele['FMUExport']['result'] is False:
+            errors['FMUExport'] += 1
+            self._reporter.writeError("FMU export failed for '%s'." %
+                                      ele["FMUExport"]["command"])
+
+        # Check for problems.
+        # First, determine whether we had a simulation or an FMU export
+        if 'simulate' in ele:
+            key = 'simulate'
+        else:
+            key = 'FMUExport'
+
+        if key in ele:
+            logFil = ele[key]["translationLog"]
+            ele[key] = self._performTranslationErrorChecks(logFil, ele[key])
+            for k, v in list(self._error_dict.get_dictionary().items()):
+                # For OPTIMICA, we neither have simulate nor FMUExport
+                if ele[key][k] > 0:
+                    self._reporter.writeWarning(v["model_message"].format(ele[key]["command"]))
+                    self._error_dict.increment_counter(k)
+
+        if hasTranslationError:
+            errors['translation'] = True
+            with open(self._failed_simulator_log_file, "a") as f:
+                f.write("===============================\n")
+                f.write("=====START OF NEW LOG FILE=====\n")
+                f.write("===============================\n")
+                with open(logFil, "r") as f2:
+                    f.write(f2.read())
+                f.write("\n\n\n")
+
+    def _checkSimulationError(self, errorFile):
+        """ Write the number of models that failed, and the summary messages.
+
+            The test cases have already been checked by :func:`_check_test_case`
+            while the simulations were running.
+        """
+        errors = self._simulation_errors
+        if errors['check'] > 0:
+            print("Number of models that failed check                           : {}".format(errors['check']))
+        if errors['simulate'] > 0:
+            print("Number of models that failed to simulate                     : {}".format(errors['simulate']))
+        if errors['FMUExport'] > 0:
+            print("Number of models that failed to export as an FMU             : {}".format(errors['FMUExport']))
+        if errors['translation']:
             print(
                 "Check or simulation failed, see {} for more details about the failed models.".format(
                     self._failed_simulator_log_file))
@@ -2970,27 +3962,38 @@ to access a summary of the comparison results.\n""".format(
     def printNumberOfClasses(self):
         """ Print the number of models, blocks and functions to the
             standard output stream
-        """
 
-        iMod = 0
-        iBlo = 0
-        iFun = 0
+            The header of each ``.mo`` file is read once to find the kind of its class.
+            The kinds are stored in the discovery cache, see :func:`setDiscoveryCache`,
+            and only new or changed files are read again.
+            If many files need to be read, they are read in parallel.
+        """
+        mo_files = []
         for root, _, files in os.walk(self._libHome):
-            pos = root.find('.svn' or '.git')
-            # skip .svn folders
-            if pos == -1:
+            # skip .svn and .git folders
+            if root.find('.svn') == -1 and root.find('.git') == -1:
                 for filNam in files:
-                    # find .mo files
-                    pos = filNam.find('.mo')
-                    if pos > -1 and (root.find('Examples') == -1 or root.find('Validation') == -1):
-                        # find classes that are not partial
-                        filFulNam = os.path.join(root, filNam)
-                        iMod = self._checkKey("model", filFulNam, iMod)
-                        iBlo = self._checkKey("block", filFulNam, iBlo)
-                        iFun = self._checkKey("function", filFulNam, iFun)
-        print("Number of models   : {!s}".format(iMod))
-        print("          blocks   : {!s}".format(iBlo))
-        print("          functions: {!s}".format(iFun))
+                    if filNam.endswith('.mo') and (
+                            root.find('Examples') == -1 or root.find('Validation') == -1):
+                        mo_files.append(os.path.join(root, filNam))
+
+        cache = _DiscoveryCache(self._get_discovery_cache_file(), self._modelica_tool)
+        kinds = [cache.get_class_kind(f) for f in mo_files]
+        changed = [i for i in range(len(mo_files)) if kinds[i] is None]
+        if len(changed) >= _MIN_PARALLEL_CLASS_COUNT and self._nPro > 1:
+            with multiprocessing.Pool(min(self._nPro, len(changed))) as po:
+                read = po.map(_class_kind, [mo_files[i] for i in changed], chunksize=64)
+        else:
+            read = [_class_kind(mo_files[i]) for i in changed]
+        for (i, kind) in zip(changed, read):
+            kinds[i] = kind
+            cache.put_class_kind(mo_files[i], kind)
+        cache.save()
+
+        # find classes that are not partial
+        print("Number of models   : {!s}".format(kinds.count("model")))
+        print("          blocks   : {!s}".format(kinds.count("block")))
+        print("          functions: {!s}".format(kinds.count("function")))
 
     def _getModelCheckCommand(self, mosFilNam):
         """ Return lines that conduct a model check in pedantic mode.
@@ -3085,29 +4088,6 @@ to access a summary of the comparison results.\n""".format(
         """
         import platform
 
-        ##################################################################
-        # Internal functions
-        def _write_translation_stats(runFil, values):
-
-            # Close the bracket for the JSON object
-            runFil.write("""Modelica.Utilities.Streams.print("      }", """
-                         + '"' + values['statisticsLog'] + '"' + ");\n")
-
-        def _print_end_of_json(isLastItem, fileHandle, logFileName):
-            if isLastItem:
-                fileHandle.write(
-                    "Modelica.Utilities.Streams.print(\"    }\", \"%s\")\n" % logFileName)
-                fileHandle.write(
-                    "Modelica.Utilities.Streams.print(\"  ]\", \"%s\")\n" % logFileName)
-                fileHandle.write("Modelica.Utilities.Streams.print(\"}\", \"%s\")\n" % logFileName)
-            else:
-                fileHandle.write(
-                    "Modelica.Utilities.Streams.print(\"  },\", \"%s\")\n" % logFileName)
-
-        ##################################################################
-        # Count the number of experiments that need to be simulated or exported as an FMU.
-        # This is needed to properly close the json brackets.
-        nItem = 0
         # Count how many tests need to be simulated.
         nTes = len(tra_data_pro)
         # Number of generated unit tests
@@ -3155,19 +4135,10 @@ Advanced.TranslationInCommandLog := true;
 Modelica.Utilities.Files.remove(\"{self._simulator_log_file}\");
 Modelica.Utilities.Files.remove(\"{self._statistics_log}\");
 """)
-        runFil.write(r"""
-Modelica.Utilities.Streams.print("{\"testCase\" : [", "%s");
-""" % self._statistics_log)
-
-        for i in range(nTes):
-            if self._isPresentAndTrue(
-                    'translate',
-                    tra_data_pro[i]['dymola']) or self._isPresentAndTrue(
-                    'exportFMU',
-                    tra_data_pro[i]['dymola']):
-                nItem = nItem + 1
-        iItem = 0
-        # Write unit tests for this process
+        # Write unit tests for this process.
+        # The statistics of each test case are written as one line with a JSON object
+        # once the test case is completed, so that they can be checked while the other
+        # test cases are still running.
         for i in range(nTes):
             # Check if this mos file should be simulated
             if self._isPresentAndTrue(
@@ -3175,7 +4146,6 @@ Modelica.Utilities.Streams.print("{\"testCase\" : [", "%s");
                     tra_data_pro[i]['dymola']) or self._isPresentAndTrue(
                     'exportFMU',
                     tra_data_pro[i]['dymola']):
-                isLastItem = (iItem == nItem - 1)
                 mosFilNam = os.path.join(self.getLibraryName(),
                                          "Resources", "Scripts", "Dymola",
                                          tra_data_pro[i]['ScriptFile'])
@@ -3236,12 +4206,8 @@ clearlog();
 {set_non_pedantic}
 rCheck = {checkCommand};
 {set_pedantic}
-Modelica.Utilities.Streams.print("    {{ \"file\" :  \"{mosWithPath}\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("      \"model\" : \"{model_name}\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("      \"check\" : {{", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"command\" : \"{checkCommandString};\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"result\"  : " + String(rCheck), "{statisticsLog}");
-Modelica.Utilities.Streams.print("      }},", "{statisticsLog}");
+staRecord = "{{ \"file\" : \"{mosWithPath}\", \"model\" : \"{model_name}\", ";
+staRecord = staRecord + "\"check\" : {{ \"command\" : \"{checkCommandString};\", \"result\" : " + String(rCheck) + " }}";
 """
             runFil.write(template.format(**values))
             ##########################################################################
@@ -3319,21 +4285,16 @@ end if;
 """
                 runFil.write(template.format(**values))
                 template = r"""
-Modelica.Utilities.Streams.print("      \"simulate\" : {{", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"command\" : \"RunScript(\\\"Resources/Scripts/Dymola/{scriptFile}\\\");\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"translationLog\"  : \"{translationLog}\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"elapsed_time\"  :" + intTim + ",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"jacobians\"  :" + numJac + ",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"state_events\"  :" + numSta + ",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"start_time\"  :" + String({start_time}) + ",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"final_time\"  :" + String({final_time}) + ",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"result\"  : " + String(iSuc > 0), "{statisticsLog}");
+staRecord = staRecord + ", \"simulate\" : {{ \"command\" : \"RunScript(\\\"Resources/Scripts/Dymola/{scriptFile}\\\");\", ";
+staRecord = staRecord + "\"translationLog\" : \"{translationLog}\", ";
+staRecord = staRecord + "\"elapsed_time\" :" + intTim + ", ";
+staRecord = staRecord + "\"jacobians\" :" + numJac + ", ";
+staRecord = staRecord + "\"state_events\" :" + numSta + ", ";
+staRecord = staRecord + "\"start_time\" :" + String({start_time}) + ", ";
+staRecord = staRecord + "\"final_time\" :" + String({final_time}) + ", ";
+staRecord = staRecord + "\"result\" : " + String(iSuc > 0) + " }}";
 """
                 runFil.write(template.format(**values))
-                _write_translation_stats(runFil, values)
-                _print_end_of_json(isLastItem,
-                                   runFil,
-                                   self._statistics_log)
                 ##########################################################################
                 # FMU export
             if tra_data_pro[i]['dymola']['exportFMU']:
@@ -3360,16 +4321,16 @@ end if;
 """
                 runFil.write(template.format(**values))
                 template = r"""
-Modelica.Utilities.Streams.print("      \"FMUExport\" : {{", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"command\" :\"RunScript(\\\"Resources/Scripts/Dymola/{scriptFile}\\\");\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"translationLog\"  : \"{translationLog}\",", "{statisticsLog}");
-Modelica.Utilities.Streams.print("        \"result\"  : " + String(iSuc > 0), "{statisticsLog}");
+staRecord = staRecord + ", \"FMUExport\" : {{ \"command\" : \"RunScript(\\\"Resources/Scripts/Dymola/{scriptFile}\\\");\", ";
+staRecord = staRecord + "\"translationLog\" : \"{translationLog}\", ";
+staRecord = staRecord + "\"result\" : " + String(iSuc > 0) + " }}";
 """
                 runFil.write(template.format(**values))
-                _write_translation_stats(runFil, values)
-                _print_end_of_json(isLastItem,
-                                   runFil,
-                                   self._statistics_log)
+
+            if tra_data_pro[i]['dymola']['exportFMU'] or tra_data_pro[i]['dymola']['translate']:
+                # Write the statistics of this test case as one line.
+                runFil.write(
+                    'Modelica.Utilities.Streams.print(staRecord + " }}", "{statisticsLog}");\n'.format(**values))
 
             if not (tra_data_pro[i]['dymola']['exportFMU']
                     or tra_data_pro[i]['dymola']['translate']):
@@ -3378,7 +4339,6 @@ Modelica.Utilities.Streams.print("        \"result\"  : " + String(iSuc > 0), "{
             self._removePlotCommands(absMosFilNam)
             self._updateResultFile(absMosFilNam, tra_data_pro[i]['model_name'])
             nUniTes = nUniTes + 1
-            iItem = iItem + 1
 
         if platform.system() == 'Windows':
             # Reset DDE to original settings
@@ -3395,6 +4355,100 @@ exit();
         runFil.close()
         return nUniTes
 
+    def _get_tool_version(self):
+        """ Return the version of the Modelica tool that is part of the cache keys."""
+        if self._tool_version is not None:
+            return self._tool_version
+        exe = shutil.which(self.getModelicaCommand())
+        if exe is None:
+            return self.getModelicaCommand()
+        exe = os.path.realpath(exe)
+        return [exe] + (_file_signature(exe) or [])
+
+    def _get_work_directory(self, dat):
+        """ Return the directory in which the results of the test case ``dat`` are written."""
+        if self._modelica_tool == 'dymola':
+            return os.path.join(dat['ResultDirectory'], self.getLibraryName())
+        return dat['ResultDirectory']
+
+    def _is_cacheable(self, dat):
+        """ Return ``True`` if the results of the test case ``dat`` can be cached."""
+        return self._isPresentAndTrue('translate', dat[self._modelica_tool]) and \
+            not dat['dymola']['exportFMU']
+
+    def _get_simulation_cache_key(self, dat, index):
+        """ Return the key of the test case ``dat`` in the simulation cache.
+
+            :param dat: The entry of the data dictionary.
+            :param index: The :class:`buildingspy.development.dependency_index.DependencyIndex`
+                          of the library.
+        """
+        cache = self._simulation_cache
+        files = [os.path.join(self._libHome, 'Resources', 'Scripts', 'Dymola', dat['ScriptFile'])]
+        # The .mo file of the model, the package.mo files of its enclosing packages,
+        # and all files that these use
+        parts = dat['model_name'].split('.')
+        mo_files = [index.file_of_class('.'.join(parts[:i])) for i in range(1, len(parts) + 1)]
+        required = index.required_files([f for f in mo_files if f is not None])
+        files.extend(required)
+        # Data files, C sources and other resources that these files reference with a modelica:// URI
+        files.extend(index.resources(required))
+        experiment = dict((k, v) for (k, v) in dat.items() if k != 'ResultDirectory')
+        experiment[self._modelica_tool] = dict(
+            (k, v) for (k, v) in dat[self._modelica_tool].items() if k not in ['translation', 'simulation'])
+        return cache.key({
+            'tool': self._modelica_tool,
+            'version': self._get_tool_version(),
+            'pedanticModelica': self._pedanticModelica,
+            'experiment': experiment,
+            'files': sorted([os.path.relpath(f, self._libHome), cache.digest(f)] for f in files)})
+
+    def _restore_cached_test(self, dat):
+        """ Restore the results of the test case ``dat`` from the simulation cache."""
+        directory = self._get_work_directory(dat)
+        record = self._simulation_cache.restore(self._cache_keys[dat['ScriptFile']], directory)
+        if self._modelica_tool == 'dymola':
+            # The statistics refer to the translation log in the directory of the run that was cached.
+            translationLog = record['simulate']['translationLog']
+            record['simulate']['translationLog'] = os.path.join(
+                directory, os.path.basename(translationLog)).replace("\\", "/")
+            self._restored_records.append(record)
+        self._restored_tests.add(dat['ScriptFile'])
+
+    def _update_simulation_cache(self):
+        """ Add the results of the test cases that were simulated successfully to the simulation cache."""
+        if self._simulation_cache is None:
+            return
+        records = dict((ele['file'], ele) for ele in self._statistics_records)
+        for dat in self._data:
+            key = self._cache_keys.get(dat['ScriptFile'])
+            if key is None or dat['ScriptFile'] in self._restored_tests or 'ResultDirectory' not in dat:
+                continue
+            if self._modelica_tool == 'dymola':
+                mosWithPath = os.path.join(self.getLibraryName(), "Resources", "Scripts", "Dymola",
+                                           dat['ScriptFile']).replace("\\", "/")
+                ele = records.get(mosWithPath)
+                if ele is None or not ele['check']['result'] or 'simulate' not in ele \
+                        or not ele['simulate']['result']:
+                    continue
+                file_names = [dat['dymola']['TranslationLogFile']]
+                record = ele
+            else:
+                translation = dat[self._modelica_tool].get('translation')
+                simulation = dat[self._modelica_tool].get('simulation')
+                if translation is None or not translation['success'] \
+                        or simulation is None or not simulation['success']:
+                    continue
+                model_underscore = dat['model_name'].replace(".", "_")
+                file_names = [model_underscore + ".py", model_underscore + "_buildingspy.json"]
+                record = None
+            if dat[self._modelica_tool]['simulate']:
+                file_names.append(dat['ResultFile'])
+            directory = self._get_work_directory(dat)
+            if all(os.path.exists(os.path.join(directory, f)) for f in file_names):
+                self._simulation_cache.put(key, directory, file_names, record)
+        self._simulation_cache.prune()
+
     def _write_runscripts(self):
         """Create the runAll.mos scripts, one per processor (self._nPro).
 
@@ -3416,11 +4470,35 @@ exit();
         else:
             raise RuntimeError("Tool is not supported.")
 
+        # Find the tests whose results are in the simulation cache. These are not simulated.
+        self._cache_keys = {}
+        self._restored_tests = set()
+        self._restored_records = []
+        cached = []
+        if self._simulation_cache is not None:
+            import buildingspy.development.dependency_index as d
+
+            index = d.DependencyIndex(self._libHome)
+            for dat in tra_data:
+                if self._is_cacheable(dat):
+                    key = self._get_simulation_cache_key(dat, index)
+                    self._cache_keys[dat['ScriptFile']] = key
+                    if not self._useExistingResults and self._simulation_cache.contains(key):
+                        cached.append(dat)
+            cached_files = set(dat['ScriptFile'] for dat in cached)
+            tra_data = [dat for dat in tra_data if dat['ScriptFile'] not in cached_files]
+
         # Count how many tests need to be translated.
         nTes = len(tra_data)
-        # Reduced the number of processors if there are fewer examples than processors
+        # Reduced the number of processors if there are fewer examples than processors.
+        # If all tests are restored from the cache, one directory is used for their results.
         if nTes < self._nPro:
-            self.setNumberOfThreads(nTes)
+            self.setNumberOfThreads(nTes if nTes > 0 or len(cached) == 0 else 1)
+
+        # Distribute the tests to the processors, see setResourceBudget
+        lanes = self._schedule_tests(tra_data)
+        self.setNumberOfThreads(len(lanes))
+        self._lanes = [[dat['ScriptFile'] for dat in lane] for lane in lanes]
 
         # Print number of processors
         print(
@@ -3431,26 +4509,28 @@ exit();
             self._setTemporaryDirectories()
 
         for iPro in range(self._nPro):
-            for i in range(iPro, nTes, self._nPro):
+            for dat in lanes[iPro]:
                 # Store ResultDirectory into data dict.
-                tra_data[i]['ResultDirectory'] = self._temDir[iPro]
+                dat['ResultDirectory'] = self._temDir[iPro]
                 # This directory must also be copied into the original data structure.
                 found = False
                 for k in range(len(self._data)):
-                    if self._data[k]['ScriptFile'] == tra_data[i]['ScriptFile']:
-                        self._data[k]['ResultDirectory'] = tra_data[i]['ResultDirectory']
+                    if self._data[k]['ScriptFile'] == dat['ScriptFile']:
+                        self._data[k]['ResultDirectory'] = dat['ResultDirectory']
                         found = True
                         break
                 if not found:
                     raise RuntimeError(
-                        f"Failed to find the original data for {tra_data[i]['ScriptFile']}")
+                        f"Failed to find the original data for {dat['ScriptFile']}")
+
+        for (i, dat) in enumerate(cached):
+            dat['ResultDirectory'] = self._temDir[i % self._nPro]
+            self._restore_cached_test(dat)
 
         for iPro in range(self._nPro):
 
-            tra_data_pro = []
-            for i in range(iPro, nTes, self._nPro):
-                # Copy data used for this process only.
-                tra_data_pro.append(tra_data[i])
+            # Copy data used for this process only.
+            tra_data_pro = list(lanes[iPro])
 
             if self._modelica_tool == 'dymola':
                 # Case for dymola
@@ -3459,9 +4539,12 @@ exit();
                 # Case for non-dymola
                 nUniTes = nUniTes + self._write_runscript_non_dymola(iPro, tra_data_pro)
 
-        if nUniTes == 0:
+        if nUniTes + len(cached) == 0:
             raise RuntimeError(f"Wrong invocation, generated {nUniTes} unit tests.")
 
+        self._number_of_simulations = nUniTes
+        if len(cached) > 0:
+            print("Restored {} regression tests from the simulation cache.".format(len(cached)))
         print("Generated {} regression tests.\n".format(nUniTes))
 
     @staticmethod
@@ -3619,12 +4702,10 @@ exit();
         return
 
     def _run_simulation_info(self):
-        """ Extract simulation data from statistics.json when run unit test with dymola
+        """ Extract simulation data from the statistics of the test cases when run unit test with dymola
         """
-        with open(self._statistics_log, 'r') as f:
-            staVal = simplejson.loads(f.read())
         data = []
-        for case in staVal['testCase']:
+        for case in self._statistics_records:
             if 'FMUExport' not in case:
                 temp = {}
                 temp['model'] = case['model']
@@ -3650,8 +4731,14 @@ exit();
         - creates temporary directories for each processors,
         - copies the directory ``CURRENT_DIRECTORY`` into these
           temporary directories,
-        - creates run scripts that run all regression tests,
+        - restores the results of the regression tests that are in the simulation cache,
+          see :func:`setSimulationCache`,
+        - creates run scripts that run all other regression tests,
         - runs these regression tests,
+        - if more than one processor is used, measures the run time and memory use
+          of each regression test, see :func:`setResourceBudget`,
+        - for Dymola, checks the statistics of each regression test while
+          the other regression tests are still running,
         - collects the dymola log files from each process,
         - writes the combined log file ``unitTests-x.log``
           to the current directory, where `x` is the name of the
@@ -3670,6 +4757,12 @@ exit();
         if self.get_number_of_tests() == 0:
             self.setDataDictionary(self._rootPackage)
 
+        if self._changed_files is not None:
+            self._select_affected_tests()
+            if self.get_number_of_tests() == 0:
+                print("No regression test is affected by the changed files.")
+                return 0
+
         # (Delete and) Create directory for storing funnel data.
         if self._comp_tool == 'funnel':
             shutil.rmtree(self._comp_dir, ignore_errors=True)
@@ -3729,7 +4822,33 @@ exit();
             else:
                 tem_dir.append(di)
 
-        if not self._useExistingResults:
+        # The statistics of Dymola are written by the worker processes as each test case completes
+        self._start_simulation_checks()
+        if self._modelica_tool == 'dymola':
+            # No worker process runs if all tests are restored from the simulation cache
+            collector = _StatisticsCollector(
+                [os.path.join(d, self._statistics_log) for d in tem_dir if self._number_of_simulations > 0])
+        else:
+            collector = None
+
+        # The results of each test case are verified in a separate pool as soon as its
+        # statistics are available, while the other simulations are still running.
+        self._verifications = {}
+        self._verification_pool = None
+        if collector is not None and self._nPro > 1 and not self._skip_verification \
+                and not self._useExistingResults:
+            self._data_indices = defaultdict(list)
+            for data_idx, data in enumerate(self._data):
+                self._data_indices[data['model_name']].append(data_idx)
+            self._verification_pool = multiprocessing.Pool(
+                self._nPro, initializer=_init_verification_worker, initargs=(self._verification_context(),))
+
+        monitor = None
+        # The test cases that are restored from the simulation cache are checked first
+        if collector is not None:
+            self._check_records(self._restored_records)
+
+        if not self._useExistingResults and self._number_of_simulations > 0:
             if self._modelica_tool == 'dymola':
                 if self._showGUI:
                     cmd = [self.getModelicaCommand(), "runAll.mos"]
@@ -3748,63 +4867,53 @@ exit();
             elif self._modelica_tool != 'dymola':
                 cmd = [self.getModelicaCommand(), "run.py"]
             if self._nPro > 1:
+                # Measure the run time and memory of the test cases, see setResourceBudget
+                monitor = _ResourceMonitor(self._temDir, self._lanes)
                 po = multiprocessing.Pool(self._nPro)
-                po.map(functools.partial(runSimulation,
-                                         cmd=cmd),
-                       [x for x in tem_dir])
+                res = po.map_async(functools.partial(runSimulation,
+                                                     cmd=cmd),
+                                   [x for x in tem_dir])
+                # Check the test cases as they complete, and sample the memory more often
+                last_check = time.time()
+                while not res.ready():
+                    res.wait(_MEMORY_POLL_INTERVAL)
+                    if collector is not None and time.time() - last_check >= _STATISTICS_POLL_INTERVAL:
+                        last_check = time.time()
+                        self._check_test_cases(collector)
+                    monitor.sample(self._finished_tests())
                 po.close()
                 po.join()
+                res.get()
             else:
-                if len(self._data) > 0:
-                    runSimulation(tem_dir[0], cmd)
-
-        # Concatenate simulator output files into one file
-        with open(self._simulator_log_file, mode="w", encoding="utf-8") as logFil:
-            for d in self._temDir:
-                for temLogFilNam in glob.glob(
-                    os.path.join(
-                        d,
-                        self.getLibraryName(),
-                        '*.translation.log')):
-                    if os.path.exists(temLogFilNam):
-                        with open(temLogFilNam, mode="r", encoding="utf-8-sig") as fil:
-                            data = fil.read()
-                        logFil.write(data)
-                    else:
-                        self._reporter.writeError(
-                            "Log file '" + temLogFilNam + "' does not exist.\n")
-                        retVal = 1
+                runSimulation(tem_dir[0], cmd)
 
-        # Concatenate simulator statistics into one file
-        if self._modelica_tool == 'dymola':
-            with open(self._statistics_log, mode="w", encoding="utf-8") as logFil:
-                stat = list()
-                for d in self._temDir:
-                    temLogFilNam = os.path.join(d, self.getLibraryName(), self._statistics_log)
-                    if os.path.exists(temLogFilNam):
-                        with open(temLogFilNam.replace('Temp\tmp', 'Temp\\tmp'), mode="r", encoding="utf-8-sig") as temSta:
-                            try:
-                                jsonLog = json.load(temSta)
-                                cas = jsonLog["testCase"]
-                                # Iterate over all test cases of this output file
-                                for ele in cas:
-                                    stat.append(ele)
-                            except ValueError as e:
-                                self._reporter.writeError(
-                                    "Decoding '%s' failed: %s" % (temLogFilNam, e))
-                                raise
-                    else:
-                        self._reporter.writeError(
-                            "Log file '" + temLogFilNam + "' does not exist.\n")
-                        retVal = 1
-                # Dump an array of testCase objects
-                # dump to a string first using json.dumps instead of json.dump
-                json_string = json.dumps({"testCase": stat},
-                                         ensure_ascii=False,
-                                         indent=4,
-                                         separators=(',', ': '),
-                                         sort_keys=True)
-                logFil.write(json_string)
+        if collector is not None:
+            self._check_test_cases(collector)
+            if self._verification_pool is not None:
+                self._verification_pool.close()
+            for temLogFilNam in collector.missing_files():
+                self._reporter.writeError(
+                    "Log file '" + temLogFilNam + "' does not exist.\n")
+                retVal = 1
+
+        if monitor is not None:
+            monitor.sample(self._finished_tests())
+            self._save_resource_profile(monitor.resources)
+            if not monitor.memory_measured:
+                # Not a warning of the reporter, as this would flag the tests to have failed
+                self._reporter.writeOutput(
+                    "The memory of the simulations could not be measured, hence the tests are not scheduled "
+                    "by their memory use. Install psutil to measure it.")
+
+        # Append the translation logs that were not part of a test case to the simulator log file
+        for d in self._temDir:
+            for temLogFilNam in glob.glob(
+                os.path.join(
+                    d,
+                    self.getLibraryName(),
+                    '*.translation.log')):
+                if os.path.abspath(temLogFilNam) not in self._translation_logs_read:
+                    self._read_translation_log(temLogFilNam)
 
         # Check reference results
         if self._batch:
@@ -3835,6 +4944,10 @@ exit();
                     else:
                         retVal = 4
 
+        if self._verification_pool is not None:
+            self._verification_pool.join()
+            self._verification_pool = None
+
         if self._modelica_tool != 'dymola':
             temp = self._verify_non_dymola_runs()
 
@@ -3854,6 +4967,8 @@ exit();
                     else:
                         retVal = 4
 
+        self._update_simulation_cache()
+
         # Update exit code after comparing with reference points
         # and print summary messages.
         if retVal == 0:
@@ -3872,10 +4987,6 @@ exit();
         elapsedTime = time.time() - startTime
         print("Execution time = {:.3f} s".format(elapsedTime))
 
-        # Delete statistics file
-        if self._modelica_tool == 'dymola':
-            os.remove(self._statistics_log)
-
         return retVal
 
     def _model_from_mo(self, mo_file):
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  This module provides the class :class:`SimulationCache`, a content-addressed
+  cache of the results of the regression tests on the local disk.
+
+  It is used by
+  :func:`buildingspy.development.regressiontest.Tester.setSimulationCache`
+  to restore the result files and statistics of the test cases whose inputs
+  did not change, instead of simulating them again.
+
+  Each entry is stored in the directory ``cache_dir/ab/abcdef...``, where
+  ``abcdef...`` is the key of the entry. The directory contains the files of the
+  test case and the file ``buildingspy-cache.json`` that lists them. Entries are
+  written to a temporary directory that is renamed once it is complete, so that
+  several processes can share the same cache directory.
+
+  Entries are never changed or invalidated, as a changed input gives a new key.
+  Hence, the cache grows with each change of the library, unless a size limit
+  is set, in which case :func:`SimulationCache.prune` deletes the least recently
+  used entries. Otherwise, the cache directory needs to be deleted by the user.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+__all__ = ["SimulationCache"]
+
+_MANIFEST = "buildingspy-cache.json"
+
+
+class SimulationCache(object):
+    """ Content-addressed cache of the results of the regression tests.
+
+    :param cache_dir: Directory of the cache. It is created if it does not exist.
+    :param max_bytes: Size limit of the cache in bytes that is enforced by :func:`prune`,
+                      or ``None`` for no limit.
+
+    Usage::
+
+        >>> import os, tempfile
+        >>> from buildingspy.development.simulation_cache import SimulationCache
+        >>> wor = tempfile.mkdtemp()
+        >>> with open(os.path.join(wor, "MyStep.mat"), "w") as f:
+        ...     n = f.write("results")
+        >>> cache = SimulationCache(os.path.join(wor, "cache"))
+        >>> key = cache.key({'tool': 'dymola', 'files': [['MyStep.mo', 'a1b2']]})
+        >>> cache.contains(key)
+        False
+        >>> cache.put(key, wor, ["MyStep.mat"], {'model': 'MyModelicaLibrary.MyStep'})
+        >>> cache.restore(key, os.path.join(wor, "new"))
+        {'model': 'MyModelicaLibrary.MyStep'}
+        >>> os.path.exists(os.path.join(wor, "new", "MyStep.mat"))
+        True
+
+    """
+    _VERSION = 1
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        # Hash of each file, as many test cases use the same files
+        self._digests = {}
+
+    def digest(self, file_name):
+        """ Return the sha256 hash of the content of ``file_name``, or ``None`` if it does not exist.
+
+        The hash of each file is only computed once.
+        """
+        file_name = os.path.abspath(file_name)
+        if file_name not in self._digests:
+            try:
+                with open(file_name, mode="rb") as fil:
+                    self._digests[file_name] = hashlib.sha256(fil.read()).hexdigest()
+            except OSError:
+                self._digests[file_name] = None
+        return self._digests[file_name]
+
+    def key(self, inputs):
+        """ Return the key of ``inputs``.
+
+        :param inputs: A dictionary that can be serialized as JSON, such as the hashes of
+                       the source files, the experiment specification and the tool version.
+        """
+        text = json.dumps([self._VERSION, inputs], sort_keys=True, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def contains(self, key):
+        """ Return ``True`` if the cache has an entry for ``key``."""
+        return os.path.isfile(os.path.join(self._entry(key), _MANIFEST))
+
+    def put(self, key, directory, file_names, record=None):
+        """ Store the files ``file_names`` and the ``record`` as the entry ``key``.
+
+        :param key: The key of the entry, see :func:`key`.
+        :param directory: Directory that contains the files.
+        :param file_names: Names of the files, relative to ``directory``.
+        :param record: A dictionary that can be serialized as JSON, such as the statistics
+                       of the test case, or ``None``.
+
+        An existing entry is not changed.
+        """
+        if self.contains(key):
+            return
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=key + ".", suffix=".tmp", dir=os.path.dirname(entry))
+        try:
+            for fil in file_names:
+                dst = os.path.join(tmp_dir, fil)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(os.path.join(directory, fil), dst)
+            with open(os.path.join(tmp_dir, _MANIFEST), mode="w", encoding="utf-8") as fil:
+                json.dump({'files': list(file_names), 'record': record}, fil)
+            # Fails if another process stored the same entry in the meantime.
+            os.rename(tmp_dir, entry)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def restore(self, key, directory):
+        """ Copy the files of the entry ``key`` to ``directory`` and return its record.
+
+        :param key: The key of the entry, see :func:`key`.
+        :param directory: Directory to which the files are copied.
+        """
+        entry = self._entry(key)
+        with open(os.path.join(entry, _MANIFEST), mode="r", encoding="utf-8") as fil:
+            manifest = json.load(fil)
+        for fil in manifest['files']:
+            dst = os.path.join(directory, fil)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(os.path.join(entry, fil), dst)
+        # The modification time of the manifest is the time of the last use, see prune.
+        os.utime(os.path.join(entry, _MANIFEST))
+        return manifest['record']
+
+    def prune(self):
+        """ Delete the least recently used entries until the cache uses at most ``max_bytes``.
+
+        Entries are used when they are stored or restored.
+        Returns the list of the keys of the deleted entries.
+        Does nothing if ``max_bytes`` is ``None``.
+        """
+        if self.max_bytes is None or not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for prefix in os.listdir(self.cache_dir):
+            directory = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for key in os.listdir(directory):
+                manifest = os.path.join(directory, key, _MANIFEST)
+                try:
+                    used = os.path.getmtime(manifest)
+                except OSError:
+                    # Not an entry, or an entry that is being written by another process
+                    continue
+                size = 0
+                for (root, _, files) in os.walk(os.path.join(directory, key)):
+                    size += sum(os.path.getsize(os.path.join(root, fil)) for fil in files)
+                entries.append((used, size, key))
+        entries.sort()
+        total = sum(size for (_, size, _) in entries)
+        deleted = []
+        for (_, size, key) in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            deleted.append(key)
+        return deleted
@@ -3,14 +3,23 @@ This module provides functions to analyse FMUs.
 
 """
 
+# Version of the format of the cached model description index.
+_INDEX_VERSION = 3
+
+# Elements of a ScalarVariable that declare its type and its start value.
+_TYPE_ELEMENTS = ('Real', 'Integer', 'Boolean', 'String', 'Enumeration')
+
+# In-memory cache of the model description index.
+_index_cache = {}
+
 
 def get_dependencies(fmu_file_name):
     """Return the input and state dependencies of an FMU as a dictionary.
 
     :fmu_file_name: Name of the FMU file.
 
-    Extracts the FMU ``fmu_file_name`` to a temporary directory,
-    reads its `modelDescription.xml` file,
+    Reads the `modelDescription.xml` file of the FMU ``fmu_file_name``
+    through :func:`get_model_description_index`,
     and returns a dictionary with the dependencies of derivatives,
     outputs and initial unknowns.
 
@@ -69,49 +78,205 @@ def get_dependencies(fmu_file_name):
        }
 
     """
-    import tempfile
-    import os
-    import zipfile
-    import shutil
-    import xml.etree.ElementTree as ET
+    index = get_model_description_index(fmu_file_name)
+    names = index['names']
 
-    # Unzip the fmu
-    dirNam = tempfile.mkdtemp(prefix='tmp-buildingspy-fmi-')
-    zip_file = zipfile.ZipFile(fmu_file_name)
-    zip_file.extract('modelDescription.xml', dirNam)
-    zip_file.close()
-    # Parse its modelDescription.xml file
-    xml_file = os.path.join(dirNam, 'modelDescription.xml')
-    tree = ET.parse(xml_file)
-    shutil.rmtree(dirNam)
-    root = tree.getroot()
-
-    # Create a dict that links the variable number to variable name
-    variable_names = {}
-    variable_counter = 0
-    for model_variables in root.iter('ModelVariables'):
-        this_root = model_variables
-        for child in this_root:
-            variable_counter += 1
-            variable_names[variable_counter] = child.attrib['name']
-
-    # Read dependencies from xml and write to dependency_graph
+    # Read dependencies from the index and write to dependency_graph
     dependencies = {}
 
     # Get all dependencies of the FMU and store them in a hierarchical dictionary
     for typ in ['InitialUnknowns', 'Outputs', 'Derivatives']:
         dependencies[typ] = {}
-        for children in root.iter(typ):
-            #this_root = outputs
-            for child in children:
-                variable = variable_names[int(child.attrib['index'])]
-                # Exclude CPUtime and EventCounter, which are written
-                # depending on the Dymola 2018FD01 configuration.
-                if variable not in ["CPUtime", "EventCounter"]:
-                    dependencies[typ][variable] = []
-                    for ind_var in child.attrib['dependencies'].split(' '):
-                        # If variables depend on nothing, there will be an empty string, these
-                        # are therefore excluded.
-                        if ind_var.strip() != "":
-                            dependencies[typ][variable].append(variable_names[int(ind_var)])
+        for (var_index, dep_indices) in index[typ]:
+            variable = names[var_index - 1]
+            # Exclude CPUtime and EventCounter, which are written
+            # depending on the Dymola 2018FD01 configuration.
+            if variable not in ["CPUtime", "EventCounter"]:
+                if dep_indices is None:
+                    raise KeyError(
+                        f"Variable '{variable}' in {fmu_file_name} does not declare its dependencies.")
+                dependencies[typ][variable] = [names[i - 1] for i in dep_indices]
     return dependencies
+
+
+def _get_cache_directory():
+    """Return the default directory used to cache the model description index."""
+    import os
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), 'buildingspy-fmi-cache')
+
+
+def _hash_file(file_name):
+    """Return the sha256 hash of the file ``file_name``."""
+    import hashlib
+
+    sha = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _freeze_index(index):
+    """Return a read-only view of the model description index ``index``.
+
+    The lists and arrays are converted to tuples and the dictionaries to
+    read-only mappings, so that the index in the in-memory cache can be
+    returned by every call without being copied.
+    """
+    from array import array
+    from types import MappingProxyType
+
+    frozen = {key: tuple(value) if isinstance(value, (list, array)) else value
+              for (key, value) in index.items()}
+    for typ in ['InitialUnknowns', 'Outputs', 'Derivatives']:
+        frozen[typ] = tuple((var_index, None if deps is None else tuple(deps))
+                            for (var_index, deps) in index[typ])
+    frozen['positions'] = MappingProxyType({name: i for (i, name) in enumerate(frozen['names'])})
+    return MappingProxyType(frozen)
+
+
+def _parse_model_description(fmu_file_name):
+    """Parse the `modelDescription.xml` file of an FMU into a compact index.
+
+    :fmu_file_name: Name of the FMU file.
+
+    The file is read as a stream directly from the zip archive, and each
+    element is discarded once it has been processed.
+    """
+    import zipfile
+    import xml.etree.ElementTree as ET
+    from array import array
+
+    index = {'fmiVersion': None,
+             'modelName': None,
+             'kinds': [],
+             'names': [],
+             'valueReference': array('l'),
+             'causality': [],
+             'variability': [],
+             'start': [],
+             'InitialUnknowns': [],
+             'Outputs': [],
+             'Derivatives': []}
+    structure = None
+    with zipfile.ZipFile(fmu_file_name) as zip_file:
+        with zip_file.open('modelDescription.xml') as xml_file:
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    if tag == 'fmiModelDescription':
+                        index['fmiVersion'] = elem.attrib.get('fmiVersion')
+                        index['modelName'] = elem.attrib.get('modelName')
+                    elif tag in ('ModelExchange', 'CoSimulation'):
+                        index['kinds'].append(tag)
+                    elif tag == 'Implementation':
+                        # FMI 1.0 co-simulation FMU
+                        index['kinds'].append('CoSimulation')
+                    elif tag in ('InitialUnknowns', 'Outputs', 'Derivatives'):
+                        structure = tag
+                    continue
+                if tag == 'ScalarVariable':
+                    index['names'].append(elem.attrib['name'])
+                    index['valueReference'].append(int(elem.attrib.get('valueReference', -1)))
+                    index['causality'].append(elem.attrib.get('causality'))
+                    index['variability'].append(elem.attrib.get('variability'))
+                    # The start value is an attribute of the type element, other
+                    # children such as Annotations or DirectDependency have none.
+                    start = None
+                    for child in elem:
+                        if child.tag in _TYPE_ELEMENTS:
+                            start = child.attrib.get('start')
+                    index['start'].append(start)
+                    elem.clear()
+                elif tag == 'Unknown' and structure is not None:
+                    deps = elem.attrib.get('dependencies')
+                    if deps is not None:
+                        deps = array('l', [int(i) for i in deps.split()])
+                    index[structure].append((int(elem.attrib['index']), deps))
+                    elem.clear()
+                elif tag == structure:
+                    structure = None
+    if not index['kinds'] and (index['fmiVersion'] or '').startswith('1'):
+        # An FMI 1.0 FMU without Implementation element is a model exchange FMU
+        index['kinds'].append('ModelExchange')
+    return index
+
+
+def get_model_description_index(fmu_file_name, cache_directory=None):
+    """Return a compact index of the `modelDescription.xml` file of an FMU.
+
+    :fmu_file_name: Name of the FMU file.
+    :cache_directory: Directory in which the index is cached. If ``None``,
+                      a directory in the system temporary directory is used.
+
+    The returned read-only mapping has the entries
+
+    - ``fmiVersion`` and ``modelName``,
+    - ``kinds``, a tuple with ``'ModelExchange'`` and/or ``'CoSimulation'``,
+    - ``names``, ``valueReference``, ``causality``, ``variability`` and ``start``,
+      which are tuples with one element per variable, in the order of
+      the ``ModelVariables`` section,
+    - ``positions``, a mapping from each name to its 0-based position in these tuples,
+    - ``InitialUnknowns``, ``Outputs`` and ``Derivatives``,
+      which are tuples of pairs ``(index, dependencies)``, where
+      ``index`` is the 1-based index of the variable and ``dependencies`` is a
+      tuple of 1-based indices, or ``None`` if the FMU does not declare them.
+
+    The index is cached on disk, keyed by the hash of the FMU file,
+    and in memory, keyed by the file name, size and modification time.
+    Hence, repeated calls for the same FMU do not parse the xml file again.
+    The returned index is read-only and shared by all calls for the same FMU.
+
+    Usage: To get the value reference of the variable ``y1``, type
+
+       >>> import os
+       >>> import buildingspy.fmi as f
+       >>> fmu_name=os.path.join("buildingspy", "tests", "fmi", "IntegratorGain.fmu")
+       >>> ind=f.get_model_description_index(fmu_name)
+       >>> vr=ind['valueReference'][ind['positions']['y1']]
+
+    """
+    import os
+    import json
+
+    stat = os.stat(fmu_file_name)
+    mem_key = (os.path.abspath(fmu_file_name), stat.st_size, stat.st_mtime)
+    if mem_key in _index_cache:
+        return _index_cache[mem_key]
+
+    if cache_directory is None:
+        cache_directory = _get_cache_directory()
+    cache_file = os.path.join(cache_directory, _hash_file(fmu_file_name) + '.json')
+
+    index = None
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached.get('version') == _INDEX_VERSION:
+                index = cached['index']
+        except (ValueError, KeyError):
+            index = None
+    if index is None:
+        index = _parse_model_description(fmu_file_name)
+        serializable = dict(index)
+        serializable['valueReference'] = index['valueReference'].tolist()
+        for typ in ['InitialUnknowns', 'Outputs', 'Derivatives']:
+            serializable[typ] = [(var_index, None if deps is None else deps.tolist())
+                                 for (var_index, deps) in index[typ]]
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'version': _INDEX_VERSION, 'index': serializable}, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            # The cache is an optimization only, hence a read-only
+            # file system must not cause an error.
+            pass
+
+    index = _freeze_index(index)
+    _index_cache[mem_key] = index
+    return index
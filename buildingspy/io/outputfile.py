@@ -4,6 +4,173 @@
 from buildingspy.thirdParty.dymat.DyMat import DyMatFile
 
 
+class LogScanner(object):
+    r""" Scanner that searches a log for many messages in a single pass.
+
+        :param messages: List of tuples ``(key, message, is_regex)``.
+                         If ``is_regex`` is ``False``, the counter of ``key`` is incremented
+                         by one for each line that contains ``message``.
+                         If ``is_regex`` is ``True``, ``message`` is a regular expression, and
+                         the counter is incremented by the integer value of its first group
+                         for each line in which it is found.
+        :param statistics: Set to ``True`` to also extract the Dymola model statistics,
+                           see :func:`get_model_statistics`.
+
+        All messages are combined into one regular expression. Each line is searched
+        once with it, and only the lines that contain a message are examined further.
+        If the expressions cannot be combined, for example because one of them
+        has a back reference, all lines are examined.
+
+        Usage:
+
+        >>> from buildingspy.io.outputfile import LogScanner
+        >>> sca = LogScanner([('jac', r"Number of numerical Jacobians: (\d*)", True),
+        ...                   ('red', "Redundant connection", False)])
+        >>> sca.scan(["Number of numerical Jacobians: 2\n",
+        ...           "Redundant connection a\n",
+        ...           "Redundant connection b\n"])[0]
+        {'jac': 2, 'red': 2}
+
+    """
+
+    def __init__(self, messages, statistics=False):
+        import re
+
+        self._messages = []
+        alternatives = []
+        # A back reference refers to another group once the expressions are combined.
+        combine = True
+        for (key, message, is_regex) in messages:
+            if is_regex:
+                self._messages.append((key, None, re.compile(message)))
+                alternatives.append("(?:" + message + ")")
+                if re.search(r"\\[1-9]|\(\?P=", message):
+                    combine = False
+            else:
+                self._messages.append((key, message, None))
+                alternatives.append(re.escape(message))
+        self._statistics = statistics
+        if statistics:
+            alternatives += [re.escape(m) for m in _STATISTICS_MESSAGES]
+        self._any = None
+        if combine:
+            try:
+                self._any = re.compile("|".join(alternatives))
+            except re.error:
+                # For example, two expressions with the same group name. Examine all lines.
+                pass
+
+    @classmethod
+    def from_error_dictionary(cls, error_dictionary, statistics=False):
+        """ Return a scanner for the ``tool_message`` entries of an error dictionary.
+
+            :param error_dictionary: An instance of
+                :class:`buildingspy.development.error_dictionary.ErrorDictionary`.
+            :param statistics: Set to ``True`` to also extract the model statistics.
+
+            The keys of the counters are the keys of the error dictionary.
+        """
+        return cls([(k, v['tool_message'], v.get('is_regex', False))
+                    for (k, v) in error_dictionary.get_dictionary().items()],
+                   statistics=statistics)
+
+    def candidates(self, lines):
+        """ Return a list of tuples ``(index, line)`` of the lines that contain any message.
+        """
+        if self._any is None:
+            return list(enumerate(lines))
+        search = self._any.search
+        return [(i, lin) for (i, lin) in enumerate(lines) if search(lin) is not None]
+
+    def scan(self, lines):
+        """ Return the tuple ``(counters, statistics)`` for the lines of a log.
+
+            :param lines: List of lines of the log.
+
+            ``counters`` is a dictionary with the counter of each message.
+            ``statistics`` is the dictionary returned by :func:`get_model_statistics`,
+            or ``None`` if the scanner was constructed with ``statistics=False``.
+        """
+        counters = dict((key, 0) for (key, _, _) in self._messages)
+        candidates = self.candidates(lines)
+        for (_, lin) in candidates:
+            for (key, literal, reg) in self._messages:
+                if reg is not None:
+                    m = reg.search(lin)
+                    if m is not None:
+                        counters[key] = counters[key] + int(m.group(1))
+                elif literal in lin:
+                    counters[key] = counters[key] + 1
+        if self._statistics:
+            return (counters, _model_statistics(lin for (_, lin) in candidates))
+        return (counters, None)
+
+
+# Messages of the Dymola translation log that contain model statistics
+_CONSTA = "Continuous time states:"
+_NONLIN = "Sizes after manipulation of the nonlinear systems:"
+_LIN = "Sizes after manipulation of the linear systems:"
+_NUMJAC = "Number of numerical Jacobians"
+_TRAABO = "Translation aborted"
+_INIPRO = "Initialization problem"
+_STATISTICS_MESSAGES = (_CONSTA, _NONLIN, _LIN, _NUMJAC, _TRAABO, _INIPRO)
+
+
+def _model_statistics(lines):
+    """ Return the model statistics of the lines of a Dymola translation log.
+
+        Lines that contain none of the messages in ``_STATISTICS_MESSAGES``
+        may be omitted.
+    """
+    import re
+
+    # Instantiate a dictionary that is used for the return value
+    ret = {}
+    dicIni = {}
+    dicSim = {}
+
+    reg = re.compile(r'\{(.*?)\}')
+
+    initalizationMode = False
+
+    ret['translated'] = True
+    for lin in lines:
+        if lin.find(_TRAABO) > 0:
+            ret['translated'] = False
+        elif lin.find(_NONLIN) > 0:
+            temp = lin.rpartition(":")[2]
+            m = reg.search(temp)
+            if initalizationMode:
+                dicIni['nonlinear'] = m.group(1)
+            else:
+                dicSim['nonlinear'] = m.group(1)
+        elif lin.find(_LIN) > 0:
+            temp = lin.rpartition(":")[2]
+            m = reg.search(temp)
+            if initalizationMode:
+                dicIni['linear'] = m.group(1)
+            else:
+                dicSim['linear'] = m.group(1)
+        elif lin.find(_CONSTA) > 0:
+            temp = lin.rpartition(":")[2].strip()
+            temp = temp.partition("scalars")[0].strip()
+            dicSim['number of continuous time states'] = temp
+        elif lin.find(_NUMJAC) > 0:
+            temp = lin.rpartition(":")[2].strip()
+            if initalizationMode:
+                dicIni['numerical Jacobians'] = temp
+            else:
+                dicSim['numerical Jacobians'] = temp
+
+        if lin.find(_INIPRO) > 0:
+            initalizationMode = True
+
+    if initalizationMode:
+        ret["initialization"] = dicIni
+    ret["simulation"] = dicSim
+    return ret
+
+
 def get_model_statistics(log_file, simulator):
     """ Open the simulation file ``log_file`` and return a dictionary
         with the model statistics.
@@ -33,9 +200,11 @@ def get_model_statistics(log_file, simulator):
         - ``linear``: The size of the linear system of equations
           after the symbolic manipulation.
         - ``numerical Jacobian``: The number of numerical Jacobians.
+
+        To also count other messages while reading the log,
+        use :class:`LogScanner` with ``statistics=True``.
     """
     import os
-    import re
 
     if simulator != "dymola":
         raise ValueError('Argument "simulator" needs to be set to "dymola".')
@@ -45,57 +214,7 @@ def get_model_statistics(log_file, simulator):
 
     with open(log_file, mode="r", encoding="utf-8-sig") as fil:
         lines = fil.readlines()
-        # Instantiate a dictionary that is used for the return value
-
-        ret = {}
-        dicIni = {}
-        dicSim = {}
-
-        reg = re.compile(r'\{(.*?)\}')
-
-        CONSTA = "Continuous time states:"
-        NONLIN = "Sizes after manipulation of the nonlinear systems:"
-        LIN = "Sizes after manipulation of the linear systems:"
-        NUMJAC = "Number of numerical Jacobians"
-        TRAABO = "Translation aborted"
-        initalizationMode = False
-
-        ret['translated'] = True
-        for lin in lines:
-            if lin.find(TRAABO) > 0:
-                ret['translated'] = False
-            elif lin.find(NONLIN) > 0:
-                temp = lin.rpartition(":")[2]
-                m = reg.search(temp)
-                if initalizationMode:
-                    dicIni['nonlinear'] = m.group(1)
-                else:
-                    dicSim['nonlinear'] = m.group(1)
-            elif lin.find(LIN) > 0:
-                temp = lin.rpartition(":")[2]
-                m = reg.search(temp)
-                if initalizationMode:
-                    dicIni['linear'] = m.group(1)
-                else:
-                    dicSim['linear'] = m.group(1)
-            elif lin.find(CONSTA) > 0:
-                temp = lin.rpartition(":")[2].strip()
-                temp = temp.partition("scalars")[0].strip()
-                dicSim['number of continuous time states'] = temp
-            elif lin.find(NUMJAC) > 0:
-                temp = lin.rpartition(":")[2].strip()
-                if initalizationMode:
-                    dicIni['numerical Jacobians'] = temp
-                else:
-                    dicSim['numerical Jacobians'] = temp
-
-            if lin.find("Initialization problem") > 0:
-                initalizationMode = True
-
-        if initalizationMode:
-            ret["initialization"] = dicIni
-        ret["simulation"] = dicSim
-        return ret
+    return _STATISTICS_SCANNER.scan(lines)[1]
 
 
 def get_errors_and_warnings(log_file, simulator):
@@ -133,19 +252,16 @@ def get_errors_and_warnings(log_file, simulator):
     listWarn = []
     listErr = []
 
-    WARN = "Warning:"
-    ERR = "... Error message from dymosim"
-
-    for index, lin in enumerate(lines):
-        if lin.find(WARN) >= 0:
+    for index, lin in _ERRORS_SCANNER.candidates(lines):
+        if lin.find(_WARN) >= 0:
             temp = lin.rpartition(":")[2].strip()
             listWarn.append(temp)
-        elif lin.find(ERR) >= 0:
+        elif lin.find(_ERR) >= 0:
             listErr.append(lines[index + 1].strip())
-        elif simulator == "dymola" and lin == " = false\n":
+        elif simulator == "dymola" and lin == _FALSE:
             em = "Log file contained the line ' = false'"
             if index > 0:
-                em = f"{em}. Preceeding line: '{lin[index-1]}'"
+                em = f"{em}. Preceeding line: '{lines[index - 1].strip()}'"
             listErr.append(em)
 
     ret["warnings"] = listWarn
@@ -153,6 +269,18 @@ def get_errors_and_warnings(log_file, simulator):
     return ret
 
 
+# Messages of the Dymola simulation log that contain warnings and errors
+_WARN = "Warning:"
+_ERR = "... Error message from dymosim"
+_FALSE = " = false\n"
+
+# Scanners that are shared by all calls
+_STATISTICS_SCANNER = LogScanner([], statistics=True)
+_ERRORS_SCANNER = LogScanner([('warnings', _WARN, False),
+                              ('errors', _ERR, False),
+                              ('false', _FALSE, False)])
+
+
 class Reader(object):
     """Open the file ``fileName`` and parse its content.
 
@@ -0,0 +1,526 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Models of MyModelicaLibrary that get a regression test, and the variables they plot,
+# or None for a test that exports an FMU.
+_TESTS = [('Examples.MyStep', 'myStep.y'),
+          ('Examples.Constants', 'c'),
+          ('Examples.FMUs.Gain', None),
+          ('Obsolete.Examples.Constant', 'const.y')]
+
+
+class Test_regressiontest_Tester(unittest.TestCase):
+    """
+       This class contains the unit tests for
+       :mod:`buildingspy.development.regressiontest.Tester`
+       that do not need a simulator.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-regressiontest-")
+        self._cwd = os.getcwd()
+        self._lib_home = os.path.join(self._temp_dir, "MyModelicaLibrary")
+        shutil.copytree(os.path.join(os.path.dirname(__file__), "MyModelicaLibrary"), self._lib_home)
+        for (model, variable) in _TESTS:
+            mos = os.path.join(self._lib_home, "Resources", "Scripts", "Dymola", *model.split('.')) + ".mos"
+            os.makedirs(os.path.dirname(mos), exist_ok=True)
+            with open(mos, mode="w", encoding="utf-8") as f:
+                if variable is None:
+                    f.write('translateModelFMU(modelToOpen="MyModelicaLibrary.%s", modelName="%s", '
+                            'fmiVersion="2", fmiType="me");\n' % (model, model.split('.')[-1]))
+                else:
+                    f.write('simulateModel("MyModelicaLibrary.%s", stopTime=1.0, method="dassl", resultFile="%s");\n'
+                            'createPlot(id=1, y={"%s"});\n' % (model, model.split('.')[-1], variable))
+        # The Tester writes its log files to the current directory.
+        os.chdir(self._temp_dir)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        shutil.rmtree(self._temp_dir)
+
+    def _tester(self, comp_tool='funnel'):
+        import buildingspy.development.regressiontest as r
+        rt = r.Tester(tool="dymola", comp_tool=comp_tool, skip_verification=True)
+        rt.setLibraryRoot(self._lib_home)
+        rt.setDiscoveryCache(cache_file=os.path.join(self._temp_dir, "discovery.json"))
+        rt.setDataDictionary()
+        return rt
+
+    def _selected(self, *changed):
+        rt = self._tester()
+        rt.setChangedFiles([os.path.join(self._lib_home, *f.split('/')) for f in changed])
+        rt._select_affected_tests()
+        return sorted(dat['model_name'] for dat in rt._data)
+
+    def test_changed_mo_file(self):
+        self.assertEqual(['MyModelicaLibrary.Examples.MyStep'], self._selected("MyStep.mo"))
+
+    def test_changed_script(self):
+        self.assertEqual(['MyModelicaLibrary.Examples.Constants'],
+                         self._selected("Resources/Scripts/Dymola/Examples/Constants.mos"))
+
+    def test_deleted_mo_file(self):
+        os.remove(os.path.join(self._lib_home, "Obsolete", "Constant.mo"))
+        self.assertEqual(['MyModelicaLibrary.Obsolete.Examples.Constant'], self._selected("Obsolete/Constant.mo"))
+
+    def test_package_order(self):
+        self.assertEqual(['MyModelicaLibrary.Examples.FMUs.Gain'], self._selected("Examples/FMUs/package.order"))
+
+    def test_changed_resource(self):
+        self.assertEqual(sorted('MyModelicaLibrary.' + m for (m, _) in _TESTS),
+                         self._selected("Resources/Data/weather.txt"))
+
+    def _parsed(self):
+        """ Return the data of the tests and the `.mos` files that have been parsed, and not read from the cache."""
+        import buildingspy.development.regressiontest as r
+        with mock.patch.object(r, '_parse_mos_file', wraps=r._parse_mos_file) as parse:
+            rt = self._tester()
+        return (rt._data, sorted(os.path.relpath(os.path.join(c[0][0][1], c[0][0][2]), self._lib_home)
+                                 for c in parse.call_args_list))
+
+    def test_discovery_cache(self):
+        scripts = os.path.join("Resources", "Scripts", "Dymola")
+        all_scripts = sorted(os.path.join(scripts, *model.split('.')) + ".mos" for (model, _) in _TESTS)
+        (data, parsed) = self._parsed()
+        self.assertEqual(all_scripts, parsed)
+        # Hit
+        (cached, parsed) = self._parsed()
+        self.assertEqual([], parsed)
+        self.assertEqual(data, cached)
+        # A touched file with the same content is still valid
+        mos = os.path.join(self._lib_home, scripts, "Examples", "Constants.mos")
+        os.utime(mos, ns=(os.stat(mos).st_atime_ns, os.stat(mos).st_mtime_ns + 10**9))
+        self.assertEqual([], self._parsed()[1])
+        # Miss after a change of the .mos file, or of the .mo file from which the tolerance is read
+        with open(mos, mode="a", encoding="utf-8") as f:
+            f.write("// Changed\n")
+        self.assertEqual([os.path.join(scripts, "Examples", "Constants.mos")], self._parsed()[1])
+        with open(os.path.join(self._lib_home, "Examples", "MyStep.mo"), mode="a", encoding="utf-8") as f:
+            f.write("// Changed\n")
+        self.assertEqual([os.path.join(scripts, "Examples", "MyStep.mos")], self._parsed()[1])
+        self.assertEqual([], self._parsed()[1])
+
+    def test_discovery_cache_corrupt(self):
+        import json
+        cache_file = os.path.join(self._temp_dir, "discovery.json")
+        (data, _) = self._parsed()
+        for content in ['{"version": 1, "dymola": {', '[]']:
+            with open(cache_file, mode="w", encoding="utf-8") as f:
+                f.write(content)
+            (rebuilt, parsed) = self._parsed()
+            self.assertEqual(data, rebuilt)
+            self.assertEqual(len(_TESTS), len(parsed))
+            self.assertEqual([], self._parsed()[1])
+        # A corrupt entry is parsed again
+        with open(cache_file, mode="r", encoding="utf-8") as f:
+            content = json.load(f)
+        content['dymola'][sorted(content['dymola'])[0]] = {'dat': {}}
+        with open(cache_file, mode="w", encoding="utf-8") as f:
+            json.dump(content, f)
+        self.assertEqual(1, len(self._parsed()[1]))
+        # A cache of another version of the parser is discarded
+        content['source'] = 'other'
+        with open(cache_file, mode="w", encoding="utf-8") as f:
+            json.dump(content, f)
+        self.assertEqual(len(_TESTS), len(self._parsed()[1]))
+
+    def test_discovery_cache_copies(self):
+        import buildingspy.development.regressiontest as r
+        cache_file = os.path.join(self._temp_dir, "discovery.json")
+        rt = self._tester()
+        for dat in rt._data:
+            # The Tester adds the experiment specifications and changes the data
+            dat['dymola']['simulate'] = 'changed'
+        cache = r._DiscoveryCache(cache_file, 'dymola')
+        mos = os.path.join(self._lib_home, "Resources", "Scripts", "Dymola", "Examples", "MyStep.mos")
+        (dat, _, _) = cache.get(mos)
+        self.assertNotEqual('changed', dat['dymola'].get('simulate'))
+        dat['model_name'] = 'changed'
+        self.assertNotEqual('changed', cache.get(mos)[0]['model_name'])
+        # The cache cannot be written
+        cache.put(mos, (dat, [], [mos]))
+        with mock.patch.object(r.os, 'replace', side_effect=PermissionError):
+            cache.save()
+        dat['model_name'] = 'other'
+        self.assertEqual('changed', cache.get(mos)[0]['model_name'])
+
+    def _append(self, file_name, data):
+        with open(file_name, mode="ab") as f:
+            f.write(data)
+
+    def test_statistics_collector(self):
+        import buildingspy.development.regressiontest as r
+        (a, b) = (os.path.join(self._temp_dir, "a.json"), os.path.join(self._temp_dir, "b.json"))
+        collector = r._StatisticsCollector([a, b])
+        self.assertEqual([a, b], collector.missing_files())
+        self.assertEqual([], collector.read())
+        # A byte order mark on the first read, and a partial trailing line
+        self._append(a, '\ufeff{"model": "A"}\n{"model": '.encode("utf-8"))
+        self.assertEqual([b], collector.missing_files())
+        self.assertEqual([{'model': 'A'}], collector.read())
+        self.assertEqual([], collector.read())
+        self._append(a, '"B"}\n\n'.encode("utf-8"))
+        self._append(b, '{"model": "C\u00e9"}\n'.encode("utf-8"))
+        self.assertEqual([], collector.missing_files())
+        self.assertEqual([{'model': 'B'}, {'model': 'C\u00e9'}], collector.read())
+        # An invalid line
+        self._append(b, b'{"model": \n')
+        with self.assertRaises(ValueError) as cm:
+            collector.read()
+        self.assertIn(b, str(cm.exception))
+
+    def test_check_test_cases(self):
+        import buildingspy.development.regressiontest as r
+        rt = self._tester()
+        rt._start_simulation_checks()
+        log = os.path.join(self._temp_dir, "Constants.translation.log")
+        shutil.copy(os.path.join(os.path.dirname(__file__), "DymolaLogs", "translation.log"), log)
+        statistics = os.path.join(self._temp_dir, "statistics.json")
+        collector = r._StatisticsCollector([statistics])
+        self._append(statistics, b'{"model": "MyModelicaLibrary.Examples.Constants", "simulate": '
+                                  b'{"command": "simulateModel(Constants)", "result": true, '
+                                  b'"translationLog": "' + log.replace("\\", "/").encode("utf-8") + b'"}}\n')
+        with mock.patch.object(rt, '_reporter') as reporter:
+            rt._check_test_cases(collector)
+            rt._check_test_cases(collector)
+        self.assertEqual(1, len(rt._statistics_records))
+        simulate = rt._statistics_records[0]['simulate']
+        self.assertEqual(1, simulate['unspecified initial conditions'])
+        self.assertEqual(0, simulate['numerical Jacobians'])
+        reporter.writeWarning.assert_called_once_with(
+            "Unspecified initial conditions in 'simulateModel(Constants)'.\n")
+        reporter.writeError.assert_not_called()
+        self.assertEqual(1, rt._error_dict.get_dictionary()['unspecified initial conditions']['counter'])
+        self.assertFalse(rt._simulation_errors['translation'])
+        # The log is appended to the simulator log only once
+        rt._performTranslationErrorChecks(log, {})
+        with open(log, mode="r", encoding="utf-8") as f:
+            text = f.read()
+        with open(rt._simulator_log_file, mode="r", encoding="utf-8") as f:
+            self.assertEqual(text, f.read())
+        # An invalid line is reported
+        self._append(statistics, b'{"model"\n')
+        with mock.patch.object(rt, '_reporter') as reporter:
+            self.assertRaises(ValueError, rt._check_test_cases, collector)
+        self.assertEqual(1, reporter.writeError.call_count)
+
+    def _number_of_classes(self, rt):
+        """ Return the output of ``printNumberOfClasses`` and the `.mo` files that it opened."""
+        import builtins
+        import contextlib
+        import io
+        opened = []
+        real_open = builtins.open
+
+        def _open(file, *args, **kwargs):
+            if str(file).endswith(".mo"):
+                opened.append(file)
+            return real_open(file, *args, **kwargs)
+        out = io.StringIO()
+        with mock.patch.object(builtins, 'open', _open), contextlib.redirect_stdout(out):
+            rt.printNumberOfClasses()
+        return (out.getvalue(), opened)
+
+    def test_number_of_classes(self):
+        rt = self._tester()
+        with open(os.path.join(self._lib_home, "Examples", "Add.mo"), mode="w", encoding="utf-8") as f:
+            f.write('within MyModelicaLibrary.Examples;\nfunction Add\n  input Real u;\nend Add;\n')
+        with open(os.path.join(self._lib_home, "Examples", "PartialModel.mo"), mode="w", encoding="utf-8") as f:
+            f.write('within MyModelicaLibrary.Examples;\npartial model PartialModel\nend PartialModel;\n')
+        expected = ("Number of models   : 10\n"
+                    "          blocks   : 2\n"
+                    "          functions: 1\n")
+        (out, opened) = self._number_of_classes(rt)
+        self.assertEqual(expected, out)
+        self.assertEqual(19, len(opened))
+        # The second run reads the kinds from the discovery cache
+        (out, opened) = self._number_of_classes(rt)
+        self.assertEqual(expected, out)
+        self.assertEqual([], opened)
+        # Only a changed file is read again
+        with open(os.path.join(self._lib_home, "Examples", "Add.mo"), mode="w", encoding="utf-8") as f:
+            f.write('within MyModelicaLibrary.Examples;\nblock Add\nend Add;\n')
+        (out, opened) = self._number_of_classes(rt)
+        self.assertEqual(expected.replace("blocks   : 2", "blocks   : 3").replace("functions: 1", "functions: 0"), out)
+        self.assertEqual([os.path.join(self._lib_home, "Examples", "Add.mo")], opened)
+
+    def test_schedule_tests(self):
+        GB = 1e9
+        rt = self._tester()
+        rt.setNumberOfThreads(3)
+        # Script file, peak resident memory and wall time of the previous runs
+        profile = {'H1.mos': (10 * GB, 100.), 'H2.mos': (8 * GB, 50.),
+                   'L1.mos': (GB, 60.), 'L2.mos': (GB, 40.), 'L3.mos': (GB, 30.),
+                   'L4.mos': (GB, 20.), 'L5.mos': (GB, 10.)}
+        tra_data = [{'ScriptFile': scr} for scr in sorted(profile) + ['New.mos']]
+
+        def schedule(profile, budget):
+            with mock.patch.object(rt, '_load_resource_profile',
+                                   return_value={k: {'peak_rss': v[0], 'wall_time': v[1]} for (k, v) in profile.items()}), \
+                    mock.patch.object(rt, '_get_memory_budget', return_value=budget):
+                lanes = rt._schedule_tests(tra_data)
+            self.assertEqual(sorted(dat['ScriptFile'] for dat in tra_data),
+                             sorted(dat['ScriptFile'] for lane in lanes for dat in lane))
+            return [[dat['ScriptFile'] for dat in lane] for lane in lanes]
+
+        lanes = schedule(profile, 12 * GB)
+        # The heavy tests do not fit in the budget together, hence they run one after the other,
+        # the heaviest first.
+        self.assertEqual(['H1.mos', 'H2.mos'], lanes[0])
+        # The largest tests of all processes fit in the budget
+        self.assertLessEqual(sum(max(profile.get(s, (0, 0))[0] for s in lane) for lane in lanes), 12 * GB)
+        # The light tests are balanced by their wall time. New.mos has the median time of 40 s.
+        load = [sum(profile.get(s, (0, 40.))[1] for s in lane) for lane in lanes[1:]]
+        self.assertEqual(2, len(load))
+        self.assertLessEqual(abs(load[0] - load[1]), 10.)
+        # Without a budget, the heavy tests are balanced as well
+        lanes = schedule(profile, None)
+        self.assertNotIn('H2.mos', [lane for lane in lanes if 'H1.mos' in lane][0])
+        # A budget that the heavy tests exceed alone
+        lanes = schedule(profile, 4 * GB)
+        self.assertEqual(['H1.mos', 'H2.mos'], lanes[0][:2])
+        # Without a profile, the tests are distributed in the order in which they are found
+        self.assertEqual([['H1.mos', 'L2.mos', 'L5.mos'], ['H2.mos', 'L3.mos', 'New.mos'], ['L1.mos', 'L4.mos']],
+                         schedule({}, 12 * GB))
+
+    def _legacy_series(self):
+        """ Return ``(tOld, yOld, tNew, yNew, varNam)`` of variables that cover the cases of the legacy comparison."""
+        import numpy as np
+        t_sim = list(np.linspace(0, 1, 101))
+        y = list(np.sin(np.linspace(0, 3, 101)))
+        return [
+            ([0., 1.], y, t_sim, y, 'equal.y'),
+            ([0., 1.], y, t_sim, [v + (0.1 if i == 40 else 0) for (i, v) in enumerate(y)], 'changed.y'),
+            ([0., 1.], [1e-6 * v for v in y], t_sim, [2e-6 * v for v in y], 'small.y'),
+            ([0., 1.], [2., 2.], [0., 1.], [2., 2.], 'equal.k'),
+            ([0., 1.], [2., 2.], [0., 1.], [3., 3.], 'changed.k'),
+            # Parameter in the new results, but a variable in the reference results
+            ([0., 1.], [293.15] * 101, [0., 1.], [293.15, 293.15], 'roo.heatPort.T'),
+            ([0., 1.], [0.5] * 101, [0., 1.], [0.6, 0.6], 'roo.heatPort.Q_flow'),
+            # Parameter in the reference results, but a variable in the new results
+            ([0., 1.], [1., 1.], t_sim, [1.] * 101, 'param.y'),
+            # Different end time
+            ([0., 2.], y, t_sim, y, 'end.y')]
+
+    def test_legacy_batch_equals_per_variable(self):
+        rt = self._tester(comp_tool='legacy')
+        data_idx = [dat['model_name'] for dat in rt._data].index('MyModelicaLibrary.Examples.MyStep')
+        series = self._legacy_series()
+        batch = rt._legacy_results_equal([(list(tOld), yOld, list(tNew), yNew, varNam)
+                                          for (tOld, yOld, tNew, yNew, varNam) in series], data_idx)
+        self.assertEqual(sorted(s[-1] for s in series), sorted(batch))
+        for (tOld, yOld, tNew, yNew, varNam) in series:
+            self.assertEqual(rt.areResultsEqual(list(tOld), yOld, list(tNew), yNew, varNam, data_idx),
+                             batch[varNam], varNam)
+        self.assertEqual(['changed.k', 'changed.y', 'end.y', 'roo.heatPort.Q_flow'],
+                         sorted(varNam for varNam in batch if not batch[varNam][0]))
+
+    def test_legacy_batch_nan(self):
+        rt = self._tester(comp_tool='legacy')
+        data_idx = [dat['model_name'] for dat in rt._data].index('MyModelicaLibrary.Examples.MyStep')
+        y = [1.] * 101
+        y_nan = [float('nan') if i == 5 else 1. for i in range(101)]
+        t_sim = [i / 100. for i in range(101)]
+        self.assertRaises(ValueError, rt.areResultsEqual, [0., 1.], y, t_sim, y_nan, 'nan.y', data_idx)
+        self.assertRaises(ValueError, rt._legacy_results_equal,
+                          [([0., 1.], y, t_sim, y, 'equal.y'), ([0., 1.], y, t_sim, y_nan, 'nan.y')], data_idx)
+
+    def test_compare_with_reference_batch(self):
+        import buildingspy.development.regressiontest as r
+        rt = self._tester(comp_tool='legacy')
+        data_idx = [dat['model_name'] for dat in rt._data].index('MyModelicaLibrary.Examples.MyStep')
+        series = [s for s in self._legacy_series() if s[-1] != 'end.y']
+        ref_fil = os.path.join(self._temp_dir, "reference.txt")
+        with open(ref_fil, mode="w", encoding="utf-8") as f:
+            for (_, yOld, _, _, varNam) in series:
+                f.write("%s=[%s]\n" % (varNam, ", ".join(repr(float(v)) for v in yOld)))
+            f.write("time=[0., 1.]\n")
+        t_sim = [i / 100. for i in range(101)]
+        y_sim = [{'time': t_sim, 'equal.y': series[0][3], 'changed.y': series[1][3], 'small.y': series[2][3]},
+                 {'time': t_sim, 'changed.y': series[1][3], 'missing.y': series[0][3]},
+                 {'time': t_sim, 'equal.k': [2., 2.], 'changed.k': [3., 3.], 'roo.heatPort.T': [293.15, 293.15],
+                  'roo.heatPort.Q_flow': [0.6, 0.6], 'param.y': [1.] * 101}]
+        with mock.patch.object(r.Tester, '_legacy_comp_batch', autospec=True,
+                               side_effect=r.Tester._legacy_comp_batch) as batch:
+            ret = rt._compare_with_reference(data_idx, ref_fil, y_sim, {})
+        self.assertEqual(1, batch.call_count)
+        self.assertTrue(ret['newTrajectories'])
+        self.assertEqual(['missing.y'], ret['noOldResults'])
+        self.assertEqual(['changed.k', 'changed.y', 'roo.heatPort.Q_flow'], sorted(ret['timOfMaxErr']))
+
+    @staticmethod
+    def _write_dymola_result(file_name, variables):
+        """ Write the dictionary ``variables``, which includes ``Time``, as a result file of Dymola."""
+        import numpy as np
+        import scipy.io
+
+        def char_matrix(strings):
+            width = max(len(s) for s in strings)
+            return np.array([list(s.ljust(width)) for s in strings])
+
+        names = ['Time'] + [n for n in variables if n != 'Time']
+        scipy.io.savemat(file_name, {'Aclass': char_matrix(['Atrajectory', '1.0', 'Generated by a test']),
+                                     'names': char_matrix(names),
+                                     'data': np.array([variables[n] for n in names]).T},
+                         format='4')
+
+    def _verify(self, comp_tool, number_of_processors):
+        """ Verify the results of all test cases with ``number_of_processors`` processes.
+
+        Return the return value of the verification, the log and the comparison info.
+        """
+        import numpy as np
+        rt = self._tester(comp_tool=comp_tool)
+        rt.batchMode(True)
+        rt.setNumberOfThreads(number_of_processors)
+        rt._initialize_error_dict()
+        time = np.linspace(0, 1, 101)
+        for (i, dat) in enumerate(rt._data):
+            dat['ResultDirectory'] = os.path.join(self._temp_dir, "results", str(i))
+            wor_dir = os.path.join(dat['ResultDirectory'], "MyModelicaLibrary")
+            os.makedirs(wor_dir, exist_ok=True)
+            with open(os.path.join(wor_dir, dat['dymola']['TranslationLogFile']), mode="w") as f:
+                f.write("Translation of %s:\n" % dat['model_name'])
+            if 'ResultFile' not in dat:
+                continue
+            variables = {'Time': time}
+            for var in [v for pai in dat['ResultVariables'] for v in pai]:
+                variables[var] = np.sin(time * (i + 1))
+            self._write_dymola_result(os.path.join(wor_dir, dat['ResultFile']), variables)
+            ref_fil = os.path.join(self._lib_home, "Resources", "ReferenceResults", "Dymola",
+                                   os.path.join("MyModelicaLibrary", dat['ScriptFile']).replace(
+                                       os.sep, '_')[:-len(".mos")] + ".txt")
+            if i == 0:
+                # The test case has no reference results.
+                if os.path.exists(ref_fil):
+                    os.remove(ref_fil)
+            else:
+                # The second test case has changed results.
+                ref_vars = [{'time': [0., 1.]}]
+                for var in [v for pai in dat['ResultVariables'] for v in pai]:
+                    ref_vars[0][var] = list(variables[var] * (1.1 if i == 1 else 1))
+                rt._writeReferenceResults(ref_fil, ref_vars, {})
+        ret = rt._checkReferencePoints('N')
+        with open(rt._reporter._logFil, mode="r") as f:
+            log = f.read()
+        for info in rt._comp_info:
+            info['comparison']['funnel_dirs'] = [
+                None if d is None else os.path.basename(d) for d in info['comparison']['funnel_dirs']]
+        return (ret, log, rt._comp_info)
+
+    def test_verification_context(self):
+        import pickle
+        rt = self._tester()
+        context = pickle.loads(pickle.dumps(rt._verification_context()))
+        self.assertEqual(rt._data, context['_data'])
+        self.assertNotIn('_reporter', context)
+
+    def test_parallel_verification_equals_serial(self):
+        for comp_tool in ['legacy', 'funnel']:
+            serial = self._verify(comp_tool, 1)
+            parallel = self._verify(comp_tool, 3)
+            self.assertIn("MyModelicaLibrary_Examples_Constants.txt", serial[1], comp_tool)
+            self.assertEqual(serial, parallel, comp_tool)
+
+    def _cached_run(self, cache_dir):
+        """ Prepare a run that uses the simulation cache ``cache_dir``, store the results of the
+            test cases that are simulated in the cache, and return the restored test cases.
+        """
+        rt = self._tester(comp_tool='legacy')
+        rt.setSimulationCache(cache_dir, tool_version="test")
+        rt.setNumberOfThreads(2)
+        rt._initialize_error_dict()
+        rt._write_runscripts()
+        records = []
+        for dat in rt._data:
+            if dat['ScriptFile'] not in rt._cache_keys or dat['ScriptFile'] in rt._restored_tests:
+                continue
+            wor_dir = rt._get_work_directory(dat)
+            for fil in [dat['ResultFile'], dat['dymola']['TranslationLogFile']]:
+                with open(os.path.join(wor_dir, fil), mode="w") as f:
+                    f.write(dat['model_name'])
+            log_fil = os.path.join(wor_dir, dat['dymola']['TranslationLogFile'])
+            mos = "MyModelicaLibrary/Resources/Scripts/Dymola/" + dat['ScriptFile'].replace(os.sep, '/')
+            records.append({'file': mos,
+                            'model': dat['model_name'],
+                            'check': {'result': True},
+                            'simulate': {'result': True, 'translationLog': log_fil}})
+        rt._statistics_records = records
+        rt._update_simulation_cache()
+        for d in rt._temDir:
+            shutil.rmtree(d)
+        return sorted(rt._restored_tests)
+
+    def test_simulation_cache(self):
+        cache_dir = os.path.join(self._temp_dir, "cache")
+        # The results of the FMU export are not cached.
+        cached = sorted(os.path.join(*model.split('.')) + ".mos" for (model, variable) in _TESTS
+                        if variable is not None)
+        # Constants reads a data file of the library.
+        constants = os.path.join(self._lib_home, "Examples", "Constants.mo")
+        with open(constants, mode="r", encoding="utf-8") as f:
+            text = f.read()
+        with open(constants, mode="w", encoding="utf-8") as f:
+            f.write(text.replace(
+                "  annotation (experiment",
+                '  parameter String fileName = Modelica.Utilities.Files.loadResource(\n'
+                '    "modelica://MyModelicaLibrary/Resources/Data/table.txt");\n'
+                "  annotation (experiment"))
+        data_file = os.path.join(self._lib_home, "Resources", "Data", "table.txt")
+        os.makedirs(os.path.dirname(data_file))
+        with open(data_file, mode="w") as f:
+            f.write("1 2\n")
+        # Miss
+        self.assertEqual([], self._cached_run(cache_dir))
+        # Hit
+        self.assertEqual(cached, self._cached_run(cache_dir))
+        # Invalidation by a .mo file that the model uses
+        with open(os.path.join(self._lib_home, "MyStep.mo"), mode="a") as f:
+            f.write("// Changed\n")
+        self.assertEqual([os.path.join("Examples", "Constants.mos"),
+                          os.path.join("Obsolete", "Examples", "Constant.mos")], self._cached_run(cache_dir))
+        # Invalidation by a resource that the model references
+        with open(data_file, mode="w") as f:
+            f.write("1 3\n")
+        self.assertEqual([os.path.join("Examples", "MyStep.mos"),
+                          os.path.join("Obsolete", "Examples", "Constant.mos")], self._cached_run(cache_dir))
+        # Resources that are not referenced do not invalidate the cache.
+        with open(os.path.join(self._lib_home, "Resources", "Data", "other.txt"), mode="w") as f:
+            f.write("1 3\n")
+        self.assertEqual(cached, self._cached_run(cache_dir))
+
+    def test_resident_memory(self):
+        import subprocess
+        import sys
+        import buildingspy.development.regressiontest as r
+        wor_dir = os.path.realpath(os.path.join(self._temp_dir, "worker"))
+        os.makedirs(wor_dir)
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"], cwd=wor_dir)
+        try:
+            rss = r._resident_memory([os.path.realpath(self._lib_home), wor_dir])
+        finally:
+            proc.kill()
+            proc.wait()
+        if rss is None:
+            self.skipTest("The memory cannot be measured on this system.")
+        self.assertEqual(0, rss[0])
+        self.assertGreater(rss[1], 0)
+
+    def test_resource_monitor_without_memory(self):
+        import buildingspy.development.regressiontest as r
+        monitor = r._ResourceMonitor([self._temp_dir], [["a.mos", "b.mos"]])
+        with mock.patch.object(r, '_resident_memory', return_value=None):
+            monitor.sample(set())
+            monitor.sample(set(["a.mos"]))
+        self.assertFalse(monitor.memory_measured)
+        self.assertEqual(['wall_time'], list(monitor.resources["a.mos"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+
+class Test_development_simulation_cache(unittest.TestCase):
+    """
+       This class contains the unit tests for
+       :mod:`buildingspy.development.simulation_cache`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-simulation-cache-")
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _put(self, cache, name, size):
+        with open(os.path.join(self._temp_dir, name + ".mat"), mode="w") as f:
+            f.write("x" * size)
+        key = cache.key({'model': name})
+        cache.put(key, self._temp_dir, [name + ".mat"], {'model': name})
+        return key
+
+    def test_prune(self):
+        from buildingspy.development.simulation_cache import SimulationCache
+        cache = SimulationCache(os.path.join(self._temp_dir, "cache"), max_bytes=2500)
+        keys = [self._put(cache, name, 1000) for name in ["a", "b", "c"]]
+        # Entries are used in the order b, c, a
+        for (i, key) in enumerate([keys[1], keys[2], keys[0]]):
+            manifest = os.path.join(cache.cache_dir, key[:2], key, "buildingspy-cache.json")
+            os.utime(manifest, (time.time() - 100 + i, time.time() - 100 + i))
+        self.assertEqual([keys[1]], cache.prune())
+        self.assertEqual([True, False, True], [cache.contains(k) for k in keys])
+        # Restoring an entry uses it.
+        cache.restore(keys[2], os.path.join(self._temp_dir, "restored"))
+        cache.max_bytes = 1500
+        self.assertEqual([keys[0]], cache.prune())
+        self.assertTrue(cache.contains(keys[2]))
+
+    def test_no_limit(self):
+        from buildingspy.development.simulation_cache import SimulationCache
+        cache = SimulationCache(os.path.join(self._temp_dir, "cache"))
+        keys = [self._put(cache, name, 1000) for name in ["a", "b"]]
+        self.assertEqual([], cache.prune())
+        self.assertTrue(all(cache.contains(k) for k in keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+_MODEL_DESCRIPTION = """<?xml version="1.0" encoding="UTF-8"?>
+<fmiModelDescription fmiVersion="2.0" modelName="IntegratorGain">
+  <ModelExchange modelIdentifier="IntegratorGain"/>
+  <ModelVariables>
+    <ScalarVariable name="k" valueReference="16777216" causality="parameter" variability="fixed">
+      <Real start="-1"/>
+    </ScalarVariable>
+    <ScalarVariable name="u" valueReference="352321536" causality="input">
+      <Real start="0"/>
+    </ScalarVariable>
+    <ScalarVariable name="y1" valueReference="335544320" causality="output">
+      <Real/>
+    </ScalarVariable>
+    <ScalarVariable name="y2" valueReference="335544321" causality="output">
+      <Real/>
+    </ScalarVariable>
+    <ScalarVariable name="x" valueReference="33554432">
+      <Real start="0"/>
+    </ScalarVariable>
+    <ScalarVariable name="der(x)" valueReference="587202560">
+      <Real derivative="5"/>
+    </ScalarVariable>
+  </ModelVariables>
+  <ModelStructure>
+    <Outputs>
+      <Unknown index="3" dependencies="5"/>
+      <Unknown index="4" dependencies="2"/>
+    </Outputs>
+    <Derivatives>
+      <Unknown index="6" dependencies="2"/>
+    </Derivatives>
+    <InitialUnknowns>
+      <Unknown index="3" dependencies="5"/>
+      <Unknown index="4" dependencies="1 2"/>
+      <Unknown index="6" dependencies="2"/>
+    </InitialUnknowns>
+  </ModelStructure>
+</fmiModelDescription>
+"""
+
+
+class Test_fmi(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`buildingspy.fmi`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-buildingspy-fmi-test-")
+        self._cache_dir = os.path.join(self._temp_dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _fmu(self, model_description=_MODEL_DESCRIPTION):
+        fmu_name = os.path.join(self._temp_dir, "IntegratorGain.fmu")
+        with zipfile.ZipFile(fmu_name, "w") as zip_file:
+            zip_file.writestr("modelDescription.xml", model_description)
+        return fmu_name
+
+    def test_get_model_description_index(self):
+        import buildingspy.fmi as f
+
+        fmu_name = self._fmu()
+        ind = f.get_model_description_index(fmu_name, cache_directory=self._cache_dir)
+        self.assertEqual(('ModelExchange',), ind['kinds'])
+        self.assertEqual(('k', 'u', 'y1', 'y2', 'x', 'der(x)'), ind['names'])
+        self.assertEqual(('-1', '0', None, None, '0', None), ind['start'])
+        self.assertEqual(2, ind['positions']['y1'])
+        self.assertEqual(335544320, ind['valueReference'][ind['positions']['y1']])
+        self.assertEqual('input', ind['causality'][ind['positions']['u']])
+        self.assertEqual(((3, (5,)), (4, (2,))), ind['Outputs'])
+        # The returned index is read-only and shared by all calls
+        with self.assertRaises(TypeError):
+            ind['names'] = []
+        with self.assertRaises(TypeError):
+            ind['positions']['z'] = 6
+        with self.assertRaises(TypeError):
+            ind['Outputs'][0][1][0] = 1
+        again = f.get_model_description_index(fmu_name, cache_directory=self._cache_dir)
+        self.assertIs(ind, again)
+        # The index is read from the disk cache
+        f._index_cache.clear()
+        self.assertEqual(1, len(os.listdir(self._cache_dir)))
+        cached = f.get_model_description_index(fmu_name, cache_directory=self._cache_dir)
+        self.assertIsNot(ind, cached)
+        self.assertEqual(dict(again), dict(cached))
+
+    def test_start_with_annotations(self):
+        import buildingspy.fmi as f
+
+        # Elements that follow the type element do not hide its start value
+        fmu_name = self._fmu(_MODEL_DESCRIPTION.replace(
+            '<Real start="-1"/>',
+            '<Real start="-1"/>\n      <Annotations>\n        <Tool name="Dymola"/>\n      </Annotations>', 1).replace(
+            '<Real start="0"/>\n    </ScalarVariable>\n    <ScalarVariable name="y1"',
+            '<Annotations/>\n      <Real start="0"/>\n    </ScalarVariable>\n    <ScalarVariable name="y1"', 1))
+        ind = f.get_model_description_index(fmu_name, cache_directory=self._cache_dir)
+        self.assertEqual(('-1', '0', None, None, '0', None), ind['start'])
+
+    def test_get_dependencies(self):
+        import buildingspy.fmi as f
+
+        fmu_name = self._fmu()
+        dep = f.get_dependencies(fmu_name)
+        self.assertEqual({'y1': ['x'], 'y2': ['u']}, dep['Outputs'])
+        self.assertEqual({'der(x)': ['u']}, dep['Derivatives'])
+        self.assertEqual(['k', 'u'], dep['InitialUnknowns']['y2'])
+
+    def test_get_dependencies_undeclared(self):
+        import buildingspy.fmi as f
+
+        fmu_name = self._fmu(_MODEL_DESCRIPTION.replace(' dependencies="5"/>\n      <Unknown index="4" dependencies="2"/>',
+                                                        '/>\n      <Unknown index="4" dependencies="2"/>', 1))
+        self.assertRaises(KeyError, f.get_dependencies, fmu_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
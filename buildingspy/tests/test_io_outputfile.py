@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+# Logs of Dymola 2023: a translation with statistics, a translation of a model that
+# was not found, and a simulation log dslog.txt that failed during initialization.
+_LOG_DIR = os.path.join(os.path.dirname(__file__), "DymolaLogs")
+_LOGS = ["translation.log", "translation_failed.log", "dslog.txt"]
+
+
+def _old_model_statistics(lines):
+    """ Implementation of :func:`buildingspy.io.outputfile.get_model_statistics`
+        before :class:`buildingspy.io.outputfile.LogScanner` was introduced.
+    """
+    ret = {}
+    dicIni = {}
+    dicSim = {}
+    reg = re.compile(r'\{(.*?)\}')
+    initalizationMode = False
+    ret['translated'] = True
+    for lin in lines:
+        if lin.find("Translation aborted") > 0:
+            ret['translated'] = False
+        elif lin.find("Sizes after manipulation of the nonlinear systems:") > 0:
+            m = reg.search(lin.rpartition(":")[2])
+            (dicIni if initalizationMode else dicSim)['nonlinear'] = m.group(1)
+        elif lin.find("Sizes after manipulation of the linear systems:") > 0:
+            m = reg.search(lin.rpartition(":")[2])
+            (dicIni if initalizationMode else dicSim)['linear'] = m.group(1)
+        elif lin.find("Continuous time states:") > 0:
+            temp = lin.rpartition(":")[2].strip()
+            dicSim['number of continuous time states'] = temp.partition("scalars")[0].strip()
+        elif lin.find("Number of numerical Jacobians") > 0:
+            (dicIni if initalizationMode else dicSim)['numerical Jacobians'] = lin.rpartition(":")[2].strip()
+        if lin.find("Initialization problem") > 0:
+            initalizationMode = True
+    if initalizationMode:
+        ret["initialization"] = dicIni
+    ret["simulation"] = dicSim
+    return ret
+
+
+def _old_errors_and_warnings(lines):
+    """ Implementation of :func:`buildingspy.io.outputfile.get_errors_and_warnings`
+        before :class:`buildingspy.io.outputfile.LogScanner` was introduced.
+    """
+    listWarn = []
+    listErr = []
+    for index, lin in enumerate(lines):
+        if lin.find("Warning:") >= 0:
+            listWarn.append(lin.rpartition(":")[2].strip())
+        elif lin.find("... Error message from dymosim") >= 0:
+            listErr.append(lines[index + 1].strip())
+        elif lin == " = false\n":
+            em = "Log file contained the line ' = false'"
+            if index > 0:
+                # This used lin[index-1], which raised an IndexError or returned a character.
+                em = f"{em}. Preceeding line: '{lines[index - 1].strip()}'"
+            listErr.append(em)
+    return {"warnings": listWarn, "errors": listErr}
+
+
+def _old_counters(lines, messages):
+    """ Counters of ``Tester._performTranslationErrorChecks``
+        before :class:`buildingspy.io.outputfile.LogScanner` was introduced.
+    """
+    stat = {}
+    for (k, message, is_regex) in messages:
+        stat[k] = 0
+        for line in lines:
+            if is_regex:
+                m = re.search(message, line)
+                if m is not None:
+                    stat[k] = stat[k] + int(m.group(1))
+            elif message in line:
+                stat[k] = stat[k] + 1
+    return stat
+
+
+class Test_io_outputfile(unittest.TestCase):
+    """
+       This class contains the unit tests for the log functions of
+       :mod:`buildingspy.io.outputfile`, which are compared with their
+       implementation that examined each line for each message.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-outputfile-")
+        with open(os.path.join(_LOG_DIR, "translation.log"), mode="r", encoding="utf-8") as f:
+            translation = f.readlines()
+        # Variants of the translation log for the paths that the logs do not cover
+        index = translation.index("  Initialization problem\n")
+        self._logs = [os.path.join(_LOG_DIR, log) for log in _LOGS] + [
+            self._write("aborted.log", translation + ["Error: ERRORS have been issued.\n",
+                                                      "Error: Translation aborted.\n"]),
+            # The messages are only found after the first character, as before
+            self._write("aborted_first.log", ["Translation aborted.\n"] + translation),
+            self._write("no_initialization.log", translation[:index] + translation[index + 1:]),
+            self._write("numerical_jacobians.log", [
+                lin.replace("Number of numerical Jacobians: 0", "Number of numerical Jacobians: 3")
+                for lin in translation] + ["    Number of numerical Jacobians: 2\n"]),
+            self._write("bom.log", ["﻿" + translation[0]] + translation[1:])]
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _write(self, name, lines):
+        file_name = os.path.join(self._temp_dir, name)
+        with open(file_name, mode="w", encoding="utf-8") as f:
+            f.writelines(lines)
+        return file_name
+
+    def _lines(self, file_name):
+        with open(file_name, mode="r", encoding="utf-8-sig") as f:
+            return f.readlines()
+
+    def test_model_statistics(self):
+        import buildingspy.io.outputfile as of
+        for log in self._logs:
+            self.assertEqual(_old_model_statistics(self._lines(log)), of.get_model_statistics(log, "dymola"), log)
+        stat = of.get_model_statistics(os.path.join(_LOG_DIR, "translation.log"), "dymola")
+        self.assertEqual({'translated': True,
+                          'initialization': {'linear': '6'},
+                          'simulation': {'number of continuous time states': '2', 'linear': ' ',
+                                         'nonlinear': ' ', 'numerical Jacobians': '0'}}, stat)
+        stat = of.get_model_statistics(self._logs[len(_LOGS)], "dymola")
+        self.assertFalse(stat['translated'])
+        stat = of.get_model_statistics(self._logs[len(_LOGS) + 2], "dymola")
+        self.assertNotIn('initialization', stat)
+        self.assertEqual('6', stat['simulation']['linear'])
+
+    def test_errors_and_warnings(self):
+        import buildingspy.io.outputfile as of
+        for log in self._logs:
+            self.assertEqual(_old_errors_and_warnings(self._lines(log)),
+                             of.get_errors_and_warnings(log, "dymola"), log)
+        ret = of.get_errors_and_warnings(os.path.join(_LOG_DIR, "dslog.txt"), "dymola")
+        self.assertEqual(['Failed to solve nonlinear system using Newton solver.', 'Simulation terminated at time 0.'],
+                         ret['warnings'])
+        self.assertEqual(["Failed to initialize the model.",
+                          "Log file contained the line ' = false'. Preceeding line: "
+                          "'Model error - division by zero: (CFD_roo.air.vol.dynBal.m) / (0) = (1.2) / (0)'"],
+                         ret['errors'])
+
+    def test_error_dictionary(self):
+        import buildingspy.development.error_dictionary_dymola as e
+        import buildingspy.io.outputfile as of
+        error_dict = e.ErrorDictionary()
+        messages = [(k, v['tool_message'], v.get('is_regex', False))
+                    for (k, v) in error_dict.get_dictionary().items()]
+        scanner = of.LogScanner.from_error_dictionary(error_dict, statistics=True)
+        self.assertIsNotNone(scanner._any)
+        for log in self._logs:
+            lines = self._lines(log)
+            (counters, statistics) = scanner.scan(lines)
+            self.assertEqual(_old_counters(lines, messages), counters, log)
+            self.assertEqual(_old_model_statistics(lines), statistics, log)
+        (counters, _) = scanner.scan(self._lines(self._logs[len(_LOGS) + 3]))
+        self.assertEqual(5, counters['numerical Jacobians'])
+        self.assertEqual(1, counters['unspecified initial conditions'])
+
+    def test_uncombined(self):
+        import buildingspy.io.outputfile as of
+        lines = self._lines(os.path.join(_LOG_DIR, "translation.log")) + ["Same 2, 2\n", "Same 2, 3\n"]
+        # Two expressions with the same group name cannot be combined (re.error)
+        messages = [('unknowns', r"(?P<n>\d+) scalar unknowns", True),
+                    ('equations', r"(?P<n>\d+) scalar equations", True)]
+        scanner = of.LogScanner(messages)
+        self.assertIsNone(scanner._any)
+        self.assertEqual(_old_counters(lines, messages), scanner.scan(lines)[0])
+        self.assertEqual({'unknowns': 406, 'equations': 406}, scanner.scan(lines)[0])
+        # In a combined expression, the back reference would refer to the group of the first message
+        messages = [('jac', r"Number of numerical Jacobians: (\d*)", True),
+                    ('warn', "Warning:", False),
+                    ('same', r"Same (\d+), \1", True)]
+        scanner = of.LogScanner(messages)
+        self.assertIsNone(scanner._any)
+        self.assertEqual(_old_counters(lines, messages), scanner.scan(lines)[0])
+        self.assertEqual({'jac': 0, 'warn': 3, 'same': 2}, scanner.scan(lines)[0])
+
+if __name__ == '__main__':
+    unittest.main()
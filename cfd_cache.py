@@ -0,0 +1,163 @@
+"""
+Response cache for the CFD results of the coupled simulation.
+
+Each Fluent solve maps the boundary conditions received from Modelica
+(``dict_MFpassValue``) to the values sent back to Modelica
+(``dict_FMpassValue``), such as the room mean temperature, the outlet mass flow,
+the inlet pressure and the wall heat fluxes.
+Coupled runs revisit the same boundary conditions many times, hence the
+responses are stored on disk and reused. The cache file has one JSON line per
+sample, so that a new sample is appended instead of rewriting the file.
+A request that lies close to stored samples, within a trust region, is answered by
+inverse distance weighting of these samples. All other requests need a Fluent solve.
+"""
+import hashlib
+import json
+import math
+import os
+
+
+def file_digest(file_name):
+    """Return the sha1 hash of the content of ``file_name``, or ``''`` if it cannot be read.
+
+    Use it in :func:`case_key` instead of the file name, so that a mesh that
+    is edited in place gets a new key.
+    """
+    sha = hashlib.sha1()
+    try:
+        with open(file_name, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+    except OSError:
+        return ''
+    return sha.hexdigest()
+
+
+def case_key(*items):
+    """Return a short hash that identifies a CFD case.
+
+    :param items: Strings that define the case, such as the hash of the mesh file
+                  (see :func:`file_digest`), the boundary settings and the exchange specification.
+    """
+    sha = hashlib.sha1()
+    for item in items:
+        sha.update(str(item).encode('utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()[:16]
+
+
+class ResponseCache(object):
+    """Cache of CFD responses keyed by the boundary condition vector.
+
+    :param trust_radius: Radius of the trust region in normalized coordinates.
+    :param scales: Dictionary ``{name: scale}`` used to normalize the boundary conditions.
+                   Variables without an entry are scaled by ``max(abs(value), 1)``,
+                   so the trust radius is a relative distance.
+    :param min_points: Number of samples inside the trust region that are needed to interpolate.
+    :param exact_tol: Normalized distance below which a sample is returned as is.
+    """
+
+    def __init__(self, trust_radius=0.002, scales=None, min_points=2, exact_tol=1e-9):
+        self.trust_radius = trust_radius
+        self.scales = dict(scales) if scales is not None else {}
+        self.min_points = min_points
+        self.exact_tol = exact_tol
+        self.file_name = None
+        self._samples = []
+        self._saved = 0
+        self.hits = 0
+        self.interpolated = 0
+        self.misses = 0
+
+    def open(self, file_name):
+        """Use ``file_name`` to store the samples, and load the samples it already contains."""
+        self.file_name = file_name
+        self._samples = []
+        self.hits = 0
+        self.interpolated = 0
+        self.misses = 0
+        if os.path.exists(file_name):
+            with open(file_name, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        sample = json.loads(line)
+                    except ValueError:
+                        # A line that was cut by a crash is not fatal, the sample is computed again.
+                        continue
+                    if 'samples' in sample:
+                        # Cache file written as a single JSON object
+                        self._samples.extend(sample['samples'])
+                    elif 'bc' in sample and 'response' in sample:
+                        self._samples.append(sample)
+        self._saved = len(self._samples)
+
+    def save(self):
+        """Append the samples that were added since the last call to the cache file."""
+        if self.file_name is None or self._saved == len(self._samples):
+            return
+        dir_name = os.path.dirname(self.file_name)
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name)
+        with open(self.file_name, 'a+', encoding='utf-8') as f:
+            if f.tell() > 0:
+                # Start a new line if the last one was cut by a crash.
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    f.write('\n')
+            for sample in self._samples[self._saved:]:
+                f.write(json.dumps(sample) + '\n')
+        self._saved = len(self._samples)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def _distance(self, bc, sample_bc):
+        if set(bc) != set(sample_bc):
+            return None
+        d = 0.0
+        for name, value in bc.items():
+            scale = self.scales.get(name, max(abs(sample_bc[name]), 1.0))
+            d += ((value - sample_bc[name]) / scale) ** 2
+        return math.sqrt(d)
+
+    def lookup(self, bc):
+        """Return the cached response for the boundary conditions ``bc``, or ``None``.
+
+        :param bc: Dictionary with the boundary conditions.
+        """
+        neighbours = []
+        for sample in self._samples:
+            d = self._distance(bc, sample['bc'])
+            if d is not None and d <= self.trust_radius:
+                neighbours.append((d, sample['response']))
+        if not neighbours:
+            self.misses += 1
+            return None
+        neighbours.sort(key=lambda n: n[0])
+        if neighbours[0][0] <= self.exact_tol:
+            self.hits += 1
+            return dict(neighbours[0][1])
+        if len(neighbours) < self.min_points:
+            self.misses += 1
+            return None
+        # Inverse distance weighting of the samples in the trust region
+        names = set(neighbours[0][1])
+        for n in neighbours:
+            names &= set(n[1])
+        weights = [1.0 / d**2 for (d, _) in neighbours]
+        total = sum(weights)
+        response = {}
+        for name in names:
+            response[name] = sum(w * n[1][name] for (w, n) in zip(weights, neighbours)) / total
+        self.hits += 1
+        self.interpolated += 1
+        return response
+
+    def add(self, bc, response):
+        """Store the CFD ``response`` for the boundary conditions ``bc``."""
+        self._samples.append({'bc': dict(bc), 'response': dict(response)})
+
+    def report(self):
+        """Return a one-line summary of the cache hits and misses."""
+        return 'cache hits: %d (interpolated %d), misses: %d, samples: %d' % (
+            self.hits, self.interpolated, self.misses, len(self._samples))
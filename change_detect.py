@@ -0,0 +1,68 @@
+"""
+Change detection for the values passed from Modelica to Fluent.
+
+At every exchange BELab sends the Modelica outputs (``dict_MFpassValue``) to
+Fluent and solves the CFD model again. When the HVAC schedule is constant
+for hours these values do not change, so the CFD result of the last
+exchange can be reused instead of running Fluent again.
+"""
+
+
+class ChangeDetector(object):
+    """Decide whether the exchanged values changed since the last CFD solve.
+
+    :param abs_tol: Default absolute threshold.
+    :param rel_tol: Default relative threshold.
+    :param tolerances: Dictionary ``{name: (abs_tol, rel_tol)}`` with thresholds
+                       for single variables, such as ``{'inlet.T': (0.05, 0)}``.
+
+    A value is considered unchanged if
+    ``abs(new-old) <= abs_tol + rel_tol*abs(old)``.
+    """
+
+    def __init__(self, abs_tol=1e-6, rel_tol=1e-4, tolerances=None):
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+        self.tolerances = dict(tolerances) if tolerances is not None else {}
+        self._last = None
+        self.solved = 0
+        self.skipped = 0
+
+    def set_tolerance(self, name, abs_tol, rel_tol=0.0):
+        """Set the thresholds of the variable ``name``."""
+        self.tolerances[name] = (abs_tol, rel_tol)
+
+    def _tolerance(self, name):
+        return self.tolerances.get(name, (self.abs_tol, self.rel_tol))
+
+    def changed(self, values):
+        """Return ``True`` if ``values`` differ from the last accepted values.
+
+        :param values: Dictionary with the exchanged values.
+
+        The first call always returns ``True``, as does a call in which
+        a variable has been added or removed.
+        """
+        if self._last is None or set(values) != set(self._last):
+            return True
+        for name, new in values.items():
+            old = self._last[name]
+            (abs_tol, rel_tol) = self._tolerance(name)
+            if abs(new - old) > abs_tol + rel_tol * abs(old):
+                return True
+        return False
+
+    def accept(self, values):
+        """Store ``values`` as the values of the last CFD solve."""
+        self._last = dict(values)
+        self.solved += 1
+
+    def skip(self):
+        """Count an exchange in which the CFD solve was skipped."""
+        self.skipped += 1
+
+    def reset(self):
+        """Forget the stored values, so that the next exchange solves the CFD model."""
+        self._last = None
+        self.solved = 0
+        self.skipped = 0
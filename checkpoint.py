@@ -0,0 +1,108 @@
+"""
+Checkpoints of the coupled FMU and Fluent simulation.
+
+At every accepted exchange the state of the FMU and the values exchanged
+with Fluent are saved. If a later CFD solve fails, or an implicit coupling
+iteration does not converge, the FMU and the exchanged values are rolled
+back to the last accepted exchange and the step is repeated, instead of
+restarting the whole run.
+
+Fluent itself is not saved. Every CFD solve initializes the flow field again
+and sets the boundary conditions from the exchanged values, hence these
+values are all that is needed to repeat a solve.
+
+The FMU state is saved with ``get_fmu_state`` if the FMU supports it.
+Otherwise the time and the continuous states of a model exchange FMU are
+saved and set again, which restores the state of FMUs without discrete states.
+Co-simulation FMUs without ``get_fmu_state`` are never rolled back.
+"""
+import copy
+
+
+class CouplingCheckpoint(object):
+    """Checkpoint of the last accepted exchange.
+
+    :param max_retries: Number of times a step is repeated before it is accepted anyway.
+    """
+
+    def __init__(self, max_retries=3):
+        self.max_retries = max_retries
+        self.reset()
+
+    def reset(self):
+        """Forget the checkpoint and free the saved FMU state, for example at the end of a run."""
+        if getattr(self, '_fmu_state', None) is not None:
+            self._free()
+        self._model = None
+        self._fmu_state = None
+        self._time = None
+        self._states = None
+        self._data = None
+        self.retries = 0
+        self.rollbacks = 0
+
+    @staticmethod
+    def _can_get_fmu_state(model):
+        try:
+            return bool(model.get_capability_flags()['canGetAndSetFMUstate'])
+        except Exception:
+            return False
+
+    def _free(self):
+        if self._fmu_state is not None:
+            try:
+                self._model.free_fmu_state(self._fmu_state)
+            except Exception:
+                pass
+        self._fmu_state = None
+
+    def save(self, model, data):
+        """Save the checkpoint of an accepted exchange.
+
+        :param model: The FMU instance.
+        :param data: Dictionary with the values of the coupling loop that are
+                     needed to continue from this exchange, including the values
+                     exchanged with Fluent. It is copied.
+        """
+        self._free()
+        self._model = model
+        self._data = copy.deepcopy(data)
+        if self._can_get_fmu_state(model):
+            self._fmu_state = model.get_fmu_state()
+        elif hasattr(model, 'continuous_states'):
+            self._time = model.time
+            self._states = copy.copy(model.continuous_states)
+        else:
+            # A co-simulation FMU without get_fmu_state cannot be rolled back.
+            self._data = None
+        self.retries = 0
+
+    def can_retry(self):
+        """Return ``True`` if a checkpoint exists and the step may be repeated once more."""
+        return self._data is not None and self.retries < self.max_retries
+
+    def restore(self, model):
+        """Roll the FMU back to the checkpoint and return a copy of its data.
+
+        :param model: The FMU instance.
+        """
+        self.retries += 1
+        self.rollbacks += 1
+        return self.rewind(model)
+
+    def rewind(self, model):
+        """Roll the FMU back to the checkpoint without counting a retry, and return a copy of its data.
+
+        :param model: The FMU instance.
+
+        The implicit coupling rewinds the FMU in every iteration to integrate
+        the exchange interval again. Returns ``None`` if there is no checkpoint.
+        """
+        if self._data is None:
+            return None
+        if self._fmu_state is not None:
+            model.set_fmu_state(self._fmu_state)
+        else:
+            model.time = self._time
+            model.continuous_states = copy.copy(self._states)
+        return copy.deepcopy(self._data)
@@ -0,0 +1,151 @@
+"""
+Worker thread for the coupled simulation.
+
+The coupling loop used to run in the Qt slot of the start button, which froze
+the window for the whole run. :func:`start_worker` runs it in a ``QThread``.
+The loop reports its progress, which is throttled, and status messages through
+signals. It calls :meth:`CouplingWorker.check` regularly, so that the run can be
+paused, resumed and cancelled from the window.
+
+Widgets must only be used in the GUI thread. The inputs of a run are therefore
+read into :class:`CouplingParams` before the worker starts, and the loop hands
+changes of widgets to :meth:`CouplingWorker.call`, which runs them in the GUI thread.
+"""
+import collections
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QThread, Qt, pyqtSignal, pyqtSlot
+
+
+# Inputs of a coupled run, read from the widgets in the GUI thread.
+# ``set_names`` and ``set_values`` are the initial values set in the FMU,
+# ``boundary``, ``boundary_T`` and ``negative_pressure`` the Fluent boundary settings.
+CouplingParams = collections.namedtuple('CouplingParams', [
+    'fmu_file', 'end_time', 'interval', 'dt', 'set_names', 'set_values', 'use_cosimulation',
+    'mesh_file', 'boundary', 'boundary_T', 'negative_pressure'])
+
+
+class CouplingCancelled(Exception):
+    """Raised by :meth:`CouplingWorker.check` if the run has been cancelled."""
+
+
+class GuiInvoker(QObject):
+    """Object in the GUI thread that runs the calls queued by the worker."""
+
+    @pyqtSlot(object)
+    def invoke(self, call):
+        (func, args) = call
+        func(*args)
+
+
+class CouplingWorker(QObject):
+    """Runs ``job()`` in a worker thread.
+
+    :param job: Function without arguments that runs the coupled simulation.
+    :param min_interval: Shortest time in seconds between two progress signals.
+    """
+    progress = pyqtSignal(int)
+    gui_call = pyqtSignal(object)
+    finished = pyqtSignal(str)
+
+    def __init__(self, job, min_interval=0.2):
+        super(CouplingWorker, self).__init__()
+        self._job = job
+        self.min_interval = min_interval
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._last_progress = None
+        self._pending_progress = None
+        self._last_emit = 0.0
+
+    @pyqtSlot()
+    def run(self):
+        """Run the job and emit ``finished`` with ``'done'``, ``'cancelled'`` or the error message.
+
+        A progress value that has been held back by the throttling is emitted before ``finished``.
+        """
+        try:
+            self._job()
+            status = 'done'
+        except CouplingCancelled:
+            status = 'cancelled'
+        except Exception as e:
+            status = 'error: %s' % e
+        self.flush_progress()
+        self.finished.emit(status)
+
+    def cancel(self):
+        """Request the job to stop at the next call of :meth:`check`."""
+        self._cancelled.set()
+        self._running.set()
+
+    def pause(self):
+        """Request the job to wait at the next call of :meth:`check`."""
+        self._running.clear()
+
+    def resume(self):
+        """Continue a paused job."""
+        self._running.set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def check(self):
+        """Wait while the job is paused, and raise :class:`CouplingCancelled` if it has been cancelled."""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise CouplingCancelled()
+
+    def report_progress(self, value):
+        """Emit ``progress``, at most once per ``min_interval`` unless the run is complete.
+
+        A value that is not emitted is kept, and emitted by :meth:`flush_progress`.
+        """
+        now = time.monotonic()
+        if value == self._last_progress:
+            self._pending_progress = None
+            return
+        if value < 100 and now - self._last_emit < self.min_interval:
+            self._pending_progress = value
+            return
+        self._emit_progress(value, now)
+
+    def flush_progress(self):
+        """Emit the last value passed to :meth:`report_progress` if it has not been emitted."""
+        if self._pending_progress is not None:
+            self._emit_progress(self._pending_progress, time.monotonic())
+
+    def _emit_progress(self, value, now):
+        self._last_progress = value
+        self._pending_progress = None
+        self._last_emit = now
+        self.progress.emit(value)
+
+    def call(self, func, *args):
+        """Run ``func(*args)`` in the GUI thread."""
+        self.gui_call.emit((func, args))
+
+
+def start_worker(job, on_progress, on_finished):
+    """Prepare a new thread for ``job`` and return ``(thread, worker, invoker)``.
+
+    :param job: Function without arguments that runs the coupled simulation.
+    :param on_progress: Slot that receives the progress in percent.
+    :param on_finished: Slot that receives the final status.
+
+    This function must be called from the GUI thread. The caller must keep
+    a reference to the returned objects until ``on_finished`` has been called,
+    and starts the job with ``thread.start()`` once it has stored them.
+    """
+    thread = QThread()
+    worker = CouplingWorker(job)
+    invoker = GuiInvoker()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.progress.connect(on_progress, Qt.QueuedConnection)
+    worker.gui_call.connect(invoker.invoke, Qt.QueuedConnection)
+    worker.finished.connect(thread.quit)
+    worker.finished.connect(on_finished, Qt.QueuedConnection)
+    return (thread, worker, invoker)
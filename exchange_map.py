@@ -0,0 +1,225 @@
+"""
+Exchange map between the Modelica model and Fluent.
+
+The exchanged variables are given either in the text syntax of the GUI,
+``"<from> <to> [scale [offset]]"`` with entries separated by ``;``, or in a
+JSON or YAML file::
+
+    MF:
+      - {modelica: SupplyAir.T, fluent: inlet.T}
+      - {modelica: SupplyAir.m_flow, fluent: inlet.v, scale: 6.944}
+    FM:
+      - {fluent: RoomT, modelica: roo.TCFD, unit: K->degC}
+      - {fluent: fluxes, modelica: roo.Q_}
+
+Each entry is compiled once into a record. A Fluent to Modelica record
+(``FM``) knows the Fluent report that computes it, see :data:`REPORTS`, and the
+Modelica variables it sets. :meth:`ExchangeMap.bind` validates all names against
+the model description of the FMU and stores their value references, so that
+the coupling loop neither splits nor searches names.
+"""
+import collections
+import json
+import os
+
+MFRecord = collections.namedtuple('MFRecord', ['modelica', 'fluent', 'scale', 'offset', 'valueref'])
+FMRecord = collections.namedtuple('FMRecord', ['fluent', 'modelica', 'report', 'scale', 'offset', 'targets'])
+# ``key`` is the entry of the parsed report, ``modelica`` the variable that receives it.
+Target = collections.namedtuple('Target', ['key', 'modelica', 'valueref'])
+
+# A report writes a file, in which the value follows the name of each of its ``keys``.
+# If ``suffixed`` is true, one Modelica variable ``<modelica><key>`` is set per key.
+Report = collections.namedtuple('Report', ['command', 'file_prefix', 'keys', 'suffixed'])
+
+REPORTS = collections.OrderedDict([
+    ('RoomT', Report('/report/volume-integrals/mass-avg cell-fuild () temperature yes {file}',
+                     'simuT_', ('cell-fuild',), False)),
+    ('outlet_massflow', Report('/report/fluxes/mass-flow no outlet* () yes {file}',
+                               'simu_', ('outlet',), False)),
+    ('inlet_pressureDifference', Report('/report/surface-integrals/area-weighted-avg inlet () pressure yes {file}',
+                                        'simuP_', ('inlet',), False)),
+    ('fluxes', Report('/report/fluxes/heat-transfer yes yes {file}',
+                      'simufluxes_', ('inlet', 'outlet', 'wall-ceiling', 'wall-floor', 'wall-front'), True)),
+])
+
+# Named unit conversions ``value*scale + offset``.
+UNITS = {
+    'K->degC': (1.0, -273.15),
+    'degC->K': (1.0, 273.15),
+    'Pa->kPa': (1e-3, 0.0),
+    'kPa->Pa': (1e3, 0.0),
+}
+
+
+class ExchangeMapError(ValueError):
+    """Raised for an invalid exchange map."""
+
+
+def report_kind(fluent_name):
+    """Return the key of :data:`REPORTS` that computes ``fluent_name``.
+
+    An exact match is used first, otherwise the first report whose key is part
+    of the name, such as ``RoomT`` in ``RoomT1``.
+    """
+    if fluent_name in REPORTS:
+        return fluent_name
+    for kind in REPORTS:
+        if kind in fluent_name:
+            return kind
+    raise ExchangeMapError("No Fluent report for '%s', use one of %s." % (fluent_name, ', '.join(REPORTS)))
+
+
+def parse_report(kind, text):
+    """Return the dictionary ``{key: value}`` of the report ``kind`` from the content ``text`` of its file."""
+    items = text.split()
+    return {key: float(items[items.index(key) + 1]) for key in REPORTS[kind].keys}
+
+
+def _conversion(entry):
+    if 'unit' in entry:
+        if entry['unit'] not in UNITS:
+            raise ExchangeMapError("Unknown unit conversion '%s', use one of %s." %
+                                   (entry['unit'], ', '.join(sorted(UNITS))))
+        return UNITS[entry['unit']]
+    return (float(entry.get('scale', 1.0)), float(entry.get('offset', 0.0)))
+
+
+def _mf_record(entry):
+    (scale, offset) = _conversion(entry)
+    return MFRecord(entry['modelica'], entry['fluent'], scale, offset, None)
+
+
+def _fm_record(entry):
+    (scale, offset) = _conversion(entry)
+    kind = report_kind(entry['fluent'])
+    report = REPORTS[kind]
+    if report.suffixed:
+        targets = tuple(Target(key, entry['modelica'] + key, None) for key in report.keys)
+    else:
+        targets = (Target(report.keys[0], entry['modelica'], None),)
+    return FMRecord(entry['fluent'], entry['modelica'], kind, scale, offset, targets)
+
+
+def _text_entries(text, names):
+    entries = []
+    for item in text.split(';'):
+        tokens = item.split()
+        if not tokens:
+            continue
+        if len(tokens) < 2 or len(tokens) > 4:
+            raise ExchangeMapError("Entry '%s' must be '%s %s [scale [offset]]'." % (item.strip(), names[0], names[1]))
+        entry = {names[0]: tokens[0], names[1]: tokens[1]}
+        try:
+            if len(tokens) > 2:
+                entry['scale'] = float(tokens[2])
+            if len(tokens) > 3:
+                entry['offset'] = float(tokens[3])
+        except ValueError:
+            raise ExchangeMapError("Scale and offset of '%s' must be numbers." % item.strip())
+        entries.append(entry)
+    return entries
+
+
+class ExchangeMap(object):
+    """Compiled exchange map.
+
+    :param mf: List of :class:`MFRecord` from Modelica to Fluent.
+    :param fm: List of :class:`FMRecord` from Fluent to Modelica.
+    :param inputs: Modelica variables of ``fm`` with causality ``input``, which are set by :meth:`bind`.
+                   Only these may be set in continuous-time mode, hence only they are extrapolated
+                   between two exchanges.
+    """
+
+    def __init__(self, mf=(), fm=(), inputs=()):
+        self.mf = list(mf)
+        self.fm = list(fm)
+        self.inputs = frozenset(inputs)
+        # Each report runs once per CFD solve, in the order of its first use.
+        self.reports = list(collections.OrderedDict.fromkeys(r.report for r in self.fm))
+        self.by_report = {kind: [r for r in self.fm if r.report == kind] for kind in self.reports}
+        self.valuerefs = {}
+        for r in self.mf:
+            self.valuerefs[r.modelica] = r.valueref
+        for r in self.fm:
+            for t in r.targets:
+                self.valuerefs[t.modelica] = t.valueref
+        self.mf_valuerefs = [r.valueref for r in self.mf]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Compile the dictionary ``{'MF': [...], 'FM': [...]}`` of a JSON or YAML file."""
+        try:
+            return cls([_mf_record(e) for e in data.get('MF') or []],
+                       [_fm_record(e) for e in data.get('FM') or []])
+        except KeyError as e:
+            raise ExchangeMapError('Exchange map entry without %s.' % e)
+
+    @classmethod
+    def from_text(cls, mf_text, fm_text):
+        """Compile the text syntax of the GUI, e.g. ``'SupplyAir.T inlet.T; SupplyAir.v inlet.v'``."""
+        return cls.from_dict({'MF': _text_entries(mf_text, ('modelica', 'fluent')),
+                              'FM': _text_entries(fm_text, ('fluent', 'modelica'))})
+
+    @classmethod
+    def from_file(cls, file_name):
+        """Compile a JSON file, or a YAML file if its extension is ``.yaml`` or ``.yml``."""
+        with open(file_name, 'r', encoding='utf-8') as f:
+            if os.path.splitext(file_name)[1].lower() in ('.yaml', '.yml'):
+                try:
+                    import yaml
+                except ImportError:
+                    raise Exception("YAML support not found - please install pyyaml!")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        return cls.from_dict(data or {})
+
+    def bind(self, index):
+        """Return a copy in which all Modelica names are bound to their value references.
+
+        :param index: Model description index of the FMU,
+                      see :func:`buildingspy.fmi.get_model_description_index`.
+
+        Raises :class:`ExchangeMapError` that lists all names that are not in the FMU,
+        and all Fluent results that would be set to an output of the FMU.
+        Fluent results may be set to parameters at the exchanges, but only
+        inputs are listed in :attr:`inputs`.
+        """
+        position = index['positions']
+        errors = []
+
+        def valueref(name, settable):
+            i = position.get(name)
+            if i is None:
+                errors.append("'%s' is not a variable of the FMU" % name)
+                return None
+            if settable and index['causality'][i] in ('output', 'calculatedParameter', 'independent'):
+                errors.append("'%s' is an %s and cannot be set" % (name, index['causality'][i]))
+            return index['valueReference'][i]
+
+        mf = [r._replace(valueref=valueref(r.modelica, False)) for r in self.mf]
+        fm = [r._replace(targets=tuple(t._replace(valueref=valueref(t.modelica, True)) for t in r.targets))
+              for r in self.fm]
+        if errors:
+            raise ExchangeMapError('; '.join(errors))
+        inputs = [t.modelica for r in fm for t in r.targets
+                  if index['causality'][position[t.modelica]] == 'input']
+        return ExchangeMap(mf, fm, inputs)
+
+    def convert_mf(self, values):
+        """Return the dictionary ``{fluent: value}`` for the values of the Modelica variables in the order of ``mf``."""
+        return {r.fluent: v*r.scale + r.offset for (r, v) in zip(self.mf, values)}
+
+    def convert_fm(self, kind, results):
+        """Return the dictionary ``{modelica: value}`` for the parsed results of the report ``kind``."""
+        values = {}
+        for r in self.by_report.get(kind, ()):
+            for t in r.targets:
+                values[t.modelica] = results[t.key]*r.scale + r.offset
+        return values
+
+    def mf_text(self):
+        return ';'.join('%s %s %g %g' % (r.modelica, r.fluent, r.scale, r.offset) for r in self.mf)
+
+    def fm_text(self):
+        return ';'.join('%s %s %g %g' % (r.fluent, r.modelica, r.scale, r.offset) for r in self.fm)
@@ -0,0 +1,73 @@
+"""
+Extrapolation of the signals exchanged between the FMU and Fluent.
+
+Between two exchanges each side sees the values of the other side held
+constant. This zero-order hold needs short exchange intervals for accuracy.
+:class:`SignalExtrapolator` keeps a short history of the exchanged values
+and extrapolates them with a polynomial of first or second order, so that
+the receiving side sees a prediction of the signal instead.
+"""
+
+
+class SignalExtrapolator(object):
+    """Polynomial extrapolation of exchanged signals.
+
+    :param order: Default order of the extrapolation, ``0`` holds the last value.
+    :param orders: Dictionary ``{name: order}`` with the order of single signals.
+
+    The order is reduced automatically while fewer than ``order+1``
+    samples are known.
+    """
+
+    def __init__(self, order=1, orders=None):
+        self.order = order
+        self.orders = dict(orders) if orders is not None else {}
+        self.reset()
+
+    def reset(self):
+        """Clear the history."""
+        self._history = []
+
+    def _order(self, name):
+        return self.orders.get(name, self.order)
+
+    def add(self, t, values):
+        """Add the ``values`` exchanged at time ``t`` to the history.
+
+        :param t: Time of the exchange.
+        :param values: Dictionary with the exchanged values.
+
+        A sample at the same time as the last one replaces it.
+        """
+        if self._history and self._history[-1][0] == t:
+            self._history.pop()
+        self._history.append((t, dict(values)))
+        n = max([self.order] + list(self.orders.values())) + 1
+        self._history = self._history[-n:]
+
+    def truncate(self, t):
+        """Remove the samples after time ``t``, for example after a rollback."""
+        self._history = [h for h in self._history if h[0] <= t]
+
+    def last_time(self):
+        """Return the time of the last sample, or ``None`` if there is none."""
+        return self._history[-1][0] if self._history else None
+
+    def predict(self, t):
+        """Return a dictionary with the values of all signals extrapolated to time ``t``."""
+        if not self._history:
+            return {}
+        values = {}
+        for name in self._history[-1][1]:
+            points = [(ti, v[name]) for (ti, v) in self._history if name in v]
+            points = points[-(self._order(name) + 1):]
+            value = 0.0
+            for j, (tj, yj) in enumerate(points):
+                # Lagrange polynomial through the last samples
+                w = 1.0
+                for m, (tm, _) in enumerate(points):
+                    if m != j:
+                        w *= (t - tm) / (tj - tm)
+                value += w * yj
+            values[name] = value
+        return values
@@ -0,0 +1,166 @@
+"""
+Cache of loaded FMUs for repeated runs of the coupled simulation.
+
+``load_fmu`` unzips the FMU, parses its model description and loads the
+shared library every time it is called. For parameter studies that run the
+same FMU many times, :class:`FMUCache` keeps the unpacked FMU on disk and the
+loaded instance in memory, both keyed by the hash of the FMU file.
+A cached instance is reset instead of being loaded again.
+
+When an FMU file changes, the directory of its previous version is removed,
+unless another FMU file has the same content.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+
+def file_hash(file_name):
+    """Return the sha256 hash of the file ``file_name``."""
+    sha = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# File in the cache directory that maps each FMU file to the hash of its last unpacked version.
+SOURCES_FILE = 'sources.json'
+
+# Age in seconds after which a directory of no FMU file is removed. Such directories remain
+# if their removal failed, and are not removed at once as another process may just unpack them.
+ORPHAN_AGE = 3600
+
+
+class FMUCache(object):
+    """Cache of unpacked and loaded FMUs.
+
+    :param cache_dir: Directory in which the FMUs are unpacked.
+                      If ``None``, a directory in the system temporary directory is used.
+    :param log_level: Log level passed to ``load_fmu``.
+    """
+
+    def __init__(self, cache_dir=None, log_level=None):
+        if cache_dir is None:
+            cache_dir = os.path.join(tempfile.gettempdir(), 'belab-fmu-cache')
+        self.cache_dir = cache_dir
+        self.log_level = log_level
+        self._hashes = {}
+        self._models = {}
+        self.loads = 0
+        self.resets = 0
+
+    def key(self, fmu_file):
+        """Return the hash of ``fmu_file``, which is computed only once per file version."""
+        stat = os.stat(fmu_file)
+        mem_key = (os.path.abspath(fmu_file), stat.st_size, stat.st_mtime)
+        if mem_key not in self._hashes:
+            self._hashes[mem_key] = file_hash(fmu_file)
+        return self._hashes[mem_key]
+
+    def unpack(self, fmu_file):
+        """Return the directory into which ``fmu_file`` has been unpacked."""
+        key = self.key(fmu_file)
+        unpack_dir = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(unpack_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Unpack into a temporary directory first, so that an interrupted
+            # extraction, or a second process, never sees a partial FMU.
+            tmp_dir = tempfile.mkdtemp(prefix='tmp-', dir=self.cache_dir)
+            with zipfile.ZipFile(fmu_file) as zip_file:
+                zip_file.extractall(tmp_dir)
+            try:
+                os.rename(tmp_dir, unpack_dir)
+            except OSError:
+                # Another process unpacked the same FMU in the meantime.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._remove_stale(fmu_file, key)
+        return unpack_dir
+
+    def _read_sources(self):
+        try:
+            with open(os.path.join(self.cache_dir, SOURCES_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _remove_stale(self, fmu_file, key):
+        """Record that ``fmu_file`` has the hash ``key``, and remove the directories of previous versions."""
+        sources = self._read_sources()
+        path = os.path.abspath(fmu_file)
+        old = sources.get(path)
+        if old == key:
+            return
+        sources[path] = key
+        tmp_file = os.path.join(self.cache_dir, '%s.%d.tmp' % (SOURCES_FILE, os.getpid()))
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(sources, f, indent=1)
+        os.replace(tmp_file, os.path.join(self.cache_dir, SOURCES_FILE))
+        keys = set(sources.values())
+        for model_key in [k for k in self._models if k[0] not in keys]:
+            del self._models[model_key]
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            unpack_dir = os.path.join(self.cache_dir, name)
+            if len(name) != 64 or name in keys or not os.path.isdir(unpack_dir):
+                continue
+            # The shared library of an instance that is still loaded cannot be
+            # removed on Windows, hence the removal is repeated later.
+            if name == old or now - os.path.getmtime(unpack_dir) > ORPHAN_AGE:
+                shutil.rmtree(unpack_dir, ignore_errors=True)
+
+    def model_description(self, fmu_file):
+        """Return the model description index of ``fmu_file``.
+
+        See :func:`buildingspy.fmi.get_model_description_index`.
+        """
+        import buildingspy.fmi
+
+        return buildingspy.fmi.get_model_description_index(fmu_file)
+
+    def _load(self, fmu_file, kind):
+        from pyfmi import load_fmu
+
+        kwargs = {} if self.log_level is None else {'log_level': self.log_level}
+        self.loads += 1
+        try:
+            return load_fmu(self.unpack(fmu_file), kind=kind, allow_unzipped_fmu=True, **kwargs)
+        except TypeError:
+            # pyfmi versions without support for unzipped FMUs
+            return load_fmu(fmu_file, kind=kind, **kwargs)
+
+    def get(self, fmu_file, kind='auto'):
+        """Return an instance of ``fmu_file`` that is ready to be initialized.
+
+        :param kind: ``'ME'`` for model exchange, ``'CS'`` for co-simulation,
+                     or ``'auto'``, see ``pyfmi.load_fmu``.
+
+        A cached instance is reset with ``reset()``.
+        If the reset fails, the FMU is loaded again.
+        """
+        key = (self.key(fmu_file), kind)
+        model = self._models.get(key)
+        if model is not None:
+            try:
+                model.reset()
+                self.resets += 1
+                return model
+            except Exception:
+                del self._models[key]
+        model = self._load(fmu_file, kind)
+        self._models[key] = model
+        return model
+
+    def discard(self, fmu_file):
+        """Remove the instance of ``fmu_file`` from the cache, for example after a failed run."""
+        file_key = self.key(fmu_file)
+        for key in [k for k in self._models if k[0] == file_key]:
+            del self._models[key]
+
+    def clear(self):
+        """Remove all instances from the cache. The unpacked FMUs are kept on disk."""
+        self._models.clear()
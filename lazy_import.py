@@ -0,0 +1,113 @@
+"""
+Lazy imports for a fast start of BELab.
+
+Most users only use one of the Dymola or the FMU path, but the modules of
+both, and of the plotting and table libraries, used to be imported before the
+splash screen was shown. :func:`lazy_import` returns a placeholder that
+imports the module the first time one of its attributes is used.
+
+Running this file prints the import time of the modules that BELab1.0.py
+imports with :func:`lazy_import`, or of the modules given as arguments,
+measured with ``python -X importtime``::
+
+    python lazy_import.py
+    python lazy_import.py pyfmi fluent_corba
+"""
+import ast
+import importlib
+import os
+import subprocess
+import sys
+import types
+
+# The GUI whose lazily imported modules are reported.
+BELAB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'BELab1.0.py')
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder of a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        super(LazyModule, self).__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """Return the module ``name`` if it is already imported, and a :class:`LazyModule` otherwise."""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def lazy_modules(file_name=BELAB_FILE):
+    """Return the names of the modules that ``file_name`` imports with :func:`lazy_import`.
+
+    :param file_name: Name of the Python file, by default BELab1.0.py.
+
+    The names are returned in the order of the calls.
+    """
+    with open(file_name, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=file_name)
+    names = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'lazy_import'
+                and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            names.append((node.lineno, node.args[0].value))
+    return [name for (_, name) in sorted(names)]
+
+
+def import_report(module, python=None):
+    """Return the import times of ``module`` and of the modules it imports.
+
+    :param module: Name of the module.
+    :param python: Python interpreter, by default the running one.
+
+    Returns a list of tuples ``(cumulative_us, self_us, name)``, sorted by the
+    cumulative time, as reported by ``python -X importtime``.
+    If the module cannot be imported, the list is empty.
+    """
+    if python is None:
+        python = sys.executable
+    proc = subprocess.run([python, '-X', 'importtime', '-c', 'import ' + module],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        return []
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            entries.append((int(fields[1]), int(fields[0]), fields[2].strip()))
+        except ValueError:
+            # Header line
+            continue
+    return sorted(entries, reverse=True)
+
+
+if __name__ == '__main__':
+    total = 0
+    for mod in sys.argv[1:] or lazy_modules():
+        report = import_report(mod)
+        if not report:
+            print('%-30s not available' % mod)
+            continue
+        top = [e for e in report if e[2] == mod]
+        cumulative = top[0][0] if top else report[0][0]
+        total += cumulative
+        print('%-30s %8.3f s' % (mod, cumulative / 1e6))
+    print('%-30s %8.3f s (shared modules are counted more than once)' % ('sum', total / 1e6))
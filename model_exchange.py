@@ -0,0 +1,69 @@
+"""
+Integration of a model exchange FMU between two exchanges.
+
+The coupling loop in BELab1.0.py integrates the FMU with the explicit Euler
+method and handles step, time and state events at every step. The implicit
+coupling rolls the FMU back to the last accepted exchange and integrates the
+exchange interval again with new interface values, which needs the same steps
+without the exchange itself. :func:`integrate` takes these steps.
+"""
+
+
+def leave_event_mode(model):
+    """Finish the event iteration and enter the continuous time mode.
+
+    :param model: The FMU instance in event mode.
+
+    Returns the event info of the FMU after the event iteration.
+    """
+    info = model.get_event_info()
+    info.newDiscreteStatesNeeded = True
+    while info.newDiscreteStatesNeeded:
+        model.event_update('0')
+        info = model.get_event_info()
+    model.enter_continuous_time_mode()
+    return info
+
+
+def integrate(model, t_end, dt, t_next, event_ind, set_inputs=None, on_step=None):
+    """Integrate the FMU in continuous time mode from its current time to ``t_end``.
+
+    :param model: The FMU instance in continuous time mode.
+    :param t_end: Time at which the integration stops.
+    :param dt: Step size.
+    :param t_next: Time of the next time event.
+    :param event_ind: Event indicators at the current time.
+    :param set_inputs: Function that is called with the time of each step to set the inputs.
+    :param on_step: Function that is called with the time after each step.
+
+    The steps are those of the coupling loop, ``x(n+1) = x(n) + h*f(x(n), t(n))``,
+    and the last step ends exactly at ``t_end``.
+    Returns ``(t_next, event_ind)`` at ``t_end``, with ``t_next`` set to infinity
+    if the FMU defines no next time event.
+    """
+    time = model.time
+    x = model.continuous_states
+    while t_end - time > 1.e-10:
+        dx = model.get_derivatives()
+        h = min(dt, t_next-time, t_end-time)
+        time = t_end if h == t_end-time else time + h
+        model.time = time
+        x = x + h*dx
+        model.continuous_states = x
+        if set_inputs is not None:
+            set_inputs(time)
+
+        event_ind_new = model.get_event_indicators()
+        step_event = model.completed_integrator_step()
+        time_event = abs(time-t_next) <= 1.e-10
+        state_event = any((new > 0.0) != (old > 0.0) for (new, old) in zip(event_ind_new, event_ind))
+        if step_event or time_event or state_event:
+            model.enter_event_mode()
+            info = leave_event_mode(model)
+            if info.valuesOfContinuousStatesChanged:
+                x = model.continuous_states
+            t_next = info.nextEventTime if info.nextEventTimeDefined else float('inf')
+        event_ind = event_ind_new
+        if on_step is not None:
+            on_step(time)
+    return (t_next, event_ind)
@@ -0,0 +1,116 @@
+"""
+Aitken relaxation for the implicit coupling between the FMU and Fluent.
+
+In the explicit scheme the values computed by Fluent are passed once to the FMU
+at every exchange. In the implicit scheme the exchange is repeated: the FMU is
+rolled back to the last accepted exchange and integrated over the exchange
+interval again with the relaxed Fluent values, the FMU outputs are sent to
+Fluent again, and so on until the interface values converge.
+The relaxation factor is updated with Aitken's method, see
+U. Kuettler and W. A. Wall, Fixed-point fluid-structure interaction solvers with
+dynamic relaxation, Computational Mechanics, 43, 2008.
+"""
+import math
+
+
+class AitkenRelaxation(object):
+    """Fixed-point iteration of the interface values with Aitken relaxation.
+
+    :param omega0: Relaxation factor of the first iteration.
+    :param omega_max: Upper bound of the relaxation factor.
+    :param atol: Absolute tolerance of the interface residual.
+    :param rtol: Relative tolerance of the interface residual.
+    :param max_iterations: Largest number of iterations per exchange.
+    :param enabled: Set to ``True`` to use the implicit coupling.
+
+    The interface values are dictionaries ``{name: value}``.
+    """
+
+    def __init__(self, omega0=0.5, omega_max=1.0, atol=1e-4, rtol=1e-3,
+                 max_iterations=5, enabled=False):
+        self.omega0 = omega0
+        self.omega_max = omega_max
+        self.atol = atol
+        self.rtol = rtol
+        self.max_iterations = max_iterations
+        self.enabled = enabled
+        self.total_iterations = 0
+        self.not_converged = 0
+        self.reset()
+
+    def reset(self):
+        """Start the iterations of a new exchange."""
+        self.omega = self.omega0
+        self.iterations = 0
+        self._last_residual = None
+
+    @staticmethod
+    def _names(x, x_tilde):
+        return sorted(set(x) & set(x_tilde))
+
+    def converged(self, x, x_tilde):
+        """Return ``True`` if ``x_tilde`` agrees with ``x`` within the tolerances.
+
+        :param x: Interface values that have been set in the FMU.
+        :param x_tilde: Interface values that Fluent computed for them.
+        """
+        for name in self._names(x, x_tilde):
+            if abs(x_tilde[name] - x[name]) > self.atol + self.rtol * abs(x_tilde[name]):
+                return False
+        return True
+
+    def relax(self, x, x_tilde):
+        """Return the relaxed interface values for the next iteration.
+
+        :param x: Interface values of the current iteration.
+        :param x_tilde: Interface values that Fluent computed for ``x``.
+        """
+        names = self._names(x, x_tilde)
+        scale = [max(abs(x_tilde[n]), 1.0) for n in names]
+        residual = [(x_tilde[n] - x[n]) / s for (n, s) in zip(names, scale)]
+        if self._last_residual is not None and len(self._last_residual) == len(residual):
+            dr = [r - r0 for (r, r0) in zip(residual, self._last_residual)]
+            dr_dr = sum(d * d for d in dr)
+            if dr_dr > 0:
+                omega = -self.omega * sum(r0 * d for (r0, d) in zip(self._last_residual, dr)) / dr_dr
+                if math.isfinite(omega) and omega > 0:
+                    self.omega = min(omega, self.omega_max)
+                else:
+                    self.omega = self.omega0
+        self._last_residual = residual
+        self.iterations += 1
+        self.total_iterations += 1
+        x_new = dict(x_tilde)
+        for (n, s, r) in zip(names, scale, residual):
+            x_new[n] = x[n] + self.omega * r * s
+        return x_new
+
+    def iterate(self, x_held, x_tilde, solve):
+        """Repeat an exchange until the interface values converge.
+
+        :param x_held: Interface values that were set in the FMU for the exchange interval,
+                       or an empty dictionary if none were set.
+        :param x_tilde: Interface values that Fluent computed for the FMU outputs.
+        :param solve: Function that integrates the FMU over the exchange interval again
+                      with the interface values it is called with, and returns the values
+                      that Fluent computes for the new FMU outputs, or ``None`` if the
+                      CFD solve fails.
+
+        Returns ``(converged, x)``, where ``x`` are the last relaxed interface values.
+        """
+        self.reset()
+        if not x_held:
+            x = dict(x_tilde)
+        elif self.converged(x_held, x_tilde):
+            return (True, dict(x_held))
+        else:
+            x = self.relax(x_held, x_tilde)
+        for _ in range(self.max_iterations):
+            x_tilde = solve(x)
+            if x_tilde is None:
+                break
+            if self.converged(x, x_tilde):
+                return (True, x)
+            x = self.relax(x, x_tilde)
+        self.not_converged += 1
+        return (False, x)
@@ -0,0 +1,256 @@
+"""
+Result store of a coupled run.
+
+All values of a run, i.e. the exchange time, the step index and every
+exchanged and recorded variable, are appended to one HDF5 file, with one
+resizable dataset per variable. The file is written in single-writer
+multiple-reader mode and flushed after every ``flush_every`` rows, so
+that it can be read with :func:`read_store` while the run is in progress.
+
+The set of variables is given when the store is opened, or else fixed by the
+first call of :meth:`RunStore.append`.
+Variables that are missing in a row are stored as ``nan``, and
+other variables are skipped and listed in :attr:`RunStore.skipped`,
+so that a long run never fails because of its output.
+
+h5py is optional. :func:`open_store` returns a :class:`CsvStore` with the same
+interface if it is not installed. It is imported on first use, as it imports
+numpy, which would delay the start of BELab.
+"""
+import csv
+import os
+
+# h5py module, None if it is not installed, or False if it has not been imported yet.
+h5py = False
+
+
+def _h5py():
+    """Return the h5py module, or ``None`` if it is not installed."""
+    global h5py
+    if h5py is False:
+        try:
+            import h5py as module
+        except ImportError:
+            module = None
+        h5py = module
+    return h5py
+
+
+def _dataset_name(name):
+    # '/' separates groups in HDF5, the first one is kept as the group of the variable.
+    (group, sep, rest) = name.partition('/')
+    if sep:
+        return group + '/' + rest.replace('/', '|')
+    return name
+
+
+class RunStore(object):
+    """Append-only HDF5 store of one coupled run.
+
+    :param file_name: Name of the HDF5 file, which is overwritten.
+    :param names: List of the variables, or ``None`` to use the variables of the first row.
+    :param flush_every: Number of rows after which the file is flushed.
+    :param attrs: Dictionary with attributes of the run, such as the FMU name.
+
+    Usage::
+
+        store = RunStore('run.h5', attrs={'fmu': fmu_file})
+        store.append(0, 0.0, {'MF/inlet.T': 293.15, 'FM/ori3.dp': 1.2})
+        store.close()
+    """
+
+    def __init__(self, file_name, names=None, flush_every=1, attrs=None):
+        if _h5py() is None:
+            raise Exception("HDF5 support not found - please install h5py!")
+        self.file_name = file_name
+        self.flush_every = flush_every
+        self._file = h5py.File(file_name, 'w', libver='latest')
+        for (key, value) in (attrs or {}).items():
+            self._file.attrs[key] = str(value)
+        self._datasets = None
+        self._rows = 0
+        self.skipped = set()
+        if names is not None:
+            self._create(list(names))
+
+    def _create(self, names):
+        self._datasets = {}
+        for (name, dtype) in [('step', 'i8'), ('time', 'f8')] + [(n, 'f8') for n in names]:
+            dset = self._file.create_dataset(_dataset_name(name), shape=(0,), maxshape=(None,),
+                                             dtype=dtype, chunks=(256,))
+            dset.attrs['name'] = name
+            self._datasets[name] = dset
+        self._file.attrs['variables'] = list(names)
+        # Readers may open the file from now on. No datasets can be added afterwards.
+        self._file.swmr_mode = True
+
+    def append(self, step, time, values):
+        """Append one row.
+
+        :param step: Index of the exchange.
+        :param time: Simulation time of the exchange.
+        :param values: Dictionary ``{name: value}``. A name ``group/variable``
+                       stores the variable in the HDF5 group ``group``.
+        """
+        if self._datasets is None:
+            self._create(sorted(values))
+        self.skipped.update(set(values) - set(self._datasets))
+        n = self._rows + 1
+        row = dict(values)
+        row['step'] = step
+        row['time'] = time
+        for (name, dset) in self._datasets.items():
+            dset.resize((n,))
+            dset[n - 1] = row.get(name, float('nan'))
+        self._rows = n
+        if self._rows % self.flush_every == 0:
+            self.flush()
+
+    def extend(self, steps, times, columns):
+        """Append several rows at once.
+
+        :param steps: List with the index of each row.
+        :param times: List with the time of each row.
+        :param columns: Dictionary ``{name: list}`` with one value per row for each variable.
+
+        Each dataset is resized once, which is faster than appending the rows one by one.
+        """
+        if self._datasets is None:
+            self._create(sorted(columns))
+        self.skipped.update(set(columns) - set(self._datasets))
+        m = len(steps)
+        if m == 0:
+            return
+        n = self._rows + m
+        block = dict(columns)
+        block['step'] = steps
+        block['time'] = times
+        for (name, dset) in self._datasets.items():
+            dset.resize((n,))
+            dset[self._rows:n] = block.get(name, [float('nan')] * m)
+        self._rows = n
+        self.flush()
+
+    def flush(self):
+        """Write the buffered rows to disk, so that readers see them."""
+        if self._datasets is not None:
+            for dset in self._datasets.values():
+                dset.flush()
+        self._file.flush()
+
+    def close(self):
+        """Flush and close the file."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CsvStore(object):
+    """Append-only csv store with the interface of :class:`RunStore`.
+
+    :param file_name: Name of the csv file, which is overwritten.
+    :param names: List of the variables, or ``None`` to use the variables of the first row.
+    :param flush_every: Number of rows after which the file is flushed.
+    :param attrs: Attributes of the run. They are not stored.
+
+    The file has the columns ``step``, ``time`` and one column per variable.
+    Missing values are written as empty fields.
+    """
+
+    def __init__(self, file_name, names=None, flush_every=1, attrs=None):
+        self.file_name = file_name
+        self.flush_every = flush_every
+        self._file = open(file_name, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._names = None
+        self._rows = 0
+        self.skipped = set()
+        if names is not None:
+            self._create(list(names))
+
+    def _create(self, names):
+        self._names = names
+        self._writer.writerow(['step', 'time'] + names)
+
+    def append(self, step, time, values):
+        """Append one row, see :meth:`RunStore.append`."""
+        self.extend([step], [time], {name: [value] for (name, value) in values.items()})
+
+    def extend(self, steps, times, columns):
+        """Append several rows at once, see :meth:`RunStore.extend`."""
+        if self._names is None:
+            self._create(sorted(columns))
+        self.skipped.update(set(columns) - set(self._names))
+        for i in range(len(steps)):
+            self._writer.writerow([steps[i], times[i]] +
+                                  [columns[name][i] if name in columns else '' for name in self._names])
+            self._rows += 1
+            if self._rows % self.flush_every == 0:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered rows to disk."""
+        self._file.flush()
+
+    def close(self):
+        """Flush and close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def open_store(file_name, names=None, flush_every=1, attrs=None):
+    """Return a :class:`RunStore` for ``file_name``, or a :class:`CsvStore` if h5py is not installed.
+
+    :param file_name: Name of the HDF5 file. The csv file has the same name, with the
+                      extension ``.csv``.
+
+    The other arguments are those of :class:`RunStore`.
+    """
+    if _h5py() is None:
+        return CsvStore(os.path.splitext(file_name)[0] + '.csv', names=names,
+                        flush_every=flush_every, attrs=attrs)
+    return RunStore(file_name, names=names, flush_every=flush_every, attrs=attrs)
+
+
+def read_store(file_name):
+    """Return a dictionary ``{name: numpy array}`` with all variables of a store.
+
+    :param file_name: Name of the HDF5 file.
+
+    The file may still be written by a running simulation.
+    All arrays are cut to the number of rows that have been written completely.
+    """
+    if _h5py() is None:
+        raise Exception("HDF5 support not found - please install h5py!")
+    with h5py.File(file_name, 'r', libver='latest', swmr=True) as f:
+        if 'variables' not in f.attrs:
+            # No row has been written yet
+            return {}
+        names = ['step', 'time'] + list(f.attrs.get('variables', []))
+        datasets = {}
+        for name in names:
+            dset = f[_dataset_name(name)]
+            dset.refresh()
+            datasets[name] = dset
+        n = min(dset.shape[0] for dset in datasets.values())
+        return {name: dset[:n] for (name, dset) in datasets.items()}
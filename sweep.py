@@ -0,0 +1,158 @@
+"""
+Parameter sweeps of the Modelica model in a process pool.
+
+In the GUI, door leakage (``LClo``, ``CDClo``, ``mClo``), room temperatures and
+cleaner curves are set one at a time with ``doorButton_click``,
+``RoomT_Input_click`` and ``cleaner``. This module runs a whole table of such
+parameter sets, each in its own FMU instance, on all cores. Each worker
+keeps its loaded FMU in an :class:`fmu_cache.FMUCache`. The results of all runs are
+streamed into one columnar HDF5 file, a :class:`result_store.RunStore` in which
+``step`` is the index of the parameter set, or into a csv file with the same
+columns if the name of the result file ends with ``.csv``.
+
+The table is a csv file whose header contains the FMU variable names.
+A cleaner curve ``a``, ``b`` is given by the columns ``<cleaner>.curve_a`` and
+``<cleaner>.curve_b``, from which the parameter ``<cleaner>.A`` is computed
+with :func:`cleaner_area`.
+
+Usage::
+
+    python sweep.py FMU/Buildings_plant_0single.fmu table.csv --final-time 3600 \\
+        --outputs roo.TRooAir ori3.dp --result sweep.h5
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+
+from fmu_cache import FMUCache
+from result_store import CsvStore, open_store
+
+_worker_cache = None
+
+
+def cleaner_area(a, b):
+    """Return the parameter ``A`` of an air cleaner for the curve coefficients ``a`` and ``b``."""
+    return 20*(1.2/a)**(1/b)
+
+
+def expand_parameters(row):
+    """Return the lists of names and values that are set in the FMU for one row of the table.
+
+    :param row: Dictionary ``{column: value}``.
+    """
+    names = []
+    values = []
+    curves = {}
+    for (column, value) in row.items():
+        if value is None or str(value).strip() == '':
+            continue
+        for suffix in ('.curve_a', '.curve_b'):
+            if column.endswith(suffix):
+                curves.setdefault(column[:-len(suffix)], {})[suffix] = float(value)
+                break
+        else:
+            names.append(column)
+            values.append(float(value))
+    for (cleaner, coefficients) in curves.items():
+        if len(coefficients) != 2:
+            raise ValueError("Cleaner '%s' needs both curve_a and curve_b." % cleaner)
+        names.append(cleaner + '.A')
+        values.append(cleaner_area(coefficients['.curve_a'], coefficients['.curve_b']))
+    return (names, values)
+
+
+def read_table(file_name):
+    """Return the rows of the parameter table ``file_name`` as a list of dictionaries."""
+    with open(file_name, 'r', encoding='utf-8', newline='') as f:
+        return [row for row in csv.DictReader(f)]
+
+
+def _init_worker(cache_dir):
+    global _worker_cache
+    _worker_cache = FMUCache(cache_dir=cache_dir)
+
+
+def _run_case(args):
+    """Simulate one parameter set and return ``(case, times, columns, error)``."""
+    (case, fmu_file, row, outputs, final_time, ncp, fixed_inputs) = args
+    try:
+        (names, values) = expand_parameters(row)
+        for (name, value) in fixed_inputs.items():
+            names.append(name)
+            values.append(value)
+        model = _worker_cache.get(fmu_file)
+        model.set(names, values)
+        opts = model.simulate_options()
+        opts['ncp'] = ncp
+        opts['result_handling'] = 'memory'
+        res = model.simulate(start_time=0, final_time=final_time, options=opts)
+        columns = {name: list(res[name]) for name in outputs}
+        return (case, list(res['time']), columns, None)
+    except Exception as e:
+        # The instance may be in an undefined state after a failure.
+        _worker_cache.discard(fmu_file)
+        return (case, [], {name: [] for name in outputs}, str(e))
+
+
+def run_sweep(fmu_file, table, outputs, result_file, final_time,
+              processes=None, ncp=500, fixed_inputs=None, cache_dir=None):
+    """Run the FMU for every parameter set of ``table`` and write the results to ``result_file``.
+
+    :param fmu_file: Name of the FMU file.
+    :param table: List of dictionaries ``{name: value}``, one per parameter set.
+    :param outputs: List of the variables that are recorded.
+    :param result_file: Name of the HDF5 file with the datasets ``step``, which is the case,
+                        ``time`` and ``outputs``, see :func:`result_store.read_store`.
+                        If the name ends with ``.csv``, or if h5py is not installed,
+                        a csv file with the same columns is written instead.
+    :param final_time: Final time of each run.
+    :param processes: Number of worker processes, ``None`` uses all cores.
+    :param ncp: Number of output points of each run.
+    :param fixed_inputs: Dictionary with values that are set in all runs, for example
+                         the CFD results that are held constant in the sweep.
+    :param cache_dir: Directory in which the workers unpack the FMU.
+
+    Returns a dictionary ``{case: error}`` of the parameter sets that failed.
+    """
+    fixed_inputs = dict(fixed_inputs) if fixed_inputs is not None else {}
+    if cache_dir is None:
+        cache_dir = FMUCache().cache_dir
+    # Unpack once in the parent, so that the workers do not race to do it.
+    FMUCache(cache_dir=cache_dir).unpack(fmu_file)
+    tasks = [(case, fmu_file, row, list(outputs), final_time, ncp, fixed_inputs)
+             for (case, row) in enumerate(table)]
+    errors = {}
+    attrs = {'fmu': fmu_file, 'final_time': final_time, 'step': 'case', 'cases': len(table)}
+    if result_file.lower().endswith('.csv'):
+        writer = CsvStore(result_file, names=outputs, attrs=attrs)
+    else:
+        writer = open_store(result_file, names=outputs, attrs=attrs)
+    try:
+        with multiprocessing.Pool(processes=processes, initializer=_init_worker,
+                                  initargs=(cache_dir,)) as pool:
+            # Results are written as soon as a run finishes.
+            for (case, times, columns, error) in pool.imap_unordered(_run_case, tasks):
+                if error is not None:
+                    errors[case] = error
+                writer.extend([case] * len(times), times, columns)
+    finally:
+        writer.close()
+    return errors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parameter sweep of an FMU.')
+    parser.add_argument('fmu', help='FMU file')
+    parser.add_argument('table', help='csv file with one parameter set per row')
+    parser.add_argument('--final-time', type=float, required=True, help='final time of each run')
+    parser.add_argument('--outputs', nargs='+', required=True, help='variables that are recorded')
+    parser.add_argument('--result', default='sweep.h5', help='HDF5 or .csv file for the results')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--ncp', type=int, default=500, help='number of output points per run')
+    args = parser.parse_args()
+
+    errs = run_sweep(os.path.abspath(args.fmu), read_table(args.table), args.outputs,
+                     args.result, args.final_time, processes=args.processes, ncp=args.ncp)
+    for (case, err) in sorted(errs.items()):
+        print('Case %d failed: %s' % (case, err))
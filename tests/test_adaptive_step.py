@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_step import AdaptiveInterval  # noqa: E402
+
+
+class Test_adaptive_step(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`adaptive_step`.
+    """
+
+    def _run(self, ctrl, signal, n):
+        """ Exchange ``signal(t)`` ``n`` times and return the intervals."""
+        t = 0.0
+        intervals = []
+        for _ in range(n):
+            interval = ctrl.update(t, {'T': signal(t)})
+            intervals.append(interval)
+            t += interval
+        return intervals
+
+    def test_disabled_keeps_interval(self):
+        ctrl = AdaptiveInterval(enabled=False)
+        ctrl.reset(10)
+        self.assertEqual([10] * 5, self._run(ctrl, lambda t: 300.0 + 0.1 * t * t, 5))
+
+    def test_widen_on_smooth_signal(self):
+        # A linear signal is extrapolated exactly, hence the interval grows by max_growth
+        ctrl = AdaptiveInterval(min_ratio=0.25, max_ratio=8.0, max_growth=2.0)
+        ctrl.reset(10)
+        self.assertEqual([10, 10, 20, 40, 80, 80, 80], self._run(ctrl, lambda t: 300.0 + 0.01 * t, 7))
+
+    def test_narrow_on_transient(self):
+        ctrl = AdaptiveInterval(min_ratio=0.25, max_ratio=8.0, atol=1e-3, rtol=0, max_shrink=0.5)
+        ctrl.reset(10)
+        self.assertEqual([10, 10], self._run(ctrl, lambda t: 300.0, 2))
+        # Step of the signal
+        self.assertEqual(5, ctrl.update(20, {'T': 310.0}))
+        self.assertGreater(ctrl.error, 1)
+        self.assertEqual(2.5, ctrl.update(25, {'T': 330.0}))
+        # Clamped at min_ratio
+        self.assertEqual(2.5, ctrl.update(27.5, {'T': 250.0}))
+
+    def test_moderate_error(self):
+        ctrl = AdaptiveInterval(atol=1.0, rtol=0, safety=0.9)
+        ctrl.reset(10)
+        ctrl.update(0, {'T': 0.0})
+        ctrl.update(10, {'T': 0.0})
+        # Error of 2.25 tolerances, the interval shrinks by 0.9/sqrt(2.25)
+        self.assertAlmostEqual(6.0, ctrl.update(20, {'T': 2.25}))
+        self.assertAlmostEqual(2.25, ctrl.error)
+
+    def test_estimate_error(self):
+        ctrl = AdaptiveInterval(atol=0.5, rtol=0)
+        self.assertIsNone(ctrl.estimate_error(0, {'T': 1.0}))
+        ctrl.update(0, {'T': 1.0, 'p': 5.0})
+        ctrl.update(1, {'T': 2.0})
+        # Names that are missing in one of the previous exchanges are ignored
+        self.assertAlmostEqual(2.0, ctrl.estimate_error(2, {'T': 4.0, 'p': 100.0}))
+
+    def test_truncate(self):
+        ctrl = AdaptiveInterval(atol=1e-3, rtol=0)
+        ctrl.reset(10)
+        ctrl.update(0, {'T': 0.0})
+        ctrl.update(10, {'T': 1.0})
+        self.assertAlmostEqual(0.0, ctrl.estimate_error(20, {'T': 2.0}))
+        ctrl.update(20, {'T': 5.0})
+        # After a rollback to t=10 the rejected exchange at t=20 is not extrapolated
+        ctrl.truncate(10)
+        self.assertAlmostEqual(0.0, ctrl.estimate_error(15, {'T': 1.5}))
+        ctrl.truncate(5)
+        self.assertIsNone(ctrl.estimate_error(15, {'T': 1.5}))
+
+    def test_repeated_exchange(self):
+        # The implicit coupling reads the outputs at the same exchange time in every iteration
+        ctrl = AdaptiveInterval(atol=1e-3, rtol=0)
+        ctrl.reset(10)
+        ctrl.update(0, {'T': 0.0})
+        ctrl.update(10, {'T': 1.0})
+        self.assertEqual(5, ctrl.update(20, {'T': 3.0}))
+        self.assertEqual(5, ctrl.update(20, {'T': 2.5}))
+        self.assertEqual(20, ctrl.update(20, {'T': 2.0}))
+        self.assertEqual(0, ctrl.error)
+        # The next exchange extrapolates from the last values at t=20
+        self.assertAlmostEqual(0.0, ctrl.estimate_error(40, {'T': 4.0}))
+
+    def test_reset(self):
+        ctrl = AdaptiveInterval()
+        ctrl.reset(10)
+        self._run(ctrl, lambda t: 300.0 + 0.01 * t, 4)
+        ctrl.reset(4)
+        self.assertEqual(4, ctrl.interval)
+        self.assertEqual(4, ctrl.base)
+        self.assertIsNone(ctrl.estimate_error(1, {'T': 300.0}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cfd_cache import ResponseCache, case_key, file_digest  # noqa: E402
+
+
+class Test_cfd_cache(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`cfd_cache`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-cfd-cache-")
+        self._file_name = os.path.join(self._temp_dir, "CFD_cache", "case.ndjson")
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_lookup(self):
+        cache = ResponseCache(trust_radius=0.01, min_points=2)
+        self.assertIsNone(cache.lookup({'inlet.T': 293.15}))
+        cache.add({'inlet.T': 293.15}, {'roo.T': 295.0})
+        # Exact hit
+        self.assertEqual({'roo.T': 295.0}, cache.lookup({'inlet.T': 293.15}))
+        # Inside the trust region, but only one sample
+        self.assertIsNone(cache.lookup({'inlet.T': 293.2}))
+        cache.add({'inlet.T': 293.25}, {'roo.T': 296.0})
+        # Inverse distance weighting of two samples at about the same distance
+        self.assertAlmostEqual(295.5, cache.lookup({'inlet.T': 293.2})['roo.T'], places=3)
+        # Outside the trust region
+        self.assertIsNone(cache.lookup({'inlet.T': 300.0}))
+        # Other set of boundary conditions
+        self.assertIsNone(cache.lookup({'inlet.T': 293.15, 'inlet.v': 1.0}))
+        self.assertEqual((2, 1, 4), (cache.hits, cache.interpolated, cache.misses))
+
+    def test_save_appends(self):
+        cache = ResponseCache()
+        cache.open(self._file_name)
+        cache.add({'inlet.T': 293.15}, {'roo.T': 295.0})
+        cache.save()
+        cache.add({'inlet.T': 300.0}, {'roo.T': 301.0})
+        cache.save()
+        # Saving without new samples does not write anything
+        cache.save()
+        with open(self._file_name, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(2, len(lines))
+
+        cache = ResponseCache()
+        cache.open(self._file_name)
+        self.assertEqual(2, len(cache))
+        self.assertEqual({'roo.T': 301.0}, cache.lookup({'inlet.T': 300.0}))
+
+    def test_truncated_file(self):
+        os.makedirs(os.path.dirname(self._file_name))
+        with open(self._file_name, 'w', encoding='utf-8') as f:
+            f.write('{"bc": {"inlet.T": 293.15}, "response": {"roo.T": 295.0}}\n{"bc": {"inl')
+        cache = ResponseCache()
+        cache.open(self._file_name)
+        self.assertEqual(1, len(cache))
+        cache.add({'inlet.T': 300.0}, {'roo.T': 301.0})
+        cache.save()
+        cache.open(self._file_name)
+        self.assertEqual(2, len(cache))
+
+    def test_single_object_file(self):
+        os.makedirs(os.path.dirname(self._file_name))
+        with open(self._file_name, 'w', encoding='utf-8') as f:
+            f.write('{"samples": [{"bc": {"inlet.T": 293.15}, "response": {"roo.T": 295.0}}]}')
+        cache = ResponseCache()
+        cache.open(self._file_name)
+        self.assertEqual({'roo.T': 295.0}, cache.lookup({'inlet.T': 293.15}))
+
+    def test_case_key(self):
+        mesh = os.path.join(self._temp_dir, "room.msh")
+        with open(mesh, 'w') as f:
+            f.write("mesh 1")
+        key = case_key(file_digest(mesh), 'inlet', '293.15')
+        self.assertEqual(key, case_key(file_digest(mesh), 'inlet', '293.15'))
+        self.assertNotEqual(key, case_key(file_digest(mesh), 'inlet', '300'))
+        # Editing the mesh in place changes the key
+        with open(mesh, 'w') as f:
+            f.write("mesh 2")
+        self.assertNotEqual(key, case_key(file_digest(mesh), 'inlet', '293.15'))
+        self.assertEqual('', file_digest(os.path.join(self._temp_dir, "missing.msh")))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from change_detect import ChangeDetector  # noqa: E402
+
+
+class Test_change_detect(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`change_detect`.
+    """
+
+    def test_first_call_changed(self):
+        det = ChangeDetector()
+        self.assertTrue(det.changed({'inlet.T': 293.15}))
+
+    def test_default_thresholds(self):
+        det = ChangeDetector(abs_tol=0.01, rel_tol=0.001)
+        det.accept({'inlet.T': 300.0})
+        # Threshold is 0.01 + 0.001*300 = 0.31
+        self.assertFalse(det.changed({'inlet.T': 300.3}))
+        self.assertFalse(det.changed({'inlet.T': 299.7}))
+        self.assertTrue(det.changed({'inlet.T': 300.32}))
+
+    def test_per_variable_thresholds(self):
+        det = ChangeDetector(abs_tol=1e-6, rel_tol=0, tolerances={'inlet.T': (0.05, 0)})
+        det.set_tolerance('inlet.v', 0, 0.1)
+        det.accept({'inlet.T': 300.0, 'inlet.v': 2.0, 'outlet.p': 1.0})
+        self.assertFalse(det.changed({'inlet.T': 300.04, 'inlet.v': 2.0, 'outlet.p': 1.0}))
+        self.assertTrue(det.changed({'inlet.T': 300.06, 'inlet.v': 2.0, 'outlet.p': 1.0}))
+        # Relative threshold of inlet.v is 0.1*2 = 0.2
+        self.assertFalse(det.changed({'inlet.T': 300.0, 'inlet.v': 2.19, 'outlet.p': 1.0}))
+        self.assertTrue(det.changed({'inlet.T': 300.0, 'inlet.v': 2.21, 'outlet.p': 1.0}))
+        # outlet.p uses the default thresholds
+        self.assertTrue(det.changed({'inlet.T': 300.0, 'inlet.v': 2.0, 'outlet.p': 1.001}))
+
+    def test_new_or_removed_key(self):
+        det = ChangeDetector(abs_tol=1.0)
+        det.accept({'inlet.T': 300.0})
+        self.assertTrue(det.changed({'inlet.T': 300.0, 'inlet.v': 2.0}))
+        self.assertTrue(det.changed({}))
+        self.assertFalse(det.changed({'inlet.T': 300.0}))
+
+    def test_accept_copies(self):
+        det = ChangeDetector(abs_tol=0.01, rel_tol=0)
+        values = {'inlet.T': 300.0}
+        det.accept(values)
+        values['inlet.T'] = 310.0
+        self.assertTrue(det.changed(values))
+
+    def test_counting_and_reset(self):
+        det = ChangeDetector()
+        det.accept({'inlet.T': 300.0})
+        det.skip()
+        det.skip()
+        det.accept({'inlet.T': 301.0})
+        self.assertEqual(2, det.solved)
+        self.assertEqual(2, det.skipped)
+        self.assertFalse(det.changed({'inlet.T': 301.0}))
+        det.reset()
+        self.assertEqual(0, det.solved)
+        self.assertEqual(0, det.skipped)
+        self.assertTrue(det.changed({'inlet.T': 301.0}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import CouplingCheckpoint  # noqa: E402
+
+
+class _Model(object):
+    """ FMU instance with a time and continuous states, and optionally with get_fmu_state."""
+
+    def __init__(self, can_get_state):
+        self.time = 0.0
+        self.continuous_states = [1.0, 2.0]
+        self._can_get_state = can_get_state
+        self.freed = []
+
+    def get_capability_flags(self):
+        return {'canGetAndSetFMUstate': self._can_get_state}
+
+    def get_fmu_state(self):
+        return (self.time, list(self.continuous_states))
+
+    def set_fmu_state(self, state):
+        (self.time, self.continuous_states) = (state[0], list(state[1]))
+
+    def free_fmu_state(self, state):
+        self.freed.append(state)
+
+
+class Test_checkpoint(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`checkpoint`.
+    """
+
+    def _rollback(self, can_get_state):
+        model = _Model(can_get_state)
+        cp = CouplingCheckpoint(max_retries=2)
+        self.assertFalse(cp.can_retry())
+        model.time = 10.0
+        data = {'time': 10.0, 'MF': {'inlet.T': 293.15}}
+        cp.save(model, data)
+        # The data are copied
+        data['MF']['inlet.T'] = 0.0
+        model.time = 20.0
+        model.continuous_states = [3.0, 4.0]
+        self.assertTrue(cp.can_retry())
+        restored = cp.restore(model)
+        self.assertEqual({'time': 10.0, 'MF': {'inlet.T': 293.15}}, restored)
+        self.assertEqual(10.0, model.time)
+        self.assertEqual([1.0, 2.0], model.continuous_states)
+        self.assertTrue(cp.can_retry())
+        cp.restore(model)
+        self.assertFalse(cp.can_retry())
+        self.assertEqual(2, cp.rollbacks)
+        # A new checkpoint allows retries again
+        cp.save(model, data)
+        self.assertTrue(cp.can_retry())
+        return (model, cp)
+
+    def test_fmu_state(self):
+        (model, cp) = self._rollback(True)
+        # The state of the first checkpoint is freed when the second one is saved,
+        # and the state of the second one at the end of the run.
+        self.assertEqual(1, len(model.freed))
+        cp.reset()
+        self.assertEqual(2, len(model.freed))
+        self.assertFalse(cp.can_retry())
+
+    def test_continuous_states(self):
+        (model, cp) = self._rollback(False)
+        cp.reset()
+        self.assertEqual([], model.freed)
+
+    def test_cosimulation_without_state(self):
+        model = _Model(False)
+        del model.continuous_states
+        cp = CouplingCheckpoint()
+        cp.save(model, {'time': 0.0})
+        self.assertFalse(cp.can_retry())
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
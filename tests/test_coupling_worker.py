@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import coupling_worker  # noqa: E402
+    from PyQt5.QtCore import Qt  # noqa: E402
+except ImportError:
+    # PyQt5 is not installed
+    coupling_worker = None
+
+
+@unittest.skipIf(coupling_worker is None, "PyQt5 is not installed")
+class Test_coupling_worker(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`coupling_worker`.
+
+       The worker runs in a Python thread, and its signals are received
+       in that thread, hence no window and no event loop are needed.
+    """
+
+    def _worker(self, job, min_interval=60.0):
+        worker = coupling_worker.CouplingWorker(job, min_interval=min_interval)
+        self._progress = []
+        self._status = []
+        worker.progress.connect(self._progress.append, Qt.DirectConnection)
+        worker.finished.connect(self._status.append, Qt.DirectConnection)
+        return worker
+
+    def _start(self, worker):
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        return thread
+
+    def test_throttle(self):
+        def job():
+            for value in [10, 20, 20, 30]:
+                worker.report_progress(value)
+            # The complete run is always reported
+            worker.report_progress(100)
+            worker.report_progress(100)
+        worker = self._worker(job)
+        worker.run()
+        self.assertEqual([10, 100], self._progress)
+        self.assertEqual(['done'], self._status)
+
+    def test_last_progress(self):
+        # A held back value is emitted when the job finishes, also if it fails
+        def job():
+            for value in [10, 20, 30]:
+                worker.report_progress(value)
+            raise RuntimeError("CFD solve failed")
+        worker = self._worker(job)
+        worker.run()
+        self.assertEqual([10, 30], self._progress)
+        self.assertEqual(['error: CFD solve failed'], self._status)
+        # A value that has been emitted already is not emitted again
+        worker = self._worker(lambda: worker.report_progress(50))
+        worker.run()
+        self.assertEqual([50], self._progress)
+
+    def test_no_throttle(self):
+        worker = self._worker(lambda: [worker.report_progress(v) for v in [10, 20, 30]], min_interval=0)
+        worker.run()
+        self.assertEqual([10, 20, 30], self._progress)
+
+    def test_pause_resume(self):
+        steps = []
+
+        def job():
+            steps.append(1)
+            worker.check()
+            steps.append(2)
+        worker = self._worker(job)
+        worker.pause()
+        self.assertTrue(worker.is_paused())
+        thread = self._start(worker)
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        self.assertEqual([1], steps)
+        worker.resume()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(worker.is_paused())
+        self.assertEqual([1, 2], steps)
+        self.assertEqual(['done'], self._status)
+
+    def test_cancel(self):
+        steps = []
+
+        def job():
+            steps.append(1)
+            worker.check()
+            steps.append(2)
+        worker = self._worker(job)
+        # Cancelling a paused job ends the wait
+        worker.pause()
+        thread = self._start(worker)
+        thread.join(0.2)
+        worker.cancel()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([1], steps)
+        self.assertEqual(['cancelled'], self._status)
+
+    def test_params(self):
+        params = coupling_worker.CouplingParams(
+            fmu_file='a.fmu', end_time=3600.0, interval=60.0, dt=1.0, set_names=[], set_values=[],
+            use_cosimulation=True, mesh_file='room.cas', boundary=[], boundary_T=[], negative_pressure=False)
+        self.assertEqual(60.0, params._replace(end_time=7200.0).interval)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchange_map import ExchangeMap, ExchangeMapError  # noqa: E402
+
+
+def _index(variables):
+    """ Return a model description index for the list of ``(name, causality)``."""
+    return {'names': [v[0] for v in variables],
+            'valueReference': list(range(len(variables))),
+            'causality': [v[1] for v in variables],
+            'positions': {v[0]: i for (i, v) in enumerate(variables)}}
+
+
+class Test_exchange_map(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`exchange_map`.
+    """
+
+    def test_from_text(self):
+        xmap = ExchangeMap.from_text('SupplyAir.T inlet.T; SupplyAir.m_flow inlet.v 6.944',
+                                     'RoomT roo.TCFD 1 -273.15; fluxes roo.Q_')
+        self.assertEqual(['RoomT', 'fluxes'], xmap.reports)
+        self.assertEqual({'inlet.T': 293.15, 'inlet.v': 6.944}, xmap.convert_mf([293.15, 1.0]))
+        self.assertAlmostEqual(22.0, xmap.convert_fm('RoomT', {'cell-fuild': 295.15})['roo.TCFD'])
+        self.assertEqual(5, len(xmap.by_report['fluxes'][0].targets))
+        self.assertRaises(ExchangeMapError, ExchangeMap.from_text, 'SupplyAir.T', '')
+        self.assertRaises(ExchangeMapError, ExchangeMap.from_text, '', 'unknown roo.T')
+
+    def test_bind(self):
+        xmap = ExchangeMap.from_text('SupplyAir.T inlet.T', 'RoomT roo.TCFD; outlet_massflow roo.mOut')
+        index = _index([('SupplyAir.T', 'output'), ('roo.TCFD', 'input'), ('roo.mOut', 'parameter')])
+        bound = xmap.bind(index)
+        self.assertEqual({'SupplyAir.T': 0, 'roo.TCFD': 1, 'roo.mOut': 2}, bound.valuerefs)
+        # Only inputs may be extrapolated in continuous-time mode
+        self.assertEqual(frozenset(['roo.TCFD']), bound.inputs)
+        self.assertEqual(frozenset(), xmap.inputs)
+
+    def test_bind_errors(self):
+        xmap = ExchangeMap.from_text('SupplyAir.T inlet.T', 'RoomT roo.TCFD; outlet_massflow roo.mOut')
+        index = _index([('SupplyAir.T', 'output'), ('roo.TCFD', 'output')])
+        with self.assertRaises(ExchangeMapError) as cm:
+            xmap.bind(index)
+        self.assertIn("'roo.TCFD' is an output", str(cm.exception))
+        self.assertIn("'roo.mOut' is not a variable", str(cm.exception))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extrapolation import SignalExtrapolator  # noqa: E402
+
+
+class Test_extrapolation(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`extrapolation`.
+    """
+
+    def test_empty(self):
+        ext = SignalExtrapolator()
+        self.assertEqual({}, ext.predict(1.0))
+        self.assertIsNone(ext.last_time())
+
+    def test_orders(self):
+        # y = t**2 is reproduced exactly by the second order polynomial
+        ext = SignalExtrapolator(order=0, orders={'lin': 1, 'quad': 2})
+        for t in [0.0, 1.0, 2.0]:
+            ext.add(t, {'hold': t**2, 'lin': t**2, 'quad': t**2})
+        val = ext.predict(3.0)
+        self.assertAlmostEqual(4.0, val['hold'])
+        self.assertAlmostEqual(4.0 + (4.0 - 1.0), val['lin'])
+        self.assertAlmostEqual(9.0, val['quad'])
+
+    def test_reduced_order(self):
+        # With one sample, a first order extrapolation holds the value
+        ext = SignalExtrapolator(order=1)
+        ext.add(0.0, {'T': 300.0})
+        self.assertAlmostEqual(300.0, ext.predict(10.0)['T'])
+        ext.add(1.0, {'T': 301.0})
+        self.assertAlmostEqual(310.0, ext.predict(10.0)['T'])
+
+    def test_replace_and_truncate(self):
+        ext = SignalExtrapolator(order=1)
+        ext.add(0.0, {'T': 300.0})
+        ext.add(1.0, {'T': 305.0})
+        # A sample at the same time replaces the last one, as in the implicit coupling
+        ext.add(1.0, {'T': 301.0})
+        self.assertAlmostEqual(302.0, ext.predict(2.0)['T'])
+        ext.add(2.0, {'T': 310.0})
+        ext.truncate(1.0)
+        self.assertEqual(1.0, ext.last_time())
+        # Only order+1 samples are kept, hence the value is held after the rollback
+        self.assertAlmostEqual(301.0, ext.predict(2.0)['T'])
+
+    def test_history_length(self):
+        ext = SignalExtrapolator(order=1)
+        for t in range(10):
+            ext.add(float(t), {'T': float(t)})
+        self.assertEqual(2, len(ext._history))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
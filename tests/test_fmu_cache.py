@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fmu_cache  # noqa: E402
+
+
+class _Model(object):
+    """ Loaded FMU instance whose reset may fail."""
+
+    def __init__(self, unpack_dir, fail_reset=False):
+        self.unpack_dir = unpack_dir
+        self.fail_reset = fail_reset
+        self.resets = 0
+
+    def reset(self):
+        if self.fail_reset:
+            raise RuntimeError("reset failed")
+        self.resets += 1
+
+
+class _Cache(fmu_cache.FMUCache):
+    """ FMU cache that loads :class:`_Model` instead of using pyfmi."""
+
+    def _load(self, fmu_file, kind):
+        self.loads += 1
+        return _Model(self.unpack(fmu_file))
+
+
+class Test_fmu_cache(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`fmu_cache`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-fmu-cache-")
+        self._cache_dir = os.path.join(self._temp_dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _fmu(self, name, content):
+        fmu_file = os.path.join(self._temp_dir, name)
+        with zipfile.ZipFile(fmu_file, "w") as zip_file:
+            zip_file.writestr("modelDescription.xml", content)
+        # Distinct modification times, as on a file system with a coarse resolution
+        # a changed file could otherwise keep its size and time stamp.
+        mtime = time.time() + len(os.listdir(self._temp_dir))
+        os.utime(fmu_file, (mtime, mtime))
+        return fmu_file
+
+    def _unpacked(self):
+        return sorted(d for d in os.listdir(self._cache_dir) if os.path.isdir(os.path.join(self._cache_dir, d)))
+
+    def test_hit(self):
+        fmu_file = self._fmu("a.fmu", "<a/>")
+        cache = _Cache(cache_dir=self._cache_dir)
+        model = cache.get(fmu_file, kind='ME')
+        self.assertEqual(fmu_cache.file_hash(fmu_file), os.path.basename(model.unpack_dir))
+        with open(os.path.join(model.unpack_dir, "modelDescription.xml")) as f:
+            self.assertEqual("<a/>", f.read())
+        self.assertIs(model, cache.get(fmu_file, kind='ME'))
+        self.assertEqual(1, cache.loads)
+        self.assertEqual(1, cache.resets)
+        self.assertEqual(1, model.resets)
+        # Each kind has its own instance, which uses the same directory
+        other = cache.get(fmu_file, kind='CS')
+        self.assertIsNot(model, other)
+        self.assertEqual(model.unpack_dir, other.unpack_dir)
+        self.assertEqual(1, len(self._unpacked()))
+
+    def test_changed_file(self):
+        fmu_file = self._fmu("a.fmu", "<a/>")
+        cache = _Cache(cache_dir=self._cache_dir)
+        old = cache.get(fmu_file)
+        fmu_file = self._fmu("a.fmu", "<b/>")
+        new = cache.get(fmu_file)
+        self.assertIsNot(old, new)
+        self.assertEqual(2, cache.loads)
+        # The directory of the previous version is removed
+        self.assertEqual([os.path.basename(new.unpack_dir)], self._unpacked())
+        self.assertFalse(os.path.exists(old.unpack_dir))
+
+    def test_shared_content(self):
+        # A directory that another FMU file still uses is kept
+        a = self._fmu("a.fmu", "<a/>")
+        b = self._fmu("b.fmu", "<a/>")
+        cache = _Cache(cache_dir=self._cache_dir)
+        unpack_dir = cache.unpack(a)
+        self.assertEqual(unpack_dir, cache.unpack(b))
+        a = self._fmu("a.fmu", "<c/>")
+        cache.unpack(a)
+        self.assertEqual(2, len(self._unpacked()))
+        self.assertTrue(os.path.isdir(unpack_dir))
+        # Other processes share the directory and the record of the FMU files
+        b = self._fmu("b.fmu", "<d/>")
+        fmu_cache.FMUCache(cache_dir=self._cache_dir).unpack(b)
+        self.assertFalse(os.path.isdir(unpack_dir))
+
+    def test_orphan(self):
+        cache = _Cache(cache_dir=self._cache_dir)
+        cache.unpack(self._fmu("a.fmu", "<a/>"))
+        orphan = os.path.join(self._cache_dir, "0" * 64)
+        os.makedirs(orphan)
+        cache.unpack(self._fmu("b.fmu", "<b/>"))
+        # A recent directory may be unpacked by another process
+        self.assertTrue(os.path.isdir(orphan))
+        mtime = time.time() - 2 * fmu_cache.ORPHAN_AGE
+        os.utime(orphan, (mtime, mtime))
+        cache.unpack(self._fmu("b.fmu", "<c/>"))
+        self.assertFalse(os.path.isdir(orphan))
+        self.assertEqual(2, len(self._unpacked()))
+
+    def test_reset_failure(self):
+        fmu_file = self._fmu("a.fmu", "<a/>")
+        cache = _Cache(cache_dir=self._cache_dir)
+        model = cache.get(fmu_file)
+        model.fail_reset = True
+        again = cache.get(fmu_file)
+        self.assertIsNot(model, again)
+        self.assertEqual(2, cache.loads)
+        self.assertEqual(0, cache.resets)
+        self.assertIs(again, cache.get(fmu_file))
+        self.assertEqual(1, cache.resets)
+
+    def test_discard_and_clear(self):
+        fmu_file = self._fmu("a.fmu", "<a/>")
+        cache = _Cache(cache_dir=self._cache_dir)
+        model = cache.get(fmu_file)
+        cache.discard(fmu_file)
+        self.assertIsNot(model, cache.get(fmu_file))
+        cache.clear()
+        cache.get(fmu_file)
+        self.assertEqual(3, cache.loads)
+        # The unpacked FMU is kept on disk
+        self.assertEqual(1, len(self._unpacked()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import ast
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lazy_import  # noqa: E402
+
+
+class Test_lazy_import(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`lazy_import`.
+    """
+
+    def test_lazy_import(self):
+        self.assertIs(sys.modules['os'], lazy_import.lazy_import('os'))
+        sys.modules.pop('colorsys', None)
+        mod = lazy_import.lazy_import('colorsys')
+        self.assertIsInstance(mod, lazy_import.LazyModule)
+        self.assertNotIn('colorsys', sys.modules)
+        self.assertEqual((0.0, 0.0, 1.0), mod.rgb_to_hsv(1.0, 1.0, 1.0))
+        self.assertIn('colorsys', sys.modules)
+
+    def test_lazy_modules(self):
+        temp_dir = tempfile.mkdtemp(prefix="tmp-lazy-import-")
+        try:
+            file_name = os.path.join(temp_dir, "gui.py")
+            with open(file_name, 'w', encoding='utf-8') as f:
+                f.write("import os\n"
+                        "np = lazy_import('numpy')\n"
+                        "def f():\n"
+                        "    return lazy_import('pyfmi')\n"
+                        "x = other('pandas')\n")
+            self.assertEqual(['numpy', 'pyfmi'], lazy_import.lazy_modules(file_name))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_belab_modules(self):
+        modules = lazy_import.lazy_modules()
+        self.assertIn('numpy', modules)
+        self.assertNotIn('pandas', modules)
+        self.assertNotIn('matplotlib.pyplot', modules)
+
+    def test_belab_startup(self):
+        # The modules of the repository that BELab1.0.py imports at start
+        root = os.path.dirname(lazy_import.BELAB_FILE)
+        with open(lazy_import.BELAB_FILE, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        modules = []
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom):
+                names = [node.module]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            modules += [n for n in names if os.path.isfile(os.path.join(root, n + '.py'))]
+        self.assertIn('result_store', modules)
+        # Modules that need a missing package, such as PyQt5, are skipped
+        code = ("import sys\n"
+                "for mod in %r:\n"
+                "    try:\n"
+                "        __import__(mod)\n"
+                "    except ImportError as e:\n"
+                "        if e.name in ('numpy', 'h5py'):\n"
+                "            raise\n"
+                "print(sorted(m for m in ('numpy', 'h5py', 'omniORB') if m in sys.modules))\n" % modules)
+        proc = subprocess.run([sys.executable, '-c', code], cwd=root, stdout=subprocess.PIPE,
+                              universal_newlines=True, check=True)
+        self.assertEqual('[]', proc.stdout.strip())
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import CouplingCheckpoint  # noqa: E402
+from model_exchange import integrate, leave_event_mode  # noqa: E402
+from relaxation import AitkenRelaxation  # noqa: E402
+
+
+class _Vector(list):
+    """ Vector of the continuous states, with the operations that the integration uses."""
+
+    def __add__(self, other):
+        return _Vector(a + b for (a, b) in zip(self, other))
+
+    def __rmul__(self, h):
+        return _Vector(h * a for a in self)
+
+
+class _EventInfo(object):
+    newDiscreteStatesNeeded = False
+    valuesOfContinuousStatesChanged = False
+    nextEventTimeDefined = False
+    nextEventTime = 0.0
+
+
+class _Room(object):
+    """ Model exchange FMU of a room air temperature ``T`` (valueref 0), which is a state, and the
+        wall temperature ``T_wall`` (valueref 1), which is an input: ``der(T) = (T_wall-T)/tau``.
+
+        The output has no direct feedthrough from the input, hence only an integration
+        of the exchange interval shows the effect of a new wall temperature.
+    """
+
+    def __init__(self, tau=1.0, time_event=None):
+        self.tau = tau
+        self.time = 0.0
+        self.continuous_states = _Vector([0.0])
+        self.T_wall = 0.0
+        self.mode = 'continuous'
+        self._time_event = time_event
+        self.events = []
+
+    def get_capability_flags(self):
+        return {'canGetAndSetFMUstate': True}
+
+    def get_fmu_state(self):
+        return (self.time, list(self.continuous_states), self.T_wall, self.mode)
+
+    def set_fmu_state(self, state):
+        (self.time, states, self.T_wall, self.mode) = state
+        self.continuous_states = _Vector(states)
+
+    def free_fmu_state(self, state):
+        pass
+
+    def get_derivatives(self):
+        return _Vector([(self.T_wall - self.continuous_states[0]) / self.tau])
+
+    def get_event_indicators(self):
+        return [1.0]
+
+    def completed_integrator_step(self):
+        return False
+
+    def enter_event_mode(self):
+        assert self.mode == 'continuous'
+        self.mode = 'event'
+        self.events.append(self.time)
+
+    def event_update(self, intermediate_result):
+        assert self.mode == 'event'
+
+    def enter_continuous_time_mode(self):
+        self.mode = 'continuous'
+
+    def get_event_info(self):
+        info = _EventInfo()
+        if self._time_event is not None and self.time < self._time_event:
+            info.nextEventTimeDefined = True
+            info.nextEventTime = self._time_event
+        return info
+
+    def get_real(self, valuerefs):
+        return [[self.continuous_states[0], self.T_wall][v] for v in valuerefs]
+
+    def set_real(self, valuerefs, values):
+        for (v, value) in zip(valuerefs, values):
+            assert v == 1
+            self.T_wall = value
+
+
+def _fluent(T):
+    """ Wall temperature that the CFD model computes for the room air temperature ``T``."""
+    return 10.0 + 0.5 * T
+
+
+class Test_model_exchange(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`model_exchange`.
+    """
+
+    def test_integrate(self):
+        model = _Room()
+        model.T_wall = 1.0
+        steps = []
+        (t_next, _) = integrate(model, 0.35, 0.1, float('inf'), [1.0], on_step=steps.append)
+        self.assertEqual(0.35, model.time)
+        self.assertEqual(0.35, steps[-1])
+        self.assertEqual(4, len(steps))
+        # Explicit Euler
+        self.assertAlmostEqual(1.0 - 0.9**3 * 0.95, model.continuous_states[0])
+        self.assertEqual(float('inf'), t_next)
+
+    def test_time_event(self):
+        model = _Room(time_event=0.25)
+        steps = []
+        (t_next, _) = integrate(model, 0.4, 0.1, 0.25, [1.0], on_step=steps.append)
+        # The step is shortened to the time event
+        self.assertAlmostEqual(0.25, steps[2])
+        self.assertEqual([0.25], [t for t in model.events if abs(t - 0.25) < 1e-12])
+        self.assertEqual('continuous', model.mode)
+        self.assertEqual(float('inf'), t_next)
+
+    def test_set_inputs(self):
+        model = _Room()
+        integrate(model, 0.2, 0.1, float('inf'), [1.0], set_inputs=lambda t: model.set_real([1], [10 * t]))
+        # The derivative of a step uses the input set at the end of the previous step
+        self.assertAlmostEqual(0.1 * (1.0 - 0.0) / 1.0, model.continuous_states[0])
+
+    def _couple(self, implicit, reintegrate=True, n=5, interval=1.0, dt=0.01):
+        """ Couple the room with :func:`_fluent` like the model exchange loop of BELab.
+
+        Returns the room air temperature at the exchanges and the number of iterations.
+        """
+        model = _Room()
+        relax = AitkenRelaxation(omega0=0.5, atol=1e-8, rtol=0, max_iterations=50, enabled=implicit)
+        checkpoint = CouplingCheckpoint()
+        fm = {'T_wall': _fluent(0.0)}
+        model.set_real([1], [fm['T_wall']])
+        checkpoint.save(model, {'time': 0.0, 'Tnext': float('inf'), 'event_ind': [1.0], 'FM': dict(fm)})
+        trajectory = []
+        for k in range(1, n + 1):
+            time = k * interval
+            integrate(model, time, dt, float('inf'), [1.0])
+            model.enter_event_mode()
+            held = dict(fm)
+            fm = {'T_wall': _fluent(model.get_real([0])[0])}
+            if implicit:
+                def solve(x):
+                    leave_event_mode(model)
+                    data = checkpoint.rewind(model) if reintegrate else None
+                    if data is not None:
+                        (t0, x0) = (data['time'], data['FM']['T_wall'])
+                        integrate(model, time, dt, data['Tnext'], data['event_ind'],
+                                  lambda t: model.set_real([1], [x0 + (t - t0) / (time - t0) * (x['T_wall'] - x0)]))
+                    model.enter_event_mode()
+                    model.set_real([1], [x['T_wall']])
+                    # Like CFD_solve, which updates dict_FMpassValue
+                    fm['T_wall'] = _fluent(model.get_real([0])[0])
+                    return dict(fm)
+                (converged, x) = relax.iterate(held, dict(fm), solve)
+                self.assertTrue(converged)
+            model.set_real([1], [fm['T_wall']])
+            leave_event_mode(model)
+            trajectory.append(model.get_real([0])[0])
+            checkpoint.save(model, {'time': time, 'Tnext': float('inf'), 'event_ind': [1.0], 'FM': dict(fm)})
+        return (trajectory, relax.total_iterations)
+
+    def test_implicit_changes_trajectory(self):
+        (explicit, _) = self._couple(implicit=False)
+        (implicit, iterations) = self._couple(implicit=True)
+        self.assertGreater(iterations, 0)
+        # Both approach the fixed point T = _fluent(T) = 20
+        self.assertLess(abs(implicit[-1] - 20.0), abs(explicit[-1] - 20.0))
+        for (T_exp, T_imp) in zip(explicit, implicit):
+            self.assertGreater(abs(T_exp - T_imp), 0.1)
+        # Iterating at the exchange time without integrating the interval again
+        # does not change the state, hence the trajectory is the explicit one.
+        (frozen, _) = self._couple(implicit=True, reintegrate=False)
+        for (T_exp, T_frozen) in zip(explicit, frozen):
+            self.assertAlmostEqual(T_exp, T_frozen)
+
+    def test_implicit_is_consistent(self):
+        # The converged wall temperature at the end of each interval is the one that
+        # the CFD model computes for the room air temperature it results in.
+        (implicit, _) = self._couple(implicit=True, n=3)
+        model = _Room()
+        x0 = _fluent(0.0)
+        model.set_real([1], [x0])
+        for (k, T) in enumerate(implicit):
+            x = _fluent(T)
+            integrate(model, k + 1.0, 0.01, float('inf'), [1.0],
+                      lambda t, k=k, x0=x0, x=x: model.set_real([1], [x0 + (t - k) * (x - x0)]))
+            self.assertAlmostEqual(T, model.get_real([0])[0], places=6)
+            x0 = x
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relaxation import AitkenRelaxation  # noqa: E402
+
+
+def _fluent(x):
+    """ Linear interface map with the fixed point 0.5 that oscillates without relaxation."""
+    return {'T': 0.9 - 0.8 * x['T'], 'name_only_in_fmu': 0.0}
+
+
+class Test_relaxation(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`relaxation`.
+    """
+
+    def test_converged(self):
+        rel = AitkenRelaxation(atol=1e-4, rtol=1e-3)
+        self.assertTrue(rel.converged({'T': 300.0}, {'T': 300.2}))
+        self.assertFalse(rel.converged({'T': 300.0}, {'T': 300.4}))
+        # Only the names of both dictionaries are compared
+        self.assertTrue(rel.converged({'T': 300.0}, {'T': 300.0, 'p': 1.0}))
+
+    def test_first_iteration(self):
+        rel = AitkenRelaxation(omega0=0.5)
+        x = rel.relax({'T': 0.0}, {'T': 0.9, 'p': 2.0})
+        self.assertAlmostEqual(0.45, x['T'])
+        # Names that are not iterated take the Fluent value
+        self.assertEqual(2.0, x['p'])
+        self.assertEqual(1, rel.iterations)
+
+    def test_aitken_linear(self):
+        # Aitken's factor is exact for a scalar linear map, hence the
+        # iteration converges after the second relaxation.
+        rel = AitkenRelaxation(omega0=0.5, omega_max=1.0, atol=1e-10, rtol=0)
+        x = {'T': 0.0}
+        for _ in range(3):
+            x = rel.relax(x, _fluent(x))
+        self.assertAlmostEqual(1 / 1.8, rel.omega)
+        self.assertAlmostEqual(0.5, x['T'])
+        self.assertTrue(rel.converged(x, _fluent(x)))
+
+    def test_plain_iteration_is_slower(self):
+        rel = AitkenRelaxation(omega0=1.0, atol=1e-6, rtol=0)
+        x = {'T': 0.0}
+        for _ in range(5):
+            x = dict(_fluent(x))
+        self.assertFalse(rel.converged(x, _fluent(x)))
+
+    def test_reset(self):
+        rel = AitkenRelaxation(omega0=0.5)
+        x = {'T': 0.0}
+        for _ in range(3):
+            x = rel.relax(x, _fluent(x))
+        rel.reset()
+        self.assertEqual(0.5, rel.omega)
+        self.assertEqual(0, rel.iterations)
+        self.assertEqual(3, rel.total_iterations)
+
+    def test_iterate(self):
+        rel = AitkenRelaxation(omega0=0.5, atol=1e-8, rtol=0, max_iterations=10)
+        (converged, x) = rel.iterate({'T': 0.0}, _fluent({'T': 0.0}), _fluent)
+        self.assertTrue(converged)
+        self.assertAlmostEqual(0.5, x['T'])
+        # Values that agree with the held ones are accepted without solving again
+        (converged, x) = rel.iterate({'T': 0.5}, _fluent({'T': 0.5}), None)
+        self.assertTrue(converged)
+        self.assertEqual(0, rel.not_converged)
+
+    def test_iterate_not_converged(self):
+        rel = AitkenRelaxation(omega0=0.5, atol=1e-8, rtol=0, max_iterations=1)
+        (converged, x) = rel.iterate({'T': 0.0}, _fluent({'T': 0.0}), _fluent)
+        self.assertFalse(converged)
+        # A failed CFD solve ends the iterations
+        (converged, x) = rel.iterate({}, _fluent({'T': 0.0}), lambda x: None)
+        self.assertFalse(converged)
+        self.assertEqual(0.9, x['T'])
+        self.assertEqual(2, rel.not_converged)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import result_store  # noqa: E402
+
+
+class Test_result_store(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`result_store`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-result-store-")
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _read_csv(self, file_name):
+        with open(file_name, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.reader(f))
+
+    def test_csv_store_declared(self):
+        file_name = os.path.join(self._temp_dir, "run.csv")
+        with result_store.CsvStore(file_name, names=['MF/inlet.T', 'FM/roo.T']) as store:
+            # The Fluent result of the first exchange is missing, e.g. after a failed solve
+            store.append(0, 0.0, {'MF/inlet.T': 293.15})
+            store.append(1, 10.0, {'MF/inlet.T': 294.0, 'FM/roo.T': 295.0, 'FM/other': 1.0})
+            self.assertEqual(2, len(store))
+            self.assertEqual({'FM/other'}, store.skipped)
+        self.assertEqual([['step', 'time', 'MF/inlet.T', 'FM/roo.T'],
+                          ['0', '0.0', '293.15', ''],
+                          ['1', '10.0', '294.0', '295.0']], self._read_csv(file_name))
+
+    def test_csv_store_first_row(self):
+        file_name = os.path.join(self._temp_dir, "run.csv")
+        with result_store.CsvStore(file_name) as store:
+            store.append(0, 0.0, {'b': 2.0, 'a': 1.0})
+        self.assertEqual(['step', 'time', 'a', 'b'], self._read_csv(file_name)[0])
+
+    def test_open_store_without_h5py(self):
+        h5py = result_store._h5py()
+        result_store.h5py = None
+        try:
+            store = result_store.open_store(os.path.join(self._temp_dir, "run.h5"), names=['a'])
+            store.close()
+        finally:
+            result_store.h5py = h5py
+        self.assertIsInstance(store, result_store.CsvStore)
+        self.assertTrue(os.path.exists(os.path.join(self._temp_dir, "run.csv")))
+
+    @unittest.skipIf(result_store._h5py() is None, "h5py is not installed")
+    def test_run_store(self):
+        file_name = os.path.join(self._temp_dir, "run.h5")
+        with result_store.open_store(file_name, names=['MF/inlet.T', 'FM/roo.T'], attrs={'fmu': 'a.fmu'}) as store:
+            store.append(0, 0.0, {'MF/inlet.T': 293.15})
+            store.extend([1, 2], [10.0, 20.0], {'MF/inlet.T': [294.0, 295.0], 'FM/roo.T': [295.0, 296.0]})
+        values = result_store.read_store(file_name)
+        self.assertEqual([0, 1, 2], list(values['step']))
+        self.assertEqual([295.0, 296.0], list(values['FM/roo.T'][1:]))
+        self.assertNotEqual(values['FM/roo.T'][0], values['FM/roo.T'][0])
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sweep  # noqa: E402
+
+
+class Test_sweep(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`sweep`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-sweep-")
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_expand_parameters(self):
+        (names, values) = sweep.expand_parameters(
+            {'door.LClo': '0.01', 'roo.T': '', 'cle.curve_a': '1.2', 'cle.curve_b': '1'})
+        self.assertEqual(['door.LClo', 'cle.A'], names)
+        self.assertEqual([0.01, 20.0], values)
+        self.assertRaises(ValueError, sweep.expand_parameters, {'cle.curve_a': '1.2'})
+
+    def test_read_table(self):
+        file_name = os.path.join(self._temp_dir, "table.csv")
+        with open(file_name, 'w', encoding='utf-8', newline='') as f:
+            f.write("door.LClo,roo.T\n0.01,293.15\n0.02,\n")
+        self.assertEqual([{'door.LClo': '0.01', 'roo.T': '293.15'}, {'door.LClo': '0.02', 'roo.T': ''}],
+                         sweep.read_table(file_name))
+
+    def test_csv_result(self):
+        from result_store import CsvStore
+
+        file_name = os.path.join(self._temp_dir, "sweep.csv")
+        writer = CsvStore(file_name, names=['roo.T', 'ori.dp'])
+        writer.extend([1, 1], [0.0, 1.0], {'roo.T': [293.0, 294.0], 'ori.dp': [1.0, 2.0]})
+        # A failed case has no rows
+        writer.extend([], [], {'roo.T': [], 'ori.dp': []})
+        writer.close()
+        with open(file_name, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual([['step', 'time', 'roo.T', 'ori.dp'], ['1', '0.0', '293.0', '1.0'],
+                          ['1', '1.0', '294.0', '2.0']], rows)
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import workdata  # noqa: E402
+
+
+class Test_workdata(unittest.TestCase):
+    """
+       This class contains the unit tests for :mod:`workdata`.
+    """
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="tmp-workdata-")
+        for (name, size) in (('2024-01-01_10-00', 300), ('2024-02-01_10-00', 200), ('2024-03-01_10-00', 100)):
+            run_dir = os.path.join(self._temp_dir, 'Fluent_Python', name)
+            os.makedirs(run_dir)
+            with open(os.path.join(run_dir, 'simuT_1.txt'), 'w') as f:
+                f.write('x' * size)
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def test_no_limits_keep_all(self):
+        manager = workdata.WorkdataManager(self._temp_dir)
+        self.assertEqual(3, len(manager.scan()))
+        self.assertEqual([], manager.prune())
+        manager.close()
+
+    def test_prune_candidates_do_not_delete(self):
+        manager = workdata.WorkdataManager(self._temp_dir, max_bytes=1)
+        manager.scan()
+        self.assertEqual(['2024-01-01_10-00', '2024-02-01_10-00'],
+                         manager.prune_candidates(keep=['2024-03-01_10-00']))
+        self.assertEqual(3, len(manager.runs()))
+        self.assertEqual(['2024-01-01_10-00', '2024-02-01_10-00'], manager.prune(keep=['2024-03-01_10-00']))
+        self.assertEqual(['2024-03-01_10-00'], manager.run_names())
+        manager.close()
+
+    def test_scan_in_thread(self):
+        # The GUI scans in a worker thread with its own manager, while it keeps one for the current run.
+        manager = workdata.WorkdataManager(self._temp_dir)
+        added = []
+
+        def scan():
+            background = workdata.WorkdataManager(self._temp_dir)
+            added.extend(background.scan(exclude=['2024-03-01_10-00']))
+            background.close()
+
+        thread = threading.Thread(target=scan)
+        thread.start()
+        thread.join()
+        self.assertEqual(['2024-01-01_10-00', '2024-02-01_10-00'], added)
+        manager.finish_run('2024-03-01_10-00')
+        self.assertEqual(3, len(manager.runs()))
+        manager.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,283 @@
+"""
+Life cycle of the run directories in ``Workdata``.
+
+Every start of BELab creates ``Workdata/Fluent_Python/<run>`` and
+``Workdata/Dymola_python/<run>``, where ``<run>`` is the start time
+``%Y-%m-%d_%H-%M``. Each CFD solve leaves its report files (``simuT_*``,
+``simu_*``, ``simuP_*``, ``simufluxes_*``) behind, and Fluent adds transcripts
+and cleanup scripts.
+
+:class:`WorkdataManager` compacts these files of a finished run into one
+``reports.zip``, enters the run into the SQLite catalogue
+``Workdata/catalogue.sqlite`` and deletes the oldest runs once they are older
+than ``max_age_days`` or the runs together use more than ``max_bytes``.
+Both limits are off by default.
+
+The SQLite connection of a manager can only be used in the thread that created it,
+hence a background thread uses its own manager.
+
+Usage::
+
+    python workdata.py scan                      # compact and catalogue all finished runs
+    python workdata.py list
+    python workdata.py prune --max-age-days 90 --max-gb 20
+"""
+import argparse
+import datetime
+import fnmatch
+import os
+import shutil
+import sqlite3
+import time
+import zipfile
+
+# Files of a Fluent run directory that are moved into the archive.
+REPORT_PATTERNS = ('simuT_*', 'simu_*', 'simuP_*', 'simufluxes_*', '*.trn', 'meshcheck.txt')
+# Files that are only needed while Fluent is running.
+STALE_PATTERNS = ('cleanup-fluent-*.bat', 'aaS*.txt', 'instant_aaS*.txt')
+ARCHIVE_NAME = 'reports.zip'
+RUN_FORMAT = '%Y-%m-%d_%H-%M'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    name TEXT PRIMARY KEY,
+    started REAL,
+    finished REAL,
+    fluent_dir TEXT,
+    dymola_dir TEXT,
+    bytes INTEGER,
+    reports INTEGER,
+    results TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def _tree_size(path):
+    total = 0
+    for (dir_path, _, file_names) in os.walk(path):
+        for name in file_names:
+            try:
+                total += os.path.getsize(os.path.join(dir_path, name))
+            except OSError:
+                pass
+    return total
+
+
+def run_start_time(name):
+    """Return the start time of the run ``name`` in seconds since the epoch, or ``None``."""
+    try:
+        return time.mktime(datetime.datetime.strptime(name, RUN_FORMAT).timetuple())
+    except ValueError:
+        return None
+
+
+def compact_directory(directory):
+    """Move the report files, transcripts and stale Fluent files of ``directory`` into ``reports.zip``.
+
+    :param directory: Run directory, subdirectories such as ``room1`` are included.
+
+    Files that are already in the archive are replaced.
+    Returns the number of files that were added to the archive.
+    """
+    files = []
+    for (dir_path, _, file_names) in os.walk(directory):
+        for name in file_names:
+            if _matches(name, REPORT_PATTERNS) or _matches(name, STALE_PATTERNS):
+                files.append(os.path.join(dir_path, name))
+    if not files:
+        return 0
+    archive = os.path.join(directory, ARCHIVE_NAME)
+    tmp_archive = archive + '.tmp'
+    arc_names = set(os.path.relpath(f, directory).replace(os.sep, '/') for f in files)
+    # Write a new archive and replace the old one only when it is complete,
+    # so that an interruption never loses the files of earlier compactions.
+    with zipfile.ZipFile(tmp_archive, 'w', zipfile.ZIP_DEFLATED) as new_zip:
+        if os.path.exists(archive):
+            with zipfile.ZipFile(archive) as old_zip:
+                for info in old_zip.infolist():
+                    if info.filename not in arc_names:
+                        new_zip.writestr(info, old_zip.read(info))
+        for f in files:
+            new_zip.write(f, os.path.relpath(f, directory).replace(os.sep, '/'))
+    os.replace(tmp_archive, archive)
+    for f in files:
+        try:
+            os.remove(f)
+        except OSError:
+            # Still opened by Fluent, it is archived again by the next compaction.
+            pass
+    return len(files)
+
+
+class WorkdataManager(object):
+    """Compaction, catalogue and retention of the run directories in ``Workdata``.
+
+    :param workdata: The ``Workdata`` directory.
+    :param max_age_days: Runs that started earlier are deleted by :meth:`prune`, ``None`` keeps all.
+    :param max_bytes: The oldest runs are deleted by :meth:`prune` until all runs
+                      use less than this number of bytes, ``None`` for no limit.
+    """
+
+    def __init__(self, workdata, max_age_days=None, max_bytes=None):
+        self.workdata = workdata
+        self.fluent_root = os.path.join(workdata, 'Fluent_Python')
+        self.dymola_root = os.path.join(workdata, 'Dymola_python')
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        os.makedirs(workdata, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(workdata, 'catalogue.sqlite'))
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _dirs(self, name):
+        return (os.path.join(self.fluent_root, name), os.path.join(self.dymola_root, name))
+
+    def run_names(self):
+        """Return the names of all run directories on disk, oldest first."""
+        names = set()
+        for root in (self.fluent_root, self.dymola_root):
+            if os.path.isdir(root):
+                names.update(n for n in os.listdir(root) if os.path.isdir(os.path.join(root, n)))
+        return sorted(names)
+
+    def finish_run(self, name):
+        """Compact the directories of the finished run ``name`` and enter it into the catalogue."""
+        (fluent_dir, dymola_dir) = self._dirs(name)
+        reports = 0
+        for directory in (fluent_dir, dymola_dir):
+            if os.path.isdir(directory):
+                reports += compact_directory(directory)
+        if os.path.exists(os.path.join(fluent_dir, ARCHIVE_NAME)):
+            with zipfile.ZipFile(os.path.join(fluent_dir, ARCHIVE_NAME)) as z:
+                reports = len(z.namelist())
+        results = []
+        if os.path.isdir(dymola_dir):
+            results = sorted(n for n in os.listdir(dymola_dir) if n != ARCHIVE_NAME)
+        size = sum(_tree_size(d) for d in (fluent_dir, dymola_dir) if os.path.isdir(d))
+        started = run_start_time(name)
+        if started is None:
+            started = min([os.path.getmtime(d) for d in (fluent_dir, dymola_dir) if os.path.isdir(d)] or [0])
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             (name, started, time.time(),
+                              fluent_dir if os.path.isdir(fluent_dir) else None,
+                              dymola_dir if os.path.isdir(dymola_dir) else None,
+                              size, reports, ';'.join(results)))
+
+    def scan(self, exclude=()):
+        """Finish all runs on disk that are not in the catalogue yet.
+
+        :param exclude: Names of runs that are still in progress, such as the current one.
+
+        Returns the list of runs that were added.
+        """
+        known = set(r[0] for r in self._db.execute('SELECT name FROM runs'))
+        added = [n for n in self.run_names() if n not in known and n not in exclude]
+        for name in added:
+            self.finish_run(name)
+        return added
+
+    def runs(self, since=None, result=None):
+        """Return the catalogued runs as a list of dictionaries, newest first.
+
+        :param since: Only runs that started at or after this time in seconds since the epoch.
+        :param result: Only runs with a result file whose name contains this string.
+        """
+        query = 'SELECT * FROM runs'
+        args = []
+        clauses = []
+        if since is not None:
+            clauses.append('started >= ?')
+            args.append(since)
+        if result is not None:
+            clauses.append('results LIKE ?')
+            args.append('%' + result + '%')
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        cursor = self._db.execute(query + ' ORDER BY started DESC', args)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def read_report(self, name, file_name):
+        """Return the content of the report ``file_name``, e.g. ``'room1/simuT_ABC123.txt'``, of the run ``name``.
+
+        The file is read from the archive, or from the run directory if it has not been compacted.
+        """
+        fluent_dir = self._dirs(name)[0]
+        path = os.path.join(fluent_dir, file_name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        with zipfile.ZipFile(os.path.join(fluent_dir, ARCHIVE_NAME)) as z:
+            return z.read(file_name.replace(os.sep, '/')).decode('utf-8')
+
+    def delete_run(self, name):
+        """Delete the directories of the run ``name`` and remove it from the catalogue."""
+        for directory in self._dirs(name):
+            shutil.rmtree(directory, ignore_errors=True)
+        with self._db:
+            self._db.execute('DELETE FROM runs WHERE name = ?', (name,))
+
+    def prune_candidates(self, keep=()):
+        """Return the oldest catalogued runs that violate ``max_age_days`` or ``max_bytes``.
+
+        :param keep: Names of runs that are never deleted, such as the current one.
+
+        Runs that are not in the catalogue, i.e. that have not been finished, are never returned.
+        Nothing is deleted, so that the runs can be shown to the user first.
+        """
+        rows = self._db.execute('SELECT name, started, bytes FROM runs ORDER BY started').fetchall()
+        rows = [r for r in rows if r[0] not in keep]
+        deleted = []
+        if self.max_age_days is not None:
+            limit = time.time() - self.max_age_days*86400
+            deleted.extend(r[0] for r in rows if r[1] < limit)
+        if self.max_bytes is not None:
+            remaining = [r for r in rows if r[0] not in deleted]
+            total = sum(r[2] or 0 for r in remaining)
+            for r in remaining:
+                if total <= self.max_bytes:
+                    break
+                deleted.append(r[0])
+                total -= r[2] or 0
+        return deleted
+
+    def prune(self, keep=()):
+        """Delete the runs returned by :meth:`prune_candidates` and return their names.
+
+        :param keep: Names of runs that are never deleted, such as the current one.
+        """
+        deleted = self.prune_candidates(keep)
+        for name in deleted:
+            self.delete_run(name)
+        return deleted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage the run directories in Workdata.')
+    parser.add_argument('command', choices=['scan', 'list', 'prune'])
+    parser.add_argument('--workdata', default=os.path.join(os.path.abspath(os.path.dirname(__file__)), 'Workdata'))
+    parser.add_argument('--max-age-days', type=float, default=None)
+    parser.add_argument('--max-gb', type=float, default=None)
+    args = parser.parse_args()
+
+    manager = WorkdataManager(args.workdata, max_age_days=args.max_age_days,
+                              max_bytes=None if args.max_gb is None else args.max_gb*1e9)
+    if args.command == 'scan':
+        for run in manager.scan():
+            print('Added %s' % run)
+    elif args.command == 'list':
+        for run in manager.runs():
+            print('%-18s %10.1f MB %5d reports  %s' % (run['name'], (run['bytes'] or 0)/1e6,
+                                                      run['reports'] or 0, run['results'] or ''))
+    else:
+        for run in manager.prune():
+            print('Deleted %s' % run)
+    manager.close()